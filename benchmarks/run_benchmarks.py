@@ -0,0 +1,209 @@
+"""Benchmarks for pyGCS, reported as JSON to track the cost of a GCI study across releases
+
+Usage:
+    python benchmarks/run_benchmarks.py [--output results.json] [--repeat 5] [--quick] [--filter gcs]
+
+Each benchmark is timed repeat times (after one warm-up call) and reported with its best, median and mean wall clock
+time in seconds. The package is imported from the installed pyGCS if available, otherwise from the src/ folder of
+this repository.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import pyGCS
+except ImportError:
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+    import pyGCS
+import numpy as np
+from pyGCS import order_solver
+from pyGCS.report import write_report
+
+
+# = input data =========================================================================================================
+def power_law_study(levels, order=2.0, dimension=2):
+    """Returns cells and solutions of levels grids converging with the given order in a domain of unit volume
+
+    The cells grow by a factor of 1.3 per direction between successive grids, or less if that would exceed a million
+    times the cells of the coarsest grid, so that many levels can be studied without running out of integer range.
+    """
+    growth = min(1.3 ** dimension, 1e6 ** (1.0 / (levels - 1)))
+    cells = np.round(1000 * np.power(growth, np.arange(levels))).astype(int)
+    grid_size = np.power(1.0 / cells, 1.0 / dimension)
+    solution = 1.0 + 0.5 * np.power(grid_size, order)
+    return cells.tolist(), solution.tolist()
+
+
+def order_solver_input(condition, size):
+    """Returns relative errors and refinement ratios for size independent triplets
+
+    well conditioned triplets converge monotonically with an order close to 2 and a refinement ratio of 2, while ill
+    conditioned triplets have refinement ratios close to unity and unequal ratios between the grids, where the
+    fixed-point iteration converges slowly.
+    """
+    random = np.random.default_rng(1)
+    if condition == 'well':
+        r21 = np.full(size, 2.0)
+        r32 = np.full(size, 2.0)
+        order = 2.0 + 0.1 * random.standard_normal(size)
+    else:
+        r21 = 1.02 + 0.01 * random.random(size)
+        r32 = 1.3 + 0.1 * random.random(size)
+        order = 0.5 + 0.2 * random.random(size)
+    # differences of phi = h^p between successive grids, with the grid sizes h1 = 1, h2 = r21 and h3 = r21 r32
+    e21 = np.power(r21, order) - 1.0
+    e32 = np.power(r21 * r32, order) - np.power(r21, order)
+    return e21, e32, r21, r32
+
+
+# = benchmarks =========================================================================================================
+def benchmark_gci():
+    cells, solution = power_law_study(3)
+
+    def run():
+        gci = pyGCS.GCI(dimension=2, simulation_order=2, volume=1.0, cells=cells, solution=solution)
+        gci.get('gci')
+        gci.get('asymptotic_gci')
+        gci.get('extrapolated_value')
+    return run
+
+
+def benchmark_gcs(levels):
+    cells, solution = power_law_study(levels)
+
+    def run():
+        pyGCS.GCS(dimension=2, simulation_order=2, volume=1.0, cells=cells, solution=solution)
+    return run
+
+
+def benchmark_gcs_example(levels):
+    # the studies of the README with 3 and 4 grids, which are the common case of a GCS with one or two GCI studies of a
+    # single quantity and should stay as cheap as a single GCI object per study
+    examples = {
+        3: dict(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=[6.063, 5.972, 5.863]),
+        4: dict(dimension=2, volume=456.745, cells=[31719, 41002, 51383, 67209],
+                solution=[0.00919801, 0.00871879, 0.00852288, 0.00842471]),
+    }
+
+    def run():
+        pyGCS.GCS(**examples[levels])
+    return run
+
+
+def benchmark_order_solver(solver, condition, size):
+    e21, e32, r21, r32 = order_solver_input(condition, size)
+
+    def run():
+        return order_solver.solve(e21, e32, r21, r32, 2.0, solver=solver)
+    return run
+
+
+def benchmark_print_table(output_type, levels):
+    cells, solution = power_law_study(levels)
+    gcs = pyGCS.GCS(dimension=2, simulation_order=2, volume=1.0, cells=cells, solution=solution)
+
+    def run():
+        if output_type == 'parquet':
+            write_report([gcs], io.BytesIO(), output_type)
+        else:
+            write_report([gcs], io.StringIO(), output_type)
+    return run
+
+
+def benchmark_print_table_to_disk(levels, directory):
+    cells, solution = power_law_study(levels)
+    gcs = pyGCS.GCS(dimension=2, simulation_order=2, volume=1.0, cells=cells, solution=solution)
+
+    def run():
+        gcs.print_table(output_type='markdown', output_path=directory)
+    return run
+
+
+def benchmarks(quick, directory):
+    """Yields (name, parameters, callable) for every benchmark, files are written into directory"""
+    yield 'gci', {}, benchmark_gci()
+    for levels in (3, 10, 50) if quick else (3, 5, 10, 20, 50, 100, 200):
+        yield 'gcs', {'levels': levels}, benchmark_gcs(levels)
+    for levels in (3, 4):
+        yield 'gcs_example', {'levels': levels}, benchmark_gcs_example(levels)
+    for solver in order_solver.SOLVERS:
+        for condition in ('well', 'ill'):
+            for size in (1, 1000) if quick else (1, 1000, 100000):
+                yield 'order_solver', {'solver': solver, 'condition': condition, 'size': size}, \
+                    benchmark_order_solver(solver, condition, size)
+    for output_type in ('markdown', 'latex', 'word', 'csv', 'jsonl'):
+        for levels in (10, 200):
+            yield 'print_table', {'output_type': output_type, 'levels': levels}, \
+                benchmark_print_table(output_type, levels)
+    yield 'print_table_to_disk', {'levels': 200}, benchmark_print_table_to_disk(200, directory)
+
+
+# = driver =============================================================================================================
+def measure(function, repeat):
+    result = function()
+    times = []
+    for _ in range(0, repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    entry = {'best': min(times), 'median': statistics.median(times), 'mean': statistics.mean(times), 'repeat': repeat}
+
+    # the iteration count is what makes the order solver expensive, record it alongside the time
+    if isinstance(result, order_solver.OrderSolution):
+        entry['iterations'] = int(np.max(result.iterations))
+        entry['converged'] = float(np.mean(result.converged))
+    return entry
+
+
+def git_revision():
+    # the revision identifies unreleased changes between two versions, it is None outside of a git checkout
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the pyGCS benchmarks and report the timings as JSON')
+    parser.add_argument('--output', default=None, help='file to write the JSON report to, defaults to stdout')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timed calls per benchmark')
+    parser.add_argument('--quick', action='store_true', help='run a reduced set of problem sizes')
+    parser.add_argument('--filter', default=None, help='only run benchmarks whose name contains this string')
+    arguments = parser.parse_args(argv)
+
+    report = {
+        'pyGCS': pyGCS.__version__,
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'benchmarks': [],
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for name, parameters, function in benchmarks(arguments.quick, directory):
+            if arguments.filter is not None and arguments.filter not in name:
+                continue
+            entry = {'name': name, 'parameters': parameters}
+            entry.update(measure(function, arguments.repeat))
+            report['benchmarks'].append(entry)
+            print(name, parameters, f"{entry['median']:.3e} s", file=sys.stderr)
+
+    content = json.dumps(report, indent=2)
+    if arguments.output is None:
+        print(content)
+    else:
+        with open(arguments.output, 'w') as file:
+            file.write(content + '\n')
+
+
+if __name__ == '__main__':
+    main()
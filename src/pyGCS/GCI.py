@@ -1,9 +1,32 @@
-from math import pow, log, fabs
+from math import pow, fabs
+import numpy as np
+from . import instrumentation
+from . import kernels
+from . import order_solver
 
 
 class GCI(object):
     """This class accepts grid parameters as inputs to compute the GCI"""
 
+    # The GCI calculation is split into stages, each given as (stage, input keys, upstream stages, output keys) and
+    # listed in the order in which they are executed. A call to get() only executes the stages required for the
+    # requested key, while a call to set() only invalidates the stages that depend on the key that was changed.
+    stages = (
+        ('sort', ('cells', 'volume', 'grid_size', 'dimension', 'solution'), (),
+         ('cells', 'volume', 'grid_size', 'solution')),
+        ('refinement_ratio', (), ('sort',), ('refinement_ratio',)),
+        ('relative_error', (), ('sort', 'refinement_ratio'), ('relative_error',)),
+        ('apparent_order', ('simulation_order', 'order_solver', 'order_solver_options'),
+         ('refinement_ratio', 'relative_error'), ('order_iterations', 'order_converged', 'order_residual')),
+        ('relative_normalised_error', (), ('sort', 'refinement_ratio'), ()),
+        ('extrapolated_value', (), ('sort', 'refinement_ratio', 'apparent_order'), ('extrapolated_value',)),
+        ('oberkampf_correction', ('oberkampf_correction', 'simulation_order', 'safety_factor'), ('apparent_order',),
+         ('apparent_order', 'safety_factor')),
+        ('gci', (), ('relative_normalised_error', 'refinement_ratio', 'oberkampf_correction'), ('gci',)),
+        ('asymptotic_gci', (), ('refinement_ratio', 'oberkampf_correction', 'gci'), ('asymptotic_gci',)),
+    )
+    upstream_stages = {name: upstream for name, _, upstream, _ in stages}
+
     # = constructor ====================================================================================================
     def __init__(self, **kwargs):
         self.__data = {}
@@ -13,6 +36,10 @@ class GCI(object):
         self.__data['safety_factor'] = 1.25
         if len(self.__data['cells']) == 2:
             self.__data['safety_factor'] = 3.0
+        self.__safety_factor = self.__data['safety_factor']
+
+        # a grid size derived from the volume is recalculated whenever the volume, cells or dimension change
+        self.__grid_size_is_derived = 'grid_size' not in self.__data
 
         if 'simulation_order' not in self.__data:
             self.__data['simulation_order'] = 2
@@ -20,6 +47,13 @@ class GCI(object):
         if 'dimension' not in self.__data:
             self.__data['dimension'] = 3
 
+        # solver used for the apparent order, either a name registered in order_solver.SOLVERS or a callable
+        if 'order_solver' not in self.__data:
+            self.__data['order_solver'] = 'fixed_point'
+
+        if 'order_solver_options' not in self.__data:
+            self.__data['order_solver_options'] = {}
+
         # limit the order in the GCI calculation based on Oberkampf and Roy
         # See: https://doi.org/10.1017/CBO9780511760396.012, page 326, Table 8.1
         if 'oberkampf_correction' not in kwargs:
@@ -29,27 +63,65 @@ class GCI(object):
         if 'oberkampf_correction' in key and 'simulation_order' not in key:
             raise Exception('Order of simulation required if Oberkampf and Roy corrections is to be applied!')
 
+        self.__up_to_date = set()
         self.__data['gci_up_to_date'] = False
 
     # = public API =====================================================================================================
 
     # = private API ====================================================================================================
-    def __calculate_gci(self):
+    def __update(self, stage):
+        if stage in self.__up_to_date:
+            return
+        for upstream_stage in self.upstream_stages[stage]:
+            self.__update(upstream_stage)
+        if instrumentation.recorders:
+            instrumentation.timed_stage(stage, self.__stage_methods()[stage])
+        else:
+            self.__stage_methods()[stage]()
+        self.__up_to_date.add(stage)
+        self.__data['gci_up_to_date'] = 'gci' in self.__up_to_date
+
+    def __update_stages_for(self, key):
+        for name, _, _, outputs in self.stages:
+            if key in outputs:
+                self.__update(name)
+
+    def __invalidate_stages_depending_on(self, key):
+        stale = set()
+        for name, inputs, upstream, outputs in self.stages:
+            if key in inputs or key in outputs or any(stage in stale for stage in upstream):
+                stale.add(name)
+        self.__up_to_date -= stale
+        self.__data['gci_up_to_date'] = 'gci' in self.__up_to_date
+
+    def __stage_methods(self):
+        return {
+            'sort': self.__calculate_representative_grid_size_and_sort,
+            'refinement_ratio': self.__calculate_refinement_ratio,
+            'relative_error': self.__calculate_relative_error,
+            'apparent_order': self.__calculate_order,
+            'relative_normalised_error': self.__calculate_relative_normalised_error,
+            'extrapolated_value': self.__calculate_extrapolated_value,
+            'oberkampf_correction': self.__apply_oberkamp_correction,
+            'gci': self.__calculate_gci_for_each_grid,
+            'asymptotic_gci': self.__calculate_asymptotic_grid_convergence,
+        }
+
+    def __calculate_representative_grid_size_and_sort(self):
         assert len(self.__data['solution']) == 3
         self.__calculate_representative_grid_size()
         self.__sort_input_based_on_grid_size()
-        self.__calculate_refinement_ratio()
-        self.__calculate_relative_error()
-        self.__calculate_order()
-        self.__calculate_relative_normalised_error()
-        self.__calculate_extrapolated_value()
-        self.__apply_oberkamp_correction()
-        self.__calculate_gci_for_each_grid()
-        self.__calculate_asymptotic_grid_convergence()
+
+    def __is_batched(self):
+        # an array of shape (number of grids, quantities...) is processed in a single vectorised pass, where any number
+        # of trailing axes (e.g. points and variables) run over the quantities and are kept in the results
+        return isinstance(self.__data['solution'], np.ndarray) and self.__data['solution'].ndim >= 2
 
     def __sort_input_based_on_grid_size(self):
-        if 'volume' in self.__data:
-            if type(self.__data['volume']) is list:
+        if self.__is_batched():
+            self.__sort_batched_input_based_on_grid_size()
+        elif 'volume' in self.__data:
+            if type(self.__data['volume']) in (list, tuple):
                 assert len(self.__data['volume']) == len(self.__data['cells'])
                 self.__data['cells'], self.__data['grid_size'], self.__data['volume'], self.__data['solution'] = zip(
                     *sorted(zip(self.__data['cells'], self.__data['grid_size'], self.__data['volume'],
@@ -61,11 +133,23 @@ class GCI(object):
             self.__data['cells'], self.__data['grid_size'], self.__data['solution'] = zip(
                 *sorted(zip(self.__data['cells'], self.__data['grid_size'], self.__data['solution']), reverse=True))
 
+    def __sort_batched_input_based_on_grid_size(self):
+        cells, grid_size = self.__data['cells'], self.__data['grid_size']
+        order = sorted(range(0, len(cells)), key=lambda grid: (cells[grid], grid_size[grid]), reverse=True)
+        for key in ('cells', 'grid_size', 'volume'):
+            if key in self.__data and isinstance(self.__data[key], np.ndarray) and self.__data[key].ndim == 1:
+                assert len(self.__data[key]) == len(cells)
+                self.__data[key] = np.asarray(self.__data[key])[order]
+            elif key in self.__data and type(self.__data[key]) in (list, tuple):
+                assert len(self.__data[key]) == len(cells)
+                self.__data[key] = tuple(self.__data[key][grid] for grid in order)
+        self.__data['solution'] = self.__data['solution'][order]
+
     def __calculate_representative_grid_size(self):
-        if ('volume' in self.__data) and ('grid_size' not in self.__data):
+        if ('volume' in self.__data) and (('grid_size' not in self.__data) or self.__grid_size_is_derived):
             self.__data['grid_size'] = []
             for grid in range(0, len(self.__data['cells'])):
-                if type(self.__data['volume']) is list:
+                if type(self.__data['volume']) in (list, tuple) or isinstance(self.__data['volume'], np.ndarray):
                     assert len(self.__data['volume']) == len(self.__data['cells'])
                     volume = self.__data['volume'][grid]
                 else:
@@ -74,6 +158,9 @@ class GCI(object):
                 self.__data['grid_size'].append(h)
 
     def __calculate_refinement_ratio(self):
+        if self.__is_batched():
+            self.__data['refinement_ratio'] = kernels.refinement_ratio(self.__data['grid_size'])
+            return
         self.__data['refinement_ratio'] = []
         assert len(self.__data['grid_size']) == len(self.__data['cells'])
         for grid in range(1, len(self.__data['grid_size'])):
@@ -85,6 +172,9 @@ class GCI(object):
         assert len(self.__data['grid_size']) - 1 == len(self.__data['refinement_ratio'])
 
     def __calculate_relative_error(self):
+        if self.__is_batched():
+            self.__data['relative_error'] = kernels.relative_error(self.__data['solution'])
+            return
         self.__data['relative_error'] = []
         assert len(self.__data['solution']) == len(self.__data['cells'])
         for grid in range(1, len(self.__data['solution'])):
@@ -97,6 +187,11 @@ class GCI(object):
         self.__calculate_apparent_order()
 
     def __calculate_apparent_order(self):
+        if self.__is_batched():
+            e21, e32 = self.__data['relative_error'][0], self.__data['relative_error'][1]
+            r21, r32 = self.__data['refinement_ratio'][0], self.__data['refinement_ratio'][1]
+            self.__find_apparent_order(e21, e32, r21, r32)
+            return
         for grid in range(2, len(self.__data['cells'])):
             e21 = self.__data['relative_error'][grid - 2]
             e32 = self.__data['relative_error'][grid - 1]
@@ -104,40 +199,29 @@ class GCI(object):
             r21 = self.__data['refinement_ratio'][grid - 2]
             r32 = self.__data['refinement_ratio'][grid - 1]
 
-            self.__data['apparent_order'] = self.__find_apparent_order_iteratively(e21, e32, r21, r32)
-
-    def __find_apparent_order_iteratively(self, e21, e32, r21, r32):
-        eps = 1
-        iteration = 1
-        max_iteration = 100
-        norm = 1
-        p = self.__data['simulation_order']
-        while eps > 1e-6:
-            p_old = p
-            s = self.__sign(e32 / e21)
-            q = log((pow(r21, p) - s) / (pow(r32, p) - s))
-            p = (1.0 / log(r21)) * fabs(log(fabs(e32 / e21)) + q)
-
-            residual = p - p_old
-            if iteration == 1:
-                norm = residual
-            iteration += 1
-            eps = residual / norm
-            if iteration == max_iteration:
-                print('WARNING: max number of iterations (' + str(max_iteration) +
-                      ') reached for calculating apparent order p ...')
-                break
-        return p
-
-    def __sign(self, value):
-        if value == 0:
-            return 0
-        elif value > 0:
-            return 1
-        elif value < 0:
-            return 0
+            self.__find_apparent_order(e21, e32, r21, r32)
+
+    def __find_apparent_order(self, e21, e32, r21, r32):
+        # solver statistics are stored alongside the order instead of being printed, see order_solver.OrderSolution
+        result = order_solver.solve(e21, e32, r21, r32, self.__data['simulation_order'],
+                                    solver=self.__data['order_solver'], **self.__data['order_solver_options'])
+        if instrumentation.recorders:
+            instrumentation.order_solver_event(e21, e32, result)
+        if self.__is_batched():
+            self.__apparent_order = result.order
+            self.__data['order_iterations'] = result.iterations
+            self.__data['order_converged'] = result.converged
+            self.__data['order_residual'] = result.residual
+        else:
+            self.__apparent_order = float(result.order)
+            self.__data['order_iterations'] = int(result.iterations)
+            self.__data['order_converged'] = bool(result.converged)
+            self.__data['order_residual'] = float(result.residual)
 
     def __calculate_relative_normalised_error(self):
+        if self.__is_batched():
+            self.__relative_normalised_error = kernels.relative_normalised_error(self.__data['solution'])
+            return
         self.__relative_normalised_error = []
         assert len(self.__data['solution']) == len(self.__data['cells'])
         for grid in range(1, len(self.__data['solution'])):
@@ -147,14 +231,27 @@ class GCI(object):
         assert len(self.__relative_normalised_error) == len(self.__data['refinement_ratio'])
 
     def __calculate_extrapolated_value(self):
+        if self.__is_batched():
+            self.__data['extrapolated_value'] = kernels.extrapolated_value(
+                self.__data['solution'][0], self.__data['solution'][1], self.__data['refinement_ratio'][0],
+                self.__apparent_order)
+            return
         r21 = self.__data['refinement_ratio'][0]
         phi_1 = self.__data['solution'][0]
         phi_2 = self.__data['solution'][1]
-        p = self.__data['apparent_order']
+        p = self.__apparent_order
         self.__data['extrapolated_value'] = (pow(r21, p) * phi_1 - phi_2) / (pow(r21, p) - 1)
 
     def __apply_oberkamp_correction(self):
-        if self.__data['oberkampf_correction']:
+        # starts from the uncorrected order and safety factor so that the correction can be toggled repeatedly
+        self.__data['apparent_order'] = self.__apparent_order
+        self.__data['safety_factor'] = self.__safety_factor
+        if self.__data['oberkampf_correction'] and instrumentation.recorders:
+            instrumentation.oberkampf_correction_event(self.__apparent_order, self.__data['simulation_order'])
+        if self.__data['oberkampf_correction'] and self.__is_batched():
+            self.__data['apparent_order'], self.__data['safety_factor'] = kernels.oberkampf_order(
+                self.__data['apparent_order'], self.__data['simulation_order'])
+        elif self.__data['oberkampf_correction']:
             apparent_order = self.__data['apparent_order']
             simulation_order = self.__data['simulation_order']
 
@@ -169,6 +266,10 @@ class GCI(object):
             self.__data['apparent_order'] = oberkampf_order
 
     def __calculate_gci_for_each_grid(self):
+        if self.__is_batched():
+            self.__data['gci'] = kernels.gci(self.__data['safety_factor'], self.__relative_normalised_error,
+                                             self.__data['refinement_ratio'], self.__data['apparent_order'])
+            return
         self.__data['gci'] = []
         for grid in range(1, len(self.__data['cells'])):
             ea21 = self.__relative_normalised_error[grid - 1]
@@ -179,6 +280,11 @@ class GCI(object):
         assert len(self.__data['gci']) == len(self.__data['cells']) - 1
 
     def __calculate_asymptotic_grid_convergence(self):
+        if self.__is_batched():
+            self.__data['asymptotic_gci'] = kernels.asymptotic_gci(self.__data['gci'][0], self.__data['gci'][1],
+                                                                   self.__data['refinement_ratio'][0],
+                                                                   self.__data['apparent_order'])
+            return
         self.__data['asymptotic_gci'] = []
         for grid in range(2, len(self.__data['cells'])):
             p = self.__data['apparent_order']
@@ -188,25 +294,33 @@ class GCI(object):
             asymptotic_gci = gci32 / (pow(r21, p) * gci21)
             self.__data['asymptotic_gci'] = asymptotic_gci
 
-    def __check_if_gci_is_up_to_date_otherwise_calculate_it(self):
-        if self.__data['gci_up_to_date'] is False:
-            self.__calculate_gci()
-            self.__data['gci_up_to_date'] = True
-
     # = getter =========================================================================================================
     def get_number_of_cells_for_specified_gci_of(self, desired_gci):
-        self.__check_if_gci_is_up_to_date_otherwise_calculate_it()
+        # the GCI scales with h^p, while the number of cells scales with (1 / h)^dimension
+        self.__update('gci')
         p = self.__data['apparent_order']
         gci = self.__data['gci'][0]
         cells = self.__data['cells'][0]
+        if self.__is_batched():
+            r = np.power((gci / desired_gci), 1.0 / p)
+            return np.power(r, self.__data['dimension']) * cells
         r = pow((gci / desired_gci), 1.0 / p)
-        return r * cells
+        return pow(r, self.__data['dimension']) * cells
 
     def get(self, key):
-        self.__check_if_gci_is_up_to_date_otherwise_calculate_it()
+        self.__update_stages_for(key)
         return self.__data[key]
 
     # = setter =========================================================================================================
     def set(self, key, value):
+        if key == 'gci_up_to_date':
+            if value is False:
+                self.__up_to_date.clear()
+            self.__data[key] = 'gci' in self.__up_to_date
+            return
+        if key == 'safety_factor':
+            self.__safety_factor = value
+        if key == 'grid_size':
+            self.__grid_size_is_derived = False
         self.__data[key] = value
-        self.__data['gci_up_to_date'] = False
+        self.__invalidate_stages_depending_on(key)
@@ -1,5 +1,9 @@
 import os
-from .GCI import GCI
+import numpy as np
+from . import instrumentation
+from . import kernels
+from . import order_solver
+from .results import GCSResult
 
 
 class GCS(object):
@@ -11,124 +15,105 @@ class GCS(object):
         assert 'solution' in kwargs
         self.number_of_gci_studies_required = len(kwargs['solution']) - 2
 
-        # setup data structure
-        self.__data = {}
-        self.__data['gci'] = list(range(self.number_of_gci_studies_required))
-        self.__data['cells'] = list(range(self.number_of_gci_studies_required))
-        self.__data['solution'] = list(range(self.number_of_gci_studies_required))
-        self.__data['refinement_ratio'] = list(range(self.number_of_gci_studies_required))
-        self.__data['asymptotic_gci'] = list(range(self.number_of_gci_studies_required))
-        self.__data['apparent_order'] = list(range(self.number_of_gci_studies_required))
-        self.__data['extrapolated_value'] = list(range(self.number_of_gci_studies_required))
-
-        self.__gci = []
+        # results of unchanged inputs are loaded from the cache (a ResultCache or its directory) instead of recomputed
+        cache, cache_key = kwargs.pop('cache', None), None
+        if cache is not None:
+            from .cache import ResultCache
+            cache = cache if isinstance(cache, ResultCache) else ResultCache(cache)
+            cache_key = cache.key(**kwargs)
+        if cache_key is not None:
+            cached_results = cache.load(cache_key)
+            if cached_results is not None:
+                self.__results = cached_results
+                return
+
+        # setup data structure, the results of all studies are stored in contiguous arrays indexed by study
+        solution = kwargs['solution']
+        quantities = solution.shape[1:] if isinstance(solution, np.ndarray) else ()
+        self.__results = GCSResult(self.number_of_gci_studies_required, quantities)
+
+        # while recording, the time of each stage of the GCI calculation is reported as for the GCI class
+        timer = instrumentation.StageTimer() if instrumentation.recorders else None
         kwargs = self.__sort(**kwargs)
-        for study in range(0, self.number_of_gci_studies_required):
-            # create new input arguments
-            new_input = {}
-            for key, value in kwargs.items():
-                if (key == 'solution') or (key == 'cells'):
-                    new_input[key] = value[study:study+3]
-                elif key == 'volume':
-                    if type(key) is list:
-                        new_input[key] = value[study:study+3]
-                    else:
-                        new_input[key] = value
-                else:
-                    new_input[key] = value
-
-            gci_study = GCI(**new_input)
-
-            # gather data
-            self.__data['gci'][study] = gci_study.get('gci')
-            self.__data['cells'][study] = gci_study.get('cells')
-            self.__data['solution'][study] = gci_study.get('solution')
-            self.__data['refinement_ratio'][study] = gci_study.get('refinement_ratio')
-            self.__data['asymptotic_gci'][study] = gci_study.get('asymptotic_gci')
-            self.__data['apparent_order'][study] = gci_study.get('apparent_order')
-            self.__data['extrapolated_value'][study] = gci_study.get('extrapolated_value')
+        if self.number_of_gci_studies_required > 0:
+            self.__evaluate_windows(timer, **kwargs)
+
+        if cache_key is not None:
+            cache.store(cache_key, self.__results)
+
+    def __evaluate_windows(self, timer, **kwargs):
+        # all GCI studies (windows of three successive grids) are evaluated in a single vectorised pass over the sorted
+        # grids, which gives the same results as one GCI object per window. For a few windows of a single quantity, the
+        # apparent order is solved window by window, see kernels.SCALAR_WINDOWS
+        if 'grid_size' in kwargs:
+            grid_size = np.asarray(kwargs['grid_size'], dtype=np.float64)
+        else:
+            grid_size = kernels.representative_grid_size(kwargs['cells'], kwargs['volume'], kwargs.get('dimension', 3))
+        simulation_order = kwargs.get('simulation_order', 2)
+        if timer is not None:
+            timer.lap('sort')
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            result = kernels.evaluate_windows(kwargs['solution'], grid_size, simulation_order,
+                                              kwargs.get('oberkampf_correction', False), 1.25,
+                                              kwargs.get('order_solver', 'fixed_point'),
+                                              kwargs.get('order_solver_options', {}), timer)
+        if instrumentation.recorders:
+            instrumentation.order_solver_event(result['relative_error'][:, 0], result['relative_error'][:, 1],
+                                               order_solver.OrderSolution(result['uncorrected_order'],
+                                                                          result['order_iterations'],
+                                                                          result['order_converged'],
+                                                                          result['order_residual']))
+            if kwargs.get('oberkampf_correction', False):
+                instrumentation.oberkampf_correction_event(result['uncorrected_order'], simulation_order)
+
+        cells = np.asarray(kwargs['cells'], dtype=np.int64)
+        solution = np.asarray(kwargs['solution'], dtype=np.float64)
+        windows = np.arange(self.number_of_gci_studies_required)[:, None] + np.arange(3)[None, :]
+        self.__results.cells[:] = cells[windows]
+        self.__results.solution[:] = solution[windows]
+        for key in ('refinement_ratio', 'gci', 'asymptotic_gci', 'apparent_order', 'extrapolated_value'):
+            getattr(self.__results, key)[:] = result[key]
 
     def __sort(self, **kwargs):
-        if 'volume' in kwargs:
-            if type(kwargs['volume']) is list:
-                assert len(kwargs['volume']) == len(kwargs['cells'])
-                kwargs['cells'], kwargs['volume'], kwargs['solution'] = zip(*sorted(zip(kwargs['cells'],
-                                                                                        kwargs['volume'],
-                                                                                        kwargs['solution']),
-                                                                                    reverse=True))
-            else:
-                kwargs['cells'], kwargs['solution'] = zip(*sorted(zip(kwargs['cells'], kwargs['solution']),
-                                                                  reverse=True))
+        # sorts all inputs given per grid from the finest to the coarsest grid
+        per_grid = [key for key in ('volume', 'grid_size') if type(kwargs.get(key)) in (list, tuple, np.ndarray)]
+        for key in per_grid:
+            assert len(kwargs[key]) == len(kwargs['cells'])
+        order = sorted(range(0, len(kwargs['cells'])), reverse=True,
+                       key=lambda grid: tuple(kwargs[key][grid] for key in ['cells'] + per_grid))
+        for key in ['cells'] + per_grid:
+            kwargs[key] = tuple(kwargs[key][grid] for grid in order)
+        if isinstance(kwargs['solution'], np.ndarray):
+            kwargs['solution'] = kwargs['solution'][order]
         else:
-            kwargs['cells'], kwargs['solution'] = zip(*sorted(zip(kwargs['cells'], kwargs['solution']), reverse=True))
+            kwargs['solution'] = tuple(kwargs['solution'][grid] for grid in order)
         return kwargs
 
     def get(self, key):
-        return self.__data[key]
-
-    def print_table(self, output_type='markdown', output_path=''):
-        if output_type == 'markdown':
-            self.__markdown_table(output_path)
-        elif output_type == 'latex':
-            self.__latex_table(output_path)
-        elif output_type == 'word':
-            self.__word_table(output_path)
-
-    def __markdown_table(self, output_path):
-        table = f"Generated using pyGCS (Grid Convergence Study)\n"
-        table += f"- https://github.com/tomrobin-teschner/pyGCS\n"
-        table += f"- https://pypi.org/project/pygcs/\n\n"
-        table += f"Table 1: Grid convergence study over {self.number_of_gci_studies_required + 2} grids. phi represents the {{INSERT MEANING OF PHI HERE}} and phi_extrapolated its extrapolated value. N_cells is the number of grid elements, r the refinement ration between two successive grids. GCI is the grid convergence index in percent and its asymptotic value is provided by GCI_asymptotic, where a value close to unity indicates a grid independent solution. The order achieved in the simulation is given by p.\n\n"
-        table += f"|        |  phi      |   N_cells   |  r  |  GCI  | GCI_asymptotic |  p   | phi_extrapolated |\n"
-        table += f"|--------|:---------:|:-----------:|:---:|:-----:|:--------------:|:----:|:----------------:|\n"
-        for study in range(0, self.number_of_gci_studies_required):
-            table += f"|        |           |             |     |       |                |      |                  |\n"
-            table += f"| Grid {study+1} | {self.__data['solution'][study][0]:.3e} | {self.__data['cells'][study][0]:11d} | {self.__data['refinement_ratio'][study][0]:.1f} | {100 * self.__data['gci'][study][0]:.2f}% |                |      |                  |\n"
-            table += f"| Grid {study+2} | {self.__data['solution'][study][1]:.3e} | {self.__data['cells'][study][1]:11d} | {self.__data['refinement_ratio'][study][1]:.1f} | {100 * self.__data['gci'][study][1]:.2f}% |      {self.__data['asymptotic_gci'][study]:.3f}     | {self.__data['apparent_order'][study]:.2f} |     {self.__data['extrapolated_value'][study]:.2e}     |\n"
-            table += f"| Grid {study+3} | {self.__data['solution'][study][2]:.3e} | {self.__data['cells'][study][2]:11d} | -   | -     |                |      |                  |\n"
-        table += f"|        |           |             |     |       |                |      |                  |"
-        self.__write_table(table, output_path, "md")
-
-    def __latex_table(self, output_path):
-        table = f"% Generated using pyGCS (Grid Convergence Study)\n"
-        table += f"% - https://github.com/tomrobin-teschner/pyGCS\n"
-        table += f"% - https://pypi.org/project/pygcs/\n\n"
-        table += f"% You have to add the following packages to your preamble to make this table work in your document\n"
-        table += f"% \\usepackage{{booktabs}}\n"
-        table += f"% \\usepackage{{multirow}}\n"
-        table += f"\\begin{{table}}[tbp]\n"
-        table += f"\\caption{{Grid convergence study over {self.number_of_gci_studies_required + 2} grids. $ \\phi $ represents the \\textbf{{INSERT MEANING OF PHI HERE}} and $ \\phi_{{extrapolated}} $ its extrapolated value. $ N_{{cells}} $ is the number of grid elements, $ r $ the refinement ration between two successive grids. $ GCI $ is the grid convergence index in percent and its asymptotic value is provided by $ GCI_{{asymptotic}} $, where a value close to unity indicates a grid independent solution. The order achieved in the simulation is given by $ p $.}}\n"
-        table += f"\\label{{tab:gci_study}}\n"
-        table += f"\\begin{{tabular}}{{@{{}}lccccccc@{{}}}}\n"
-        table += f"\\toprule\n"
-        table += f"& $ \\phi $ & $ N_{{cells}} $ & $ r $ & $ GCI $ & $ GCI_{{asymptotic}} $ & $ p $ & $ \\phi_{{extrapolated}} $ \\\\ \\midrule\n"
-        for study in range(0, self.number_of_gci_studies_required):
-
-            table += f"Grid {study+1} & {self.__data['solution'][study][0]:.3e} & {self.__data['cells'][study][0]} & {self.__data['refinement_ratio'][study][0]:.1f} & {100 * self.__data['gci'][study][0]:.2f}\\%   & \\multirow{{3}}{{*}}{{ {self.__data['asymptotic_gci'][study]:.3f} }} & \\multirow{{3}}{{*}}{{ {self.__data['apparent_order'][study]:.2f} }} & \\multirow{{3}}{{*}}{{ {self.__data['extrapolated_value'][study]:.2e} }} \\\\ \n"
-            table += f"Grid {study+2} & {self.__data['solution'][study][1]:.2e} & {self.__data['cells'][study][1]}  & {self.__data['refinement_ratio'][study][1]:.1f} & {100 * self.__data['gci'][study][1]:.2f}\\% &                       &                      &                       \\\\ \n"
-            if study == self.number_of_gci_studies_required - 1:
-                table += f"Grid {study+3} & {self.__data['solution'][study][2]:.2e} & {self.__data['cells'][study][2]}  & -   & -     &                       &                      &                       \\\\ \\bottomrule \n"
-            else:
-                table += f"Grid {study+3} & {self.__data['solution'][study][2]:.2e} & {self.__data['cells'][study][2]}  & -   & -     &                       &                      &                       \\\\ \\cmidrule(r){{1-8}} \n"
-        table += f"\\end{{tabular}}\n"
-        table += f"\\end{{table}}\n"
-        self.__write_table(table, output_path, "tex")
-
-    def __word_table(self, output_path):
-        table = f"Generated using pyGCS (Grid Convergence Study)\n"
-        table += f"- https://github.com/tomrobin-teschner/pyGCS\n"
-        table += f"- https://pypi.org/project/pygcs/\n\n"
-        table += f"Generate an empty table in word with dimensions 8 (columns) x {1 + 4 * self.number_of_gci_studies_required} (rows), select all cells and copy the content after the caption below into the table\n\n"
-        table += f"Table 1: Grid convergence study over {self.number_of_gci_studies_required + 2} grids. phi represents the {{INSERT MEANING OF PHI HERE}} and phi_extrapolated its extrapolated value. N_cells is the number of grid elements, r the refinement ration between two successive grids. GCI is the grid convergence index in percent and its asymptotic value is provided by GCI_asymptotic, where a value close to unity indicates a grid independent solution. The order achieved in the simulation is given by p.\n"
-        table += f"\tphi\tN_cells\tr\tGCI\tGCI_asymptotic\tp\tphi_extrapolated\n"
-        for study in range(0, self.number_of_gci_studies_required):
-            table += f"Grid {study+1}\t{self.__data['solution'][study][0]:.3e}\t{self.__data['cells'][study][0]:11d}\t{self.__data['refinement_ratio'][study][0]:.1f}\t{100 * self.__data['gci'][study][0]:.2f}%\t\t\t\n"
-            table += f"Grid {study+2}\t{self.__data['solution'][study][1]:.3e}\t{self.__data['cells'][study][1]:11d}\t{self.__data['refinement_ratio'][study][1]:.1f}\t{100 * self.__data['gci'][study][1]:.2f}% \t{self.__data['asymptotic_gci'][study]:.3f}\t{self.__data['apparent_order'][study]:.2f}\t{self.__data['extrapolated_value'][study]:.2e}\n"
-            table += f"Grid {study+3}\t{self.__data['solution'][study][2]:.3e}\t{self.__data['cells'][study][2]:11d}\t\t\t\t\t\n"
-        self.__write_table(table, output_path, "txt")
+        if self.__results.quantities():
+            return self.__results.get(key)
+        return self.__results.get_as_list(key)
+
+    def results(self):
+        return self.__results
+
+    def to_frame(self):
+        """Returns the results in long format as a pandas DataFrame, see GCSResult.to_columns()"""
+        return self.__results.to_frame()
+
+    def to_arrow(self):
+        """Returns the results in long format as a pyarrow Table, see GCSResult.to_columns()"""
+        return self.__results.to_arrow()
 
     @staticmethod
-    def __write_table(content, output_path, extension):
-        file = open(os.path.join(output_path, 'table.' + extension), 'w')
-        file.write(content)
-        file.close()
+    def batch(cases, workers=None, chunk_size=None, instrument=False):
+        """Runs many independent cases, each given as a dictionary of constructor arguments, in parallel"""
+        from .batch import run
+        return run(cases, workers=workers, chunk_size=chunk_size, instrument=instrument)
+
+    def print_table(self, output_type='markdown', output_path='', file_name='table', label=None):
+        """Writes the results into output_path/file_name.<extension>, see report.WRITERS for all output types"""
+        from .report import get_writer, write_report
+        extension = get_writer(output_type).extension
+        write_report([self], os.path.join(output_path, file_name + '.' + extension), output_type,
+                     labels=None if label is None else [label])
@@ -1,2 +1,22 @@
+__version__ = '1.1.1'
+
+import importlib
+
 from .GCI import GCI
 from .GCS import GCS
+from .field import FieldGCI
+from .uncertainty import MonteCarloGCI
+from .streaming import StreamingGCI
+from .least_squares import LeastSquaresGCI
+from .planner import RefinementPlanner, PowerLawCost
+from .summary import FieldSummary
+
+
+# the watcher and the server import asyncio, which is only loaded once they are used, so that e.g. the pygcs command
+# starts with nothing beyond numpy and the standard library
+def __getattr__(name):
+    if name == 'CaseWatcher':
+        return importlib.import_module('.watcher', __name__).CaseWatcher
+    if name in ('watcher', 'server'):
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
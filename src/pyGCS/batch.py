@@ -0,0 +1,147 @@
+import math
+import os
+import numpy as np
+from .GCS import GCS
+from .instrumentation import Recorder
+from .results import GCSResult, as_arrow, as_frame
+
+
+class BatchResult(object):
+    """This class collects the results of many independent GCS cases into one columnar result set"""
+
+    # = constructor ====================================================================================================
+    def __init__(self, number_of_cases, outcomes, instrumentation=None):
+        self.number_of_cases = number_of_cases
+        self.errors = {}
+
+        # the Recorder of all worker processes merged into one, if the batch was run with instrument=True
+        self.instrumentation = instrumentation
+
+        # one row per case and GCI study. Cases are combined per shape of their quantities, as e.g. a case with a
+        # single quantity can not be stacked with a case with an array of quantities
+        groups = {}
+        self.__cases = {}
+        for case, outcome in sorted(outcomes, key=lambda item: item[0]):
+            if isinstance(outcome, str):
+                self.errors[case] = outcome
+                continue
+            groups.setdefault(outcome.quantities(), []).append((case, outcome))
+            self.__cases[case] = outcome
+
+        self.__groups = []
+        for group in groups.values():
+            data = {
+                'case': np.concatenate([np.full(result.number_of_studies(), case, dtype=np.int64)
+                                        for case, result in group]),
+                'study': np.concatenate([np.arange(result.number_of_studies(), dtype=np.int64) for _, result in group]),
+            }
+            self.__groups.append((data, GCSResult.concatenate([result for _, result in group])))
+
+    # = private API ====================================================================================================
+    def __combined(self):
+        if len(self.__groups) > 1:
+            raise Exception('The cases have quantities of different shapes and can not be combined into one array, use '
+                            'results(case) or to_columns() instead')
+        if not self.__groups:
+            return {'case': np.zeros(0, dtype=np.int64), 'study': np.zeros(0, dtype=np.int64)}, GCSResult(0)
+        return self.__groups[0]
+
+    # = getter =========================================================================================================
+    def get(self, key):
+        data, results = self.__combined()
+        if key in data:
+            return data[key]
+        return results.get(key)
+
+    def results(self, case=None):
+        """Returns the results of all successful cases, or of a single case if case is given"""
+        if case is not None:
+            return self.__cases[case]
+        return self.__combined()[1]
+
+    def succeeded(self):
+        return [case for case in range(0, self.number_of_cases) if case not in self.errors]
+
+    def to_columns(self, parameters=None):
+        """Returns the results in long format, one row per case, study, grid and quantity, see GCSResult.to_columns()
+
+        Studies and grids are numbered within each case. parameters maps the name of a case parameter (e.g. the angle of
+        attack) to a sequence with its value for each case, which is added as a column for filtering and grouping.
+        """
+        groups = []
+        for data, results in self.__groups:
+            columns = results.to_columns()
+            row = columns['study']
+            study = data['study'][row]
+            case_columns = {'case': data['case'][row]}
+            for name, values in (parameters or {}).items():
+                values = np.asarray(values)
+                assert len(values) == self.number_of_cases
+                case_columns[name] = values[case_columns['case']]
+            columns['grid'] = columns['grid'] - row + study
+            columns['study'] = study
+            case_columns.update(columns)
+            groups.append(case_columns)
+        if len(groups) == 1:
+            return groups[0]
+        if not groups:
+            return self.__combined()[1].to_columns()
+
+        # rows of cases with quantities of different shapes are merged in the order of the cases
+        order = np.argsort(np.concatenate([columns['case'] for columns in groups]), kind='stable')
+        return {name: np.concatenate([columns[name] for columns in groups])[order] for name in groups[0]}
+
+    def to_frame(self, parameters=None):
+        """Returns the results of to_columns() as a pandas DataFrame, requires pandas"""
+        return as_frame(self.to_columns(parameters))
+
+    def to_arrow(self, parameters=None):
+        """Returns the results of to_columns() as a pyarrow Table, requires pyarrow"""
+        return as_arrow(self.to_columns(parameters))
+
+
+def run(cases, workers=None, chunk_size=None, instrument=False):
+    """Runs each case (a dictionary of GCS arguments) on a pool of worker processes and returns a BatchResult"""
+    cases = list(cases)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if chunk_size is None:
+        # a few chunks per worker balance the load without paying the submission overhead for every case
+        chunk_size = max(1, math.ceil(len(cases) / (4 * workers)))
+
+    numbered_cases = list(enumerate(cases))
+    chunks = [(numbered_cases[start:start + chunk_size], instrument) for start in range(0, len(cases), chunk_size)]
+    if workers <= 1 or len(chunks) <= 1:
+        chunk_results = [_run_chunk(chunk) for chunk in chunks]
+    else:
+        # imported here as the process pool adds to the startup time of serial runs, e.g. of the command line tool
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunk_results = list(executor.map(_run_chunk, chunks))
+
+    outcomes = []
+    instrumentation = Recorder() if instrument else None
+    for chunk_outcomes, recorder in chunk_results:
+        outcomes.extend(chunk_outcomes)
+        if instrument:
+            instrumentation.merge(recorder)
+    return BatchResult(len(cases), outcomes, instrumentation)
+
+
+def _run_chunk(arguments):
+    chunk, instrument = arguments
+    outcomes = []
+    recorder = Recorder() if instrument else None
+    if instrument:
+        recorder.start()
+    try:
+        for case, kwargs in chunk:
+            try:
+                outcomes.append((case, GCS(**kwargs).results()))
+            except Exception as error:
+                # a failing case is reported in the result set instead of aborting the whole batch
+                outcomes.append((case, type(error).__name__ + ': ' + str(error)))
+    finally:
+        if instrument:
+            recorder.stop()
+    return outcomes, recorder
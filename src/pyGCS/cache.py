@@ -0,0 +1,167 @@
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+from .results import GCSResult
+
+try:
+    import fcntl
+
+    def _lock_file(file):
+        fcntl.flock(file, fcntl.LOCK_EX)
+
+    def _unlock_file(file):
+        fcntl.flock(file, fcntl.LOCK_UN)
+except ImportError:
+    # Windows
+    import msvcrt
+
+    def _lock_file(file):
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(file):
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# Persistent cache of GCS results, keyed by a hash of the normalised inputs and the library version. Each entry is
+# stored as a .npz file named after its key. Entries are written to a temporary file first and then renamed, so that
+# other processes never read a partially written entry. The modification time of an entry is updated on every hit and
+# the least recently used entries are removed once the size of the cache exceeds its limit.
+
+# inputs which determine the results of a grid convergence study, together with their default values
+CACHED_INPUTS = {
+    'cells': None,
+    'solution': None,
+    'volume': None,
+    'grid_size': None,
+    'dimension': 3,
+    'simulation_order': 2,
+    'oberkampf_correction': False,
+    'order_solver': 'fixed_point',
+    'order_solver_options': {},
+}
+
+
+class ResultCache(object):
+    """This class stores GCS results on disk so that unchanged studies do not have to be recomputed"""
+
+    # = constructor ====================================================================================================
+    def __init__(self, path, max_size=2 ** 28):
+        # max_size is the limit of the total size of all entries in bytes
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.path, exist_ok=True)
+
+    # = public API =====================================================================================================
+    def key(self, **kwargs):
+        """Returns the hash of the inputs, or None if they can not be cached (e.g. a custom order solver)"""
+        from . import __version__
+        if callable(kwargs.get('order_solver')):
+            return None
+        digest = hashlib.sha256(__version__.encode())
+        for name, default in CACHED_INPUTS.items():
+            value = kwargs.get(name, default)
+            if isinstance(value, np.ndarray):
+                value = np.ascontiguousarray(value, dtype=np.float64)
+                digest.update(json.dumps([name, 'array', value.shape]).encode())
+                digest.update(value.tobytes())
+            else:
+                digest.update(json.dumps([name, _normalise(value)], sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def load(self, key):
+        """Returns the cached GCSResult stored under key, or None if there is none"""
+        try:
+            with np.load(self.__entry(key)) as arrays:
+                result = GCSResult.from_arrays(arrays)
+            os.utime(self.__entry(key))
+        except (OSError, ValueError, KeyError):
+            # the entry does not exist, was evicted by another process in the meantime or is corrupt
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def store(self, key, result):
+        descriptor, temporary = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        with os.fdopen(descriptor, 'wb') as file:
+            np.savez(file, **{name: result.get(name) for name in GCSResult.keys})
+        os.replace(temporary, self.__entry(key))
+        self.__evict()
+
+    def statistics(self):
+        entries = self.__entries()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(entries),
+            'size': sum(size for _, size, _ in entries),
+        }
+
+    def clear(self):
+        with self.__lock():
+            for entry, _, _ in self.__entries():
+                _remove(entry)
+
+    # = private API ====================================================================================================
+    def __entry(self, key):
+        return os.path.join(self.path, key + '.npz')
+
+    def __entries(self):
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith('.npz'):
+                try:
+                    status = entry.stat()
+                except OSError:
+                    continue
+                entries.append((entry.path, status.st_size, status.st_mtime))
+        return entries
+
+    def __evict(self):
+        with self.__lock():
+            entries = self.__entries()
+            size = sum(entry_size for _, entry_size, _ in entries)
+            for entry, entry_size, _ in sorted(entries, key=lambda entry: entry[2]):
+                if size <= self.max_size:
+                    break
+                if _remove(entry):
+                    self.evictions += 1
+                size -= entry_size
+
+    @contextlib.contextmanager
+    def __lock(self):
+        # serialises the eviction of several processes sharing the same cache directory
+        with open(os.path.join(self.path, '.lock'), 'a+b') as file:
+            _lock_file(file)
+            try:
+                yield
+            finally:
+                _unlock_file(file)
+
+
+def _normalise(value):
+    # lists and tuples of numbers give the same key, as do integers and floats of the same value
+    if isinstance(value, (list, tuple)):
+        return [_normalise(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _normalise(item) for key, item in value.items()}
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    return float(value)
+
+
+def _remove(entry):
+    try:
+        os.remove(entry)
+        return True
+    except OSError:
+        return False
@@ -0,0 +1,135 @@
+import argparse
+import csv
+import json
+import os
+import sys
+
+
+# Command line interface to run many grid convergence studies from case files, installed as the pygcs command:
+#
+#     pygcs cases.yaml --output-type csv --output results.csv --workers 8
+#
+# As the command is launched for every post-processing job, nothing beyond numpy and the standard library is imported at
+# startup. Optional dependencies (yaml, pyarrow) are only imported if the input or output format requires them and the
+# process pool only if more than one worker is used.
+
+INPUT_FORMATS = {'.json': 'json', '.yaml': 'yaml', '.yml': 'yaml', '.csv': 'csv'}
+
+# columns of a csv case file which hold one value per grid, all other columns hold settings of the case
+GRID_COLUMNS = ('cells', 'solution', 'volume', 'grid_size')
+
+
+def main(argv=None):
+    arguments = _parse_arguments(argv)
+
+    cases, names = [], []
+    for path in arguments.cases:
+        for case in read_cases(path, arguments.format):
+            names.append(str(case.pop('name', len(names))))
+            if arguments.cache is not None:
+                case['cache'] = arguments.cache
+            cases.append(case)
+
+    from .batch import run
+    result = run(_as_arrays(cases), workers=arguments.workers)
+    for case, error in sorted(result.errors.items()):
+        print(f"pygcs: case {names[case]} failed: {error}", file=sys.stderr)
+
+    succeeded = result.succeeded()
+    write_results(arguments.output, arguments.output_type, [result.results(case) for case in succeeded],
+                  [names[case] for case in succeeded])
+    return 1 if result.errors else 0
+
+
+def read_cases(path, input_format=None):
+    """Returns the list of cases, each a dictionary of GCS arguments, stored in path ('-' reads from stdin)"""
+    if input_format is None:
+        input_format = 'json' if path == '-' else INPUT_FORMATS.get(os.path.splitext(path)[1].lower())
+    if input_format is None:
+        raise Exception('Unknown format of case file ' + path + ', use --format to specify it')
+
+    file = sys.stdin if path == '-' else open(path, newline='' if input_format == 'csv' else None)
+    try:
+        if input_format == 'csv':
+            return _read_csv_cases(file)
+        if input_format == 'yaml':
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError('pyyaml is required to read yaml case files')
+            data = yaml.safe_load(file)
+        else:
+            data = json.load(file)
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+    # either a list of cases, a dictionary with a list of cases or a single case
+    if isinstance(data, dict):
+        data = data['cases'] if 'cases' in data else [data]
+    return [dict(case) for case in data]
+
+
+def write_results(output, output_type, results, names):
+    from .report import get_writer, write_report
+    if output != '-':
+        write_report(results, output, output_type, labels=names)
+    elif get_writer(output_type).binary:
+        write_report(results, sys.stdout.buffer, output_type, labels=names)
+    else:
+        write_report(results, sys.stdout, output_type, labels=names)
+        if output_type == 'markdown':
+            sys.stdout.write('\n')
+
+
+def _parse_arguments(argv):
+    parser = argparse.ArgumentParser(prog='pygcs', description='Performs grid convergence studies for all cases in the '
+                                                               'case files and writes the results into a single report')
+    parser.add_argument('cases', nargs='+', help='case files (json, yaml or csv), use - to read json from stdin')
+    parser.add_argument('-f', '--format', choices=sorted(set(INPUT_FORMATS.values())), default=None,
+                        help='format of the case files, determined from the file extension by default')
+    parser.add_argument('-t', '--output-type', default='markdown',
+                        choices=['markdown', 'latex', 'word', 'csv', 'jsonl', 'parquet'], help='format of the report')
+    parser.add_argument('-o', '--output', default='-', help='file to write the report to, defaults to stdout')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='number of worker processes')
+    parser.add_argument('-c', '--cache', default=None, help='directory of a result cache shared between runs')
+    return parser.parse_args(argv)
+
+
+def _read_csv_cases(file):
+    # one row per grid, rows are grouped into cases by the optional 'case' column
+    cases = {}
+    for row in csv.DictReader(file):
+        name = row.pop('case', None) or '0'
+        if name not in cases:
+            cases[name] = {'name': name}
+            cases[name].update({key: _parse_value(value) for key, value in row.items()
+                                if key not in GRID_COLUMNS and value not in (None, '')})
+        for key in GRID_COLUMNS:
+            if row.get(key) not in (None, ''):
+                cases[name].setdefault(key, []).append(_parse_value(row[key]))
+    return list(cases.values())
+
+
+def _parse_value(value):
+    for parse in (int, float):
+        try:
+            return parse(value)
+        except ValueError:
+            pass
+    if value.lower() in ('true', 'false'):
+        return value.lower() == 'true'
+    return value
+
+
+def _as_arrays(cases):
+    # solutions with more than one quantity per grid are processed as arrays, see GCS
+    import numpy as np
+    for case in cases:
+        if 'solution' in case and any(isinstance(value, (list, tuple)) for value in case['solution']):
+            case['solution'] = np.asarray(case['solution'], dtype=np.float64)
+    return cases
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,230 @@
+import os
+import numpy as np
+from . import kernels
+from .summary import FieldSummary
+
+
+# output fields, each written into <output_path>/<key>.npy
+OUTPUTS = ('apparent_order', 'extrapolated_value', 'gci', 'precision_loss')
+
+
+class FieldGCI(object):
+    """This class computes the local (point-wise) GCI of solution fields which are streamed from and to disk in chunks"""
+
+    # = constructor ====================================================================================================
+    def __init__(self, **kwargs):
+        self.__data = {}
+        for key, value in kwargs.items():
+            self.__data[key] = value
+
+        # the fields need to be sampled at common points already, see pyGCS.interpolation if they are not
+        assert 'solution' in self.__data
+        assert len(self.__data['solution']) == 3
+        assert len(self.__data['cells']) == 3
+
+        kernels.set_default_options(self.__data)
+
+        # number of points processed at once, which bounds the peak memory independent of the field size
+        if 'chunk_size' not in self.__data:
+            self.__data['chunk_size'] = 2 ** 20
+
+        # data type of raw binary input files, .npy files carry their own data type
+        if 'input_dtype' not in self.__data:
+            self.__data['input_dtype'] = np.float64
+
+        if 'output_path' not in self.__data:
+            self.__data['output_path'] = '.'
+
+        # number of worker processes. With more than one worker, the input fields are copied into shared memory and
+        # the points are split into slices, which each worker evaluates and writes directly into the output files
+        if 'workers' not in self.__data:
+            self.__data['workers'] = 1
+
+        # data type in which the outputs are stored. The fields are always read (and held in shared memory) in their own
+        # data type, so that the results do not depend on the number of workers, and the differences of the solutions
+        # and the apparent order are computed in float64 for each chunk
+        if 'dtype' not in self.__data:
+            self.__data['dtype'] = np.float64
+        assert np.dtype(self.__data['dtype']) in (np.float32, np.float64)
+
+        # points whose differences of the solutions carry a larger relative rounding error than the threshold, due to
+        # the precision of the stored fields, are marked in precision_loss.npy
+        if 'precision_threshold' not in self.__data:
+            self.__data['precision_threshold'] = 1e-3
+
+        # with summary=True (or a dictionary of FieldSummary arguments), the results are summarised while they are
+        # computed, see get('summary')
+        if 'summary' not in self.__data:
+            self.__data['summary'] = False
+
+        self.__data['gci_up_to_date'] = False
+
+    # = private API ====================================================================================================
+    def __calculate_gci(self):
+        # the grids sorted from the finest to the coarsest grid
+        order = sorted(range(0, 3), key=lambda grid: self.__data['cells'][grid], reverse=True)
+        fields = self.__open_fields(order)
+        grid_size = kernels.sorted_grid_size(self.__data, order)
+        self.__data['refinement_ratio'] = kernels.refinement_ratio(grid_size)
+
+        points = len(fields[0])
+        outputs = self.__open_outputs(points)
+        options = self.__kernel_options(grid_size)
+        summary = _create_summary(options)
+        if self.__data['workers'] > 1 and points > self.__data['workers']:
+            lost = self.__calculate_gci_in_parallel(fields, points, options, summary)
+        else:
+            lost = _evaluate_slice(fields, outputs, 0, points, options, summary)
+        self.__data['precision_loss_points'] = lost
+        self.__data['field_summary'] = summary
+        for output in outputs.values():
+            output.flush()
+
+    def __calculate_gci_in_parallel(self, fields, points, options, summary):
+        # imported here as the process pool adds to the startup time
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import shared_memory
+
+        chunk_size = self.__data['chunk_size']
+        dtype = np.result_type(*fields)
+        if not np.issubdtype(dtype, np.floating):
+            dtype = np.dtype(np.float64)
+        memory = shared_memory.SharedMemory(create=True, size=3 * points * dtype.itemsize)
+        try:
+            solution = np.ndarray((3, points), dtype=dtype, buffer=memory.buf)
+            for start in range(0, points, chunk_size):
+                stop = min(start + chunk_size, points)
+                for grid, field in enumerate(fields):
+                    solution[grid, start:stop] = field[start:stop]
+
+            # a few slices per worker balance the load, only the name of the shared memory and of the output files are
+            # sent to the workers, never the arrays themselves
+            workers = self.__data['workers']
+            bounds = np.linspace(0, points, 4 * workers + 1).astype(np.int64)
+            output_files = {key: self.__output_file(key) for key in OUTPUTS}
+            tasks = [(memory.name, dtype.name, points, output_files, int(start), int(stop), options)
+                     for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+            lost = 0
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for slice_lost, slice_summary in executor.map(_run_slice, tasks):
+                    lost += slice_lost
+                    if summary is not None:
+                        summary.merge(slice_summary)
+            del solution
+        finally:
+            memory.close()
+            memory.unlink()
+        return lost
+
+    def __kernel_options(self, grid_size):
+        return {
+            'grid_size': grid_size,
+            'simulation_order': self.__data['simulation_order'],
+            'oberkampf_correction': self.__data['oberkampf_correction'],
+            'safety_factor': self.__data['safety_factor'],
+            'order_solver': self.__data['order_solver'],
+            'order_solver_options': self.__data['order_solver_options'],
+            'chunk_size': self.__data['chunk_size'],
+            'precision_threshold': self.__data['precision_threshold'],
+            'summary': self.__data['summary'],
+        }
+
+    def __open_fields(self, order):
+        fields = [self.__open_field(field) for field in self.__data['solution']]
+        assert all(len(field) == len(fields[0]) for field in fields)
+        return [fields[grid] for grid in order]
+
+    def __open_field(self, field):
+        if isinstance(field, np.ndarray):
+            return field.reshape(-1)
+        if str(field).endswith('.npy'):
+            return np.load(field, mmap_mode='r').reshape(-1)
+        return np.memmap(field, dtype=self.__data['input_dtype'], mode='r')
+
+    def __open_outputs(self, points):
+        os.makedirs(self.__data['output_path'], exist_ok=True)
+        outputs = {}
+        for key, shape in (('apparent_order', (points,)), ('extrapolated_value', (points,)), ('gci', (2, points))):
+            outputs[key] = np.lib.format.open_memmap(self.__output_file(key), mode='w+', dtype=self.__data['dtype'],
+                                                     shape=shape)
+        outputs['precision_loss'] = np.lib.format.open_memmap(self.__output_file('precision_loss'), mode='w+',
+                                                              dtype=np.bool_, shape=(points,))
+        return outputs
+
+    def __output_file(self, key):
+        return os.path.join(self.__data['output_path'], key + '.npy')
+
+    def __check_if_gci_is_up_to_date_otherwise_calculate_it(self):
+        if self.__data['gci_up_to_date'] is False:
+            self.__calculate_gci()
+            self.__data['gci_up_to_date'] = True
+
+    # = getter =========================================================================================================
+    def get(self, key):
+        self.__check_if_gci_is_up_to_date_otherwise_calculate_it()
+        if key in OUTPUTS:
+            return np.load(self.__output_file(key), mmap_mode='r')
+        if key == 'summary':
+            return self.__data['field_summary']
+        return self.__data[key]
+
+    # = setter =========================================================================================================
+    def set(self, key, value):
+        self.__data[key] = value
+        self.__data['gci_up_to_date'] = False
+
+
+def _evaluate_slice(fields, outputs, start, stop, options, summary=None):
+    # evaluates the points start to stop of the fields (sorted from the finest to the coarsest grid) in chunks, adds
+    # them to the summary and returns the number of points with a loss of precision due to the data type of the fields
+    epsilon = max([np.finfo(np.float64).eps] + [np.finfo(field.dtype).eps for field in fields
+                                                if np.issubdtype(field.dtype, np.floating)])
+    lost = 0
+    for chunk_start in range(start, stop, options['chunk_size']):
+        chunk_stop = min(chunk_start + options['chunk_size'], stop)
+        solution = np.stack([np.asarray(field[chunk_start:chunk_stop], dtype=np.float64) for field in fields])
+        loss = _precision_loss(solution, epsilon) > options['precision_threshold']
+        outputs['precision_loss'][chunk_start:chunk_stop] = loss
+        lost += int(np.count_nonzero(loss))
+        result = kernels.evaluate_triplet(solution, options['grid_size'], options['simulation_order'],
+                                          options['oberkampf_correction'], options['safety_factor'],
+                                          options['order_solver'], options['order_solver_options'])
+        outputs['apparent_order'][chunk_start:chunk_stop] = result['apparent_order']
+        outputs['extrapolated_value'][chunk_start:chunk_stop] = result['extrapolated_value']
+        outputs['gci'][:, chunk_start:chunk_stop] = result['gci']
+        if summary is not None:
+            summary.update(result, chunk_start)
+    return lost
+
+
+def _create_summary(options):
+    if options['summary'] is False or options['summary'] is None:
+        return None
+    return FieldSummary(**(options['summary'] if isinstance(options['summary'], dict) else {}))
+
+
+def _precision_loss(solution, epsilon):
+    # bound of the relative rounding error of the differences phi_1 - phi_2 and phi_2 - phi_3, given the precision
+    # epsilon of the stored solutions. It is infinite if equal non-zero solutions leave no significant digit at all
+    with np.errstate(divide='ignore', invalid='ignore'):
+        magnitude = np.fabs(solution[:-1]) + np.fabs(solution[1:])
+        difference = np.fabs(solution[:-1] - solution[1:])
+        return np.max(np.where(magnitude > 0.0, epsilon * magnitude / difference, 0.0), axis=0)
+
+
+def _run_slice(arguments):
+    # runs in a worker process, which attaches to the shared input fields and maps the output files
+    from multiprocessing import shared_memory
+    name, dtype, points, output_files, start, stop, options = arguments
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        solution = np.ndarray((3, points), dtype=dtype, buffer=memory.buf)
+        outputs = {key: np.load(path, mmap_mode='r+') for key, path in output_files.items()}
+        summary = _create_summary(options)
+        lost = _evaluate_slice(solution, outputs, start, stop, options, summary)
+        for output in outputs.values():
+            output.flush()
+        del solution, outputs
+    finally:
+        memory.close()
+    return lost, summary
@@ -0,0 +1,151 @@
+import time
+import numpy as np
+
+
+# Opt-in instrumentation of the GCI calculation. While a Recorder is active (used as a context manager or started and
+# stopped explicitly), every GCI and GCS object reports the wall time of each stage it executes, the statistics of the
+# apparent order solver and the diagnostic flags below. Without an active recorder, GCI and GCS only check whether the
+# list of active recorders is empty, so that no time is spent on instrumentation.
+#
+#     with Recorder() as recorder:
+#         gcs = GCS(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=[6.063, 5.972, 5.863])
+#     recorder.summary()
+#
+# Flags:
+# - oscillatory: the relative errors e21 and e32 have a different sign, i.e. the solution converges oscillatory
+# - not_converged: the apparent order solver did not converge
+# - clamped: the Oberkampf and Roy correction limited the apparent order to the range [0.5, simulation order]
+
+# recorders currently receiving events, checked by GCI before any instrumentation work is done
+recorders = []
+
+
+class Recorder(object):
+    """This class aggregates the events of all GCI calculations performed while it is active"""
+
+    # = constructor ====================================================================================================
+    def __init__(self, callback=None):
+        # the callback, if provided, receives every event as a dictionary, e.g. to log or trace individual studies
+        self.callback = callback
+        self.stages = {}
+        self.order_solver = {'calls': 0, 'triplets': 0, 'iterations': 0, 'max_iterations': 0, 'max_residual': 0.0,
+                             'not_converged': 0, 'oscillatory': 0}
+        self.oberkampf_correction = {'calls': 0, 'triplets': 0, 'clamped': 0}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def __getstate__(self):
+        # callbacks are usually not picklable, only the aggregated data is sent back from worker processes
+        state = dict(self.__dict__)
+        state['callback'] = None
+        return state
+
+    # = public API =====================================================================================================
+    def start(self):
+        recorders.append(self)
+
+    def stop(self):
+        if self in recorders:
+            recorders.remove(self)
+
+    def record(self, event):
+        if event['event'] == 'stage':
+            stage = self.stages.setdefault(event['stage'], {'calls': 0, 'time': 0.0, 'max_time': 0.0})
+            stage['calls'] += 1
+            stage['time'] += event['time']
+            stage['max_time'] = max(stage['max_time'], event['time'])
+        elif event['event'] == 'order_solver':
+            self.order_solver['calls'] += 1
+            self.order_solver['triplets'] += event['triplets']
+            self.order_solver['iterations'] += event['iterations']
+            self.order_solver['max_iterations'] = max(self.order_solver['max_iterations'], event['max_iterations'])
+            self.order_solver['max_residual'] = max(self.order_solver['max_residual'], event['max_residual'])
+            self.order_solver['not_converged'] += event['not_converged']
+            self.order_solver['oscillatory'] += event['oscillatory']
+        elif event['event'] == 'oberkampf_correction':
+            self.oberkampf_correction['calls'] += 1
+            self.oberkampf_correction['triplets'] += event['triplets']
+            self.oberkampf_correction['clamped'] += event['clamped']
+        if self.callback is not None:
+            self.callback(event)
+
+    def merge(self, other):
+        """Adds the data of another recorder, e.g. one that was active in a worker process of a batch run"""
+        for name, other_stage in other.stages.items():
+            stage = self.stages.setdefault(name, {'calls': 0, 'time': 0.0, 'max_time': 0.0})
+            stage['calls'] += other_stage['calls']
+            stage['time'] += other_stage['time']
+            stage['max_time'] = max(stage['max_time'], other_stage['max_time'])
+        for key, value in other.order_solver.items():
+            if key.startswith('max_'):
+                self.order_solver[key] = max(self.order_solver[key], value)
+            else:
+                self.order_solver[key] += value
+        for key, value in other.oberkampf_correction.items():
+            self.oberkampf_correction[key] += value
+        return self
+
+    def summary(self):
+        """Returns all aggregated data as a dictionary of plain python values (e.g. to be written as JSON)"""
+        order_solver = dict(self.order_solver)
+        order_solver['mean_iterations'] = order_solver['iterations'] / max(order_solver['triplets'], 1)
+        return {
+            'stages': {name: dict(stage) for name, stage in self.stages.items()},
+            'total_time': sum(stage['time'] for stage in self.stages.values()),
+            'order_solver': order_solver,
+            'oberkampf_correction': dict(self.oberkampf_correction),
+        }
+
+
+# = event helpers used by GCI, only called while at least one recorder is active =======================================
+def emit(event):
+    for recorder in recorders:
+        recorder.record(event)
+
+
+def timed_stage(stage, method):
+    start = time.perf_counter()
+    method()
+    emit({'event': 'stage', 'stage': stage, 'time': time.perf_counter() - start})
+
+
+class StageTimer(object):
+    """Emits the time since the previous lap as a stage, for code which evaluates several stages in a single pass"""
+
+    # = constructor ====================================================================================================
+    def __init__(self):
+        self.__start = time.perf_counter()
+
+    # = public API =====================================================================================================
+    def lap(self, stage):
+        now = time.perf_counter()
+        emit({'event': 'stage', 'stage': stage, 'time': now - self.__start})
+        self.__start = now
+
+
+def order_solver_event(e21, e32, solution):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        oscillatory = np.asarray(e32 / e21) < 0
+    emit({
+        'event': 'order_solver',
+        'triplets': int(np.size(solution.order)),
+        'iterations': int(np.sum(solution.iterations)),
+        'max_iterations': int(np.max(solution.iterations)),
+        'max_residual': float(np.nanmax(solution.residual)) if np.any(np.isfinite(solution.residual)) else 0.0,
+        'not_converged': int(np.sum(~np.asarray(solution.converged))),
+        'oscillatory': int(np.sum(oscillatory)),
+    })
+
+
+def oberkampf_correction_event(apparent_order, simulation_order):
+    apparent_order = np.asarray(apparent_order)
+    emit({
+        'event': 'oberkampf_correction',
+        'triplets': int(apparent_order.size),
+        'clamped': int(np.sum((apparent_order < 0.5) | (apparent_order > simulation_order))),
+    })
@@ -0,0 +1,85 @@
+import hashlib
+import numpy as np
+
+
+class Interpolator(object):
+    """This class interpolates solutions of non-matching grids onto a common set of points for a point-wise GCI"""
+
+    # = constructor ====================================================================================================
+    def __init__(self, points, neighbours=4, power=2.0, batch_size=2 ** 18):
+        # one array of shape (number of points, dimension) for each grid level, in the same order as the solutions
+        self.__points = [np.ascontiguousarray(level, dtype=np.float64) for level in points]
+        assert len(self.__points) >= 2
+        self.__neighbours = neighbours
+        self.__power = power
+        self.__batch_size = batch_size
+
+        # the spatial index of each grid and the neighbour weights of each target point set are built once and reused
+        # for every field interpolated between the same meshes
+        self.__trees = {}
+        self.__weights = {}
+
+    # = public API =====================================================================================================
+    def interpolate(self, values, target=None):
+        """Returns an array of shape (number of grids, number of target points, ...) ready to be used as a solution
+
+        The target defaults to the points of the finest grid (the grid with the most points).
+        """
+        assert len(values) == len(self.__points)
+        target_key, target = self.__get_target(target)
+        result = []
+        for level, level_values in enumerate(values):
+            level_values = np.asarray(level_values, dtype=np.float64)
+            assert len(level_values) == len(self.__points[level])
+            indices, weights = self.__get_weights(level, target_key, target)
+            weights = weights.reshape(weights.shape + (1,) * (level_values.ndim - 1))
+            result.append(np.sum(level_values[indices] * weights, axis=1))
+        return np.stack(result)
+
+    def number_of_trees(self):
+        return len(self.__trees)
+
+    # = private API ====================================================================================================
+    def __get_target(self, target):
+        if target is None:
+            finest = max(range(0, len(self.__points)), key=lambda level: len(self.__points[level]))
+            return ('level', finest), self.__points[finest]
+        target = np.ascontiguousarray(target, dtype=np.float64)
+        return ('points', target.shape, hashlib.sha1(target.tobytes()).hexdigest()), target
+
+    def __get_tree(self, level):
+        if level not in self.__trees:
+            try:
+                from scipy.spatial import cKDTree
+            except ImportError:
+                raise ImportError('scipy is required to interpolate between non-matching grids')
+            self.__trees[level] = cKDTree(self.__points[level])
+        return self.__trees[level]
+
+    def __get_weights(self, level, target_key, target):
+        key = (level,) + target_key
+        if key not in self.__weights:
+            self.__weights[key] = self.__calculate_inverse_distance_weights(level, target)
+        return self.__weights[key]
+
+    def __calculate_inverse_distance_weights(self, level, target):
+        tree = self.__get_tree(level)
+        neighbours = min(self.__neighbours, len(self.__points[level]))
+        indices = np.empty((len(target), neighbours), dtype=np.int64)
+        weights = np.empty((len(target), neighbours), dtype=np.float64)
+        for start in range(0, len(target), self.__batch_size):
+            stop = min(start + self.__batch_size, len(target))
+            distance, index = tree.query(target[start:stop], k=neighbours)
+            distance = distance.reshape(stop - start, neighbours)
+            index = index.reshape(stop - start, neighbours)
+
+            # points which coincide with a grid point take its value directly
+            with np.errstate(divide='ignore'):
+                weight = 1.0 / np.power(distance, self.__power)
+            coincident = distance[:, 0] == 0
+            weight[coincident] = 0.0
+            weight[coincident, 0] = 1.0
+
+            indices[start:stop] = index
+            weights[start:stop] = weight / np.sum(weight, axis=1, keepdims=True)
+        return indices, weights
@@ -0,0 +1,184 @@
+import numpy as np
+from .order_solver import OrderSolution, solve as solve_apparent_order
+
+
+# Array versions of the GCI equations used by the GCI class. All functions operate on NumPy arrays where the first axis
+# runs over the grid levels (sorted from the finest to the coarsest grid) and any trailing axes run over independent
+# quantities, so that thousands of monitored quantities can be processed in a single call. The order of operations
+# follows the scalar implementation in the GCI class so that both produce the same results.
+
+# studies of a single quantity with at most this many windows solve the apparent order window by window with python
+# floats, as the array solvers spend most of their time on the per iteration overhead of array operations for them
+SCALAR_WINDOWS = 32
+
+
+# = inputs =============================================================================================================
+def set_default_options(data):
+    """Sets the safety factor and the defaults of all options of the GCI calculation missing in data, as in GCI"""
+    data['safety_factor'] = 1.25
+    data.setdefault('simulation_order', 2)
+    data.setdefault('dimension', 3)
+    data.setdefault('oberkampf_correction', False)
+    data.setdefault('order_solver', 'fixed_point')
+    data.setdefault('order_solver_options', {})
+
+
+def sorted_grid_size(data, order):
+    """Returns the representative grid size of the grids in order, given by grid_size or by cells, volume and dimension
+
+    data holds the inputs of a GCI study (e.g. the keyword arguments of the GCI class), where grid_size, cells and a
+    volume per grid are given in the order of the input, and order lists the grids from the finest to the coarsest one.
+    """
+    if 'grid_size' in data:
+        return np.array([data['grid_size'][grid] for grid in order], dtype=np.float64)
+    volume = data['volume']
+    if type(volume) in (list, tuple):
+        volume = [volume[grid] for grid in order]
+    cells = [data['cells'][grid] for grid in order]
+    return representative_grid_size(cells, volume, data['dimension'])
+
+
+# = grid quantities ====================================================================================================
+def representative_grid_size(cells, volume, dimension):
+    cells = np.asarray(cells, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    return np.power(volume / cells, 1.0 / dimension)
+
+
+def refinement_ratio(grid_size):
+    grid_size = np.asarray(grid_size, dtype=np.float64)
+    ratio = grid_size[1:] / grid_size[:-1]
+    assert np.all(ratio > 1)
+    return ratio
+
+
+# = solution quantities ================================================================================================
+def relative_error(solution):
+    solution = np.asarray(solution, dtype=np.float64)
+    return solution[1:] - solution[:-1]
+
+
+def relative_normalised_error(solution):
+    solution = np.asarray(solution, dtype=np.float64)
+    return np.fabs((solution[:-1] - solution[1:]) / solution[:-1])
+
+
+# = GCI quantities =====================================================================================================
+def extrapolated_value(phi_1, phi_2, r21, p):
+    r21_p = np.power(r21, p)
+    return (r21_p * phi_1 - phi_2) / (r21_p - 1)
+
+
+def oberkampf_order(apparent_order, simulation_order):
+    """Returns the order clamped according to Oberkampf and Roy together with the corresponding safety factor"""
+    order_indicator = np.fabs((apparent_order - simulation_order) / simulation_order)
+    safety_factor = np.where(order_indicator <= 0.1, 1.25, 3.0)
+    oberkampf_order = np.minimum(np.maximum(0.5, apparent_order), simulation_order)
+    return oberkampf_order, safety_factor
+
+
+def gci(safety_factor, relative_normalised_error, refinement_ratio, p):
+    refinement_ratio = np.asarray(refinement_ratio, dtype=np.float64)
+    refinement_ratio = refinement_ratio.reshape(refinement_ratio.shape + (1,) * (np.ndim(relative_normalised_error) -
+                                                                                   refinement_ratio.ndim))
+    return (safety_factor * relative_normalised_error) / (np.power(refinement_ratio, p) - 1.0)
+
+
+def asymptotic_gci(gci21, gci32, r21, p):
+    return gci32 / (np.power(r21, p) * gci21)
+
+
+# = complete GCI study =================================================================================================
+def evaluate_triplet(solution, grid_size, simulation_order=2, oberkampf_correction=False, safety_factor=1.25,
+                     order_solver='fixed_point', order_solver_options=None):
+    """Evaluates all GCI stages for three grids, sorted from the finest to the coarsest grid, in a single pass"""
+    solution = np.asarray(solution, dtype=np.float64)
+    assert len(solution) == 3
+    result = {}
+    result['refinement_ratio'] = refinement_ratio(grid_size)
+    result['relative_error'] = relative_error(solution)
+
+    r21, r32 = result['refinement_ratio'][0], result['refinement_ratio'][1]
+    order = solve_apparent_order(result['relative_error'][0], result['relative_error'][1], r21, r32, simulation_order,
+                                 solver=order_solver, **(order_solver_options or {}))
+    result['apparent_order'] = order.order
+    result['order_iterations'] = order.iterations
+    result['order_converged'] = order.converged
+    result['order_residual'] = order.residual
+
+    result['extrapolated_value'] = extrapolated_value(solution[0], solution[1], r21, result['apparent_order'])
+    result['safety_factor'] = safety_factor
+    if oberkampf_correction:
+        result['apparent_order'], result['safety_factor'] = oberkampf_order(result['apparent_order'], simulation_order)
+    result['gci'] = gci(result['safety_factor'], relative_normalised_error(solution), result['refinement_ratio'],
+                        result['apparent_order'])
+    result['asymptotic_gci'] = asymptotic_gci(result['gci'][0], result['gci'][1], r21, result['apparent_order'])
+    return result
+
+
+def evaluate_windows(solution, grid_size, simulation_order=2, oberkampf_correction=False, safety_factor=1.25,
+                     order_solver='fixed_point', order_solver_options=None, timer=None):
+    """Evaluates the GCI studies of all windows of three successive grids, sorted from the finest to the coarsest grid
+
+    The refinement ratios and (normalised) errors between successive grids are computed once for all grids and shared by
+    the two windows they belong to. All results have the windows along their first axis, e.g. the GCI has the shape
+    (number of windows, 2, quantities...), and are identical to those of evaluate_triplet() for each window. If a timer
+    (e.g. an instrumentation.StageTimer) is given, its lap() is called with the name of each stage of the GCI class.
+    """
+    solution = np.asarray(solution, dtype=np.float64)
+    assert len(solution) >= 3
+    quantities = (1,) * (solution.ndim - 1)
+    lap = timer.lap if timer is not None else lambda stage: None
+
+    result = {}
+    ratio = refinement_ratio(grid_size)
+    result['refinement_ratio'] = _pairs(ratio[:-1], ratio[1:])
+    r21, r32 = ratio[:-1].reshape(ratio[:-1].shape + quantities), ratio[1:].reshape(ratio[1:].shape + quantities)
+    lap('refinement_ratio')
+
+    error = relative_error(solution)
+    result['relative_error'] = _pairs(error[:-1], error[1:])
+    lap('relative_error')
+
+    order = _solve_windows(error[:-1], error[1:], r21, r32, simulation_order, order_solver, order_solver_options or {})
+    result['apparent_order'] = order.order
+    result['uncorrected_order'] = order.order
+    result['order_iterations'] = order.iterations
+    result['order_converged'] = order.converged
+    result['order_residual'] = order.residual
+    lap('apparent_order')
+
+    normalised_error = relative_normalised_error(solution)
+    lap('relative_normalised_error')
+
+    result['extrapolated_value'] = extrapolated_value(solution[:-2], solution[1:-1], r21, result['apparent_order'])
+    lap('extrapolated_value')
+
+    result['safety_factor'] = safety_factor
+    if oberkampf_correction:
+        result['apparent_order'], result['safety_factor'] = oberkampf_order(result['apparent_order'], simulation_order)
+    lap('oberkampf_correction')
+
+    gci_21 = gci(result['safety_factor'], normalised_error[:-1], ratio[:-1], result['apparent_order'])
+    gci_32 = gci(result['safety_factor'], normalised_error[1:], ratio[1:], result['apparent_order'])
+    result['gci'] = _pairs(gci_21, gci_32)
+    lap('gci')
+
+    result['asymptotic_gci'] = asymptotic_gci(gci_21, gci_32, r21, result['apparent_order'])
+    lap('asymptotic_gci')
+    return result
+
+
+def _pairs(first, second):
+    # stacks the values of the two grid pairs of each window along the second axis, np.stack is slow for small arrays
+    return np.concatenate((first[:, None], second[:, None]), axis=1)
+
+
+def _solve_windows(e21, e32, r21, r32, simulation_order, order_solver, order_solver_options):
+    if e21.ndim > 1 or len(e21) > SCALAR_WINDOWS:
+        return solve_apparent_order(e21, e32, r21, r32, simulation_order, solver=order_solver, **order_solver_options)
+    windows = [solve_apparent_order(*window, simulation_order, solver=order_solver, **order_solver_options)
+               for window in zip(e21.tolist(), e32.tolist(), r21.tolist(), r32.tolist())]
+    order, iterations, converged, residual = zip(*windows)
+    return OrderSolution(np.array(order, dtype=np.float64), np.array(iterations, dtype=np.int64),
+                         np.array(converged, dtype=bool), np.array(residual, dtype=np.float64))
@@ -0,0 +1,175 @@
+from collections import namedtuple
+import numpy as np
+from . import kernels
+
+
+# Least-squares estimation of the order of convergence over all grid levels at once, following Eca and Hoekstra [4]. The
+# solutions phi_i on the grids with the representative grid sizes h_i are fitted by
+#
+#     phi_i = phi_0 + alpha * (h_i / h_1)^p
+#
+# For a given order p, the extrapolated value phi_0 and the coefficient alpha follow from a linear least-squares fit,
+# so that only the order has to be found by minimising the (weighted) sum of the squared residuals. The weighted fit
+# uses the weights w_i = (1 / h_i) / sum(1 / h_j), which favour the finer grids. All functions work on arrays whose first
+# axis runs over the grids, sorted from the finest to the coarsest grid, and whose trailing axes run over quantities.
+
+LeastSquaresFit = namedtuple('LeastSquaresFit', ['order', 'extrapolated_value', 'coefficient', 'standard_deviation'])
+
+
+def fit(grid_size, solution, weighted=False, order_bracket=(0.1, 10.0), scan_points=32, iterations=60):
+    """Fits order, extrapolated value and coefficient for each quantity, see LeastSquaresFit
+
+    The order is searched within order_bracket, first on a logarithmic scan with scan_points orders to find the global
+    minimum of the residual, which is then refined with a golden-section search of the given number of iterations.
+    """
+    solution = np.asarray(solution, dtype=np.float64)
+    grid_size = np.asarray(grid_size, dtype=np.float64)
+    assert len(grid_size) == len(solution) and len(solution) >= 3
+    h = (grid_size / grid_size[0]).reshape((len(grid_size),) + (1,) * (solution.ndim - 1))
+    w = weights(grid_size, weighted).reshape(h.shape)
+
+    # coarse scan, evaluated for all orders and quantities at once
+    scan = np.geomspace(order_bracket[0], order_bracket[1], scan_points)
+    residuals = np.stack([_linear_fit(h, solution, w, order)[2] for order in scan])
+    best = np.argmin(np.where(np.isnan(residuals), np.inf, residuals), axis=0)
+    lower = scan[np.maximum(best - 1, 0)]
+    upper = scan[np.minimum(best + 1, scan_points - 1)]
+
+    # golden-section search within the neighbouring scan points of the minimum
+    golden = (np.sqrt(5.0) - 1.0) / 2.0
+    a, b = lower, upper
+    c, d = b - golden * (b - a), a + golden * (b - a)
+    fc, fd = _linear_fit(h, solution, w, c)[2], _linear_fit(h, solution, w, d)[2]
+    for _ in range(0, iterations):
+        left = fc < fd
+        b = np.where(left, d, b)
+        a = np.where(left, a, c)
+        c, d = np.where(left, b - golden * (b - a), d), np.where(left, c, a + golden * (b - a))
+        f_new = _linear_fit(h, solution, w, np.where(left, c, d))[2]
+        fc, fd = np.where(left, f_new, fd), np.where(left, fc, f_new)
+    order = (a + b) / 2.0
+
+    extrapolated_value, coefficient, residual = _linear_fit(h, solution, w, order)
+    return LeastSquaresFit(order, extrapolated_value, coefficient,
+                           standard_deviation(residual, len(solution), weighted))
+
+
+def weights(grid_size, weighted):
+    grid_size = np.asarray(grid_size, dtype=np.float64)
+    if not weighted:
+        return np.ones(grid_size.shape)
+    return (1.0 / grid_size) / np.sum(1.0 / grid_size)
+
+
+def standard_deviation(residual, number_of_grids, weighted):
+    """Standard deviation of the fit, zero for three grids where the fit passes through all solutions"""
+    if number_of_grids == 3:
+        return np.zeros(np.shape(residual))
+    residual = np.maximum(residual, 0.0)
+    if weighted:
+        return np.sqrt(number_of_grids * residual / (number_of_grids - 3))
+    return np.sqrt(residual / (number_of_grids - 3))
+
+
+def uncertainty(solution, least_squares_fit):
+    """Numerical uncertainty of the finest grid solution according to Eca and Hoekstra
+
+    The safety factor is 1.25 if the observed order lies within [0.5, 2.1) and 3 otherwise. Unlike the complete
+    procedure of Eca and Hoekstra, no alternative fits with fixed orders are performed for orders outside of this range.
+    """
+    solution = np.asarray(solution, dtype=np.float64)
+    order = least_squares_fit.order
+    error = solution[0] - least_squares_fit.extrapolated_value
+    safety_factor = np.where((order >= 0.5) & (order < 2.1), 1.25, 3.0)
+    fitted = least_squares_fit.extrapolated_value + least_squares_fit.coefficient
+    return safety_factor * np.fabs(error) + least_squares_fit.standard_deviation + np.fabs(solution[0] - fitted)
+
+
+def _linear_fit(h, solution, w, order):
+    # extrapolated value, coefficient and weighted sum of squared residuals of the fit for a given order
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        x = np.power(h, order)
+        total = np.sum(w, axis=0)
+        x_mean = np.sum(w * x, axis=0) / total
+        y_mean = np.sum(w * solution, axis=0) / total
+        sxx = np.sum(w * (x - x_mean) ** 2, axis=0)
+        sxy = np.sum(w * (x - x_mean) * (solution - y_mean), axis=0)
+        syy = np.sum(w * (solution - y_mean) ** 2, axis=0)
+        coefficient = sxy / sxx
+        return y_mean - coefficient * x_mean, coefficient, syy - sxy * coefficient
+
+
+class LeastSquaresGCI(object):
+    """This class estimates the order and the extrapolated value from a least-squares fit over all grids at once"""
+
+    # = constructor ====================================================================================================
+    def __init__(self, **kwargs):
+        self.__data = {}
+        for key, value in kwargs.items():
+            self.__data[key] = value
+
+        assert 'solution' in self.__data
+        assert len(self.__data['solution']) >= 3
+        assert len(self.__data['cells']) == len(self.__data['solution'])
+
+        if 'dimension' not in self.__data:
+            self.__data['dimension'] = 3
+
+        # either 'weighted', 'unweighted' or 'auto', which uses the fit with the smaller standard deviation
+        if 'fit' not in self.__data:
+            self.__data['fit'] = 'auto'
+        assert self.__data['fit'] in ('weighted', 'unweighted', 'auto')
+
+        if 'order_bracket' not in self.__data:
+            self.__data['order_bracket'] = (0.1, 10.0)
+
+        self.__data['gci_up_to_date'] = False
+
+    # = private API ====================================================================================================
+    def __calculate_fit(self):
+        order = sorted(range(0, len(self.__data['cells'])), key=lambda grid: self.__data['cells'][grid], reverse=True)
+        grid_size = kernels.sorted_grid_size(self.__data, order)
+        solution = np.asarray(self.__data['solution'], dtype=np.float64)[order]
+        kernels.refinement_ratio(grid_size)
+
+        fits = {}
+        for weighted in (False, True):
+            if self.__data['fit'] in ('auto', 'weighted' if weighted else 'unweighted'):
+                fits[weighted] = fit(grid_size, solution, weighted, self.__data['order_bracket'])
+        if len(fits) == 2:
+            use_weighted = fits[True].standard_deviation < fits[False].standard_deviation
+            result = LeastSquaresFit(*[np.where(use_weighted, weighted, unweighted)
+                                       for weighted, unweighted in zip(fits[True], fits[False])])
+        else:
+            use_weighted = np.full(np.shape(solution[0]), list(fits)[0])
+            result = list(fits.values())[0]
+
+        self.__data['apparent_order'] = result.order
+        self.__data['extrapolated_value'] = result.extrapolated_value
+        self.__data['coefficient'] = result.coefficient
+        self.__data['standard_deviation'] = result.standard_deviation
+        self.__data['weighted'] = use_weighted
+        self.__data['uncertainty'] = uncertainty(solution, result)
+        self.__data['relative_uncertainty'] = np.fabs(self.__data['uncertainty'] / solution[0])
+
+        # a single quantity is returned as python numbers, as by the GCI class
+        if solution.ndim == 1:
+            for key in ('apparent_order', 'extrapolated_value', 'coefficient', 'standard_deviation', 'uncertainty',
+                        'relative_uncertainty'):
+                self.__data[key] = float(self.__data[key])
+            self.__data['weighted'] = bool(self.__data['weighted'])
+
+    def __check_if_gci_is_up_to_date_otherwise_calculate_it(self):
+        if self.__data['gci_up_to_date'] is False:
+            self.__calculate_fit()
+            self.__data['gci_up_to_date'] = True
+
+    # = getter =========================================================================================================
+    def get(self, key):
+        self.__check_if_gci_is_up_to_date_otherwise_calculate_it()
+        return self.__data[key]
+
+    # = setter =========================================================================================================
+    def set(self, key, value):
+        self.__data[key] = value
+        self.__data['gci_up_to_date'] = False
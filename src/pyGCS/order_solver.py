@@ -0,0 +1,250 @@
+from collections import namedtuple
+from math import fabs, isfinite, log, pow
+import numpy as np
+
+
+# Solvers for the apparent order p, which is given implicitly by (see Celik et al., equations 3a-3c)
+#
+#     p = |ln|e32 / e21| + q(p)| / ln(r21),    q(p) = ln((r21^p - s) / (r32^p - s)),    s = sign(e32 / e21)
+#
+# All solvers work element-wise on arrays of (e21, e32, r21, r32) and return an OrderSolution, which holds the apparent
+# order together with the number of iterations, a convergence flag and the final residual for each element. A custom
+# solver can be used by passing a callable with the same signature as the solvers below to solve().
+
+OrderSolution = namedtuple('OrderSolution', ['order', 'iterations', 'converged', 'residual'])
+
+
+def fixed_point(e21, e32, r21, r32, initial_order, max_iteration=100, tolerance=1e-6):
+    """Fixed-point iteration, converged once the residual has dropped by the tolerance relative to the first residual
+
+    The residual changes its sign from one iteration to the next if the iteration oscillates around the order, so only
+    its magnitude is compared to the tolerance. Elements which have not converged after max_iteration iterations keep
+    their last iterate and are flagged as not converged.
+    """
+    scalar = _is_scalar(e21, e32, r21, r32)
+    if scalar:
+        try:
+            return _fixed_point_scalar(float(e21), float(e32), float(r21), float(r32), initial_order, max_iteration,
+                                       tolerance)
+        except (ArithmeticError, ValueError):
+            # e.g. a vanishing error, for which the array iteration below returns inf or NaN instead of raising
+            pass
+
+    e21, e32, r21, r32 = _broadcast(e21, e32, r21, r32)
+    p = np.full(e21.shape, initial_order, dtype=np.float64)
+    norm = np.ones(e21.shape)
+    residual = np.zeros(e21.shape)
+    iterations = np.zeros(e21.shape, dtype=np.int64)
+    converged = np.zeros(e21.shape, dtype=bool)
+    active = np.ones(e21.shape, dtype=bool)
+    iteration = 1
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        s = sign(e32 / e21)
+        log_ratio = np.log(np.fabs(e32 / e21))
+        log_r21 = np.log(r21)
+        while np.any(active):
+            p_old = p[active]
+            q = np.log((np.power(r21[active], p_old) - s[active]) / (np.power(r32[active], p_old) - s[active]))
+            p_new = (1.0 / log_r21[active]) * np.fabs(log_ratio[active] + q)
+
+            residual[active] = p_new - p_old
+            if iteration == 1:
+                norm[active] = residual[active]
+            iteration += 1
+            iterations[active] += 1
+            p[active] = p_new
+
+            converged[active] = np.fabs(residual[active]) <= tolerance * np.fabs(norm[active])
+            active &= ~converged & np.isfinite(residual)
+            if iteration == max_iteration:
+                break
+    solution = OrderSolution(p, iterations, converged & np.isfinite(p), np.fabs(residual))
+    return _as_scalar(solution) if scalar else solution
+
+
+def _fixed_point_scalar(e21, e32, r21, r32, initial_order, max_iteration, tolerance):
+    # the same iteration for a single triplet with the math module, an order of magnitude faster than the array version
+    p = float(initial_order)
+    norm = 1.0
+    residual = 0.0
+    converged = False
+    iteration = 1
+
+    s = 1.0 if e32 / e21 > 0 else 0.0
+    log_ratio = log(fabs(e32 / e21))
+    log_r21 = log(r21)
+    while True:
+        p_old = p
+        q = log((pow(r21, p) - s) / (pow(r32, p) - s))
+        p = (1.0 / log_r21) * fabs(log_ratio + q)
+
+        residual = p - p_old
+        if iteration == 1:
+            norm = residual
+        iteration += 1
+
+        converged = fabs(residual) <= tolerance * fabs(norm)
+        if converged or not isfinite(residual) or iteration == max_iteration:
+            break
+    return OrderSolution(p, iteration - 1, converged and isfinite(p), fabs(residual))
+
+
+def newton(e21, e32, r21, r32, initial_order, max_iteration=50, tolerance=1e-12, bracket=(1e-6, 50.0), scan_points=16):
+    """Newton iteration with an analytic derivative, started from the initial order
+
+    The residual p ln(r21) - |g(p)|, g(p) = ln|e32 / e21| + q(p), may have a second, spurious root at large orders where
+    g(p) < 0. The iteration therefore starts on the smooth branch p ln(r21) - g(p), which only has the roots with
+    g(p) > 0. Elements which do not converge on this branch are restarted on the complete residual inside a bracket
+    around its first sign change on a coarse scan, safeguarded by bisection whenever a step leaves the bracket.
+    """
+    scalar = _is_scalar(e21, e32, r21, r32)
+    e21, e32, r21, r32 = _broadcast(e21, e32, r21, r32)
+    shape = e21.shape
+    e21, e32, r21, r32 = e21.ravel(), e32.ravel(), r21.ravel(), r32.ravel()
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        s = sign(e32 / e21)
+        log_ratio = np.log(np.fabs(e32 / e21))
+        log_r21 = np.log(r21)
+        log_r32 = np.log(r32)
+
+        p = np.clip(np.full(e21.shape, initial_order, dtype=np.float64), bracket[0], bracket[1])
+        residual = np.full(e21.shape, np.inf)
+        iterations = np.zeros(e21.shape, dtype=np.int64)
+        converged = np.zeros(e21.shape, dtype=bool)
+        index = np.flatnonzero(np.isfinite(log_ratio) & (log_r21 > 0) & (log_r32 > 0))
+        coefficients = (log_ratio, log_r21, log_r32, s)
+
+        index = np.sort(_newton_iterate(index, None, p, residual, iterations, converged, coefficients, max_iteration,
+                                        tolerance, bracket))
+
+        if index.size:
+            # restart from the initial order inside the bracket around the first sign change of the residual
+            lower = np.full(index.shape, bracket[0])
+            upper = np.full(index.shape, bracket[1])
+            bracketed = np.zeros(index.shape, dtype=bool)
+            local = [value[index] for value in coefficients]
+            scan = bracket[0] + (bracket[1] - bracket[0]) * np.square(np.linspace(0.0, 1.0, scan_points + 1)[1:])
+            for point in scan:
+                scanning = np.flatnonzero(~bracketed)
+                if scanning.size == 0:
+                    break
+                f, _ = _newton_residual(point, *(value[scanning] for value in local))
+                first_sign_change = scanning[f >= 0]
+                upper[first_sign_change] = point
+                bracketed[first_sign_change] = True
+                lower[scanning[~(f >= 0)]] = point
+            lower[~bracketed] = bracket[0]
+            p[index] = np.clip(np.full(index.shape, initial_order, dtype=np.float64), lower, upper)
+            _newton_iterate(index, (lower, upper, bracketed), p, residual, iterations, converged, coefficients,
+                            max_iteration, tolerance, bracket)
+
+    solution = OrderSolution(p.reshape(shape), iterations.reshape(shape), converged.reshape(shape),
+                             residual.reshape(shape))
+    return _as_scalar(solution) if scalar else solution
+
+
+def _newton_residual(p, log_ratio, log_r21, log_r32, s, absolute=True):
+    # f(p) = p ln(r21) - |g(p)| vanishes at the apparent order, f'(p) follows from differentiating q(p). Without the
+    # absolute value, only the roots with g(p) > 0 remain
+    r21_p = np.exp(p * log_r21)
+    r32_p = np.exp(p * log_r32)
+    a = r21_p - s
+    b = r32_p - s
+    g = log_ratio + np.log(a / b)
+    dg = r21_p * log_r21 / a - r32_p * log_r32 / b
+    if absolute:
+        return p * log_r21 - np.fabs(g), log_r21 - np.copysign(1.0, g) * dg
+    return p * log_r21 - g, log_r21 - dg
+
+
+def _newton_iterate(index, bounds, p, residual, iterations, converged, coefficients, max_iteration, tolerance, bracket):
+    # iterates the elements in index and returns those which did not converge. Elements are only written back and
+    # dropped from the local arrays once their step falls below the tolerance (or is not finite), which is when it is
+    # decided whether they converged or stalled. Without bounds, the smooth branch of the residual is iterated
+    failed = []
+    local = [value[index] for value in coefficients]
+    p_old = p[index]
+    if bounds is not None:
+        lower, upper, bracketed = bounds
+    for iteration in range(1, max_iteration + 1):
+        if index.size == 0:
+            break
+        f, df = _newton_residual(p_old, *local, absolute=bounds is not None)
+        p_new = p_old - f / df
+        if bounds is not None:
+            # the residual is negative below and positive above the root, which narrows the bracket at every step
+            negative = f < 0
+            lower = np.where(negative, p_old, lower)
+            upper = np.where(negative, upper, p_old)
+            outside = ~np.isfinite(p_new) | (p_new <= lower) | (p_new >= upper)
+            p_new = np.where(outside & bracketed, 0.5 * (lower + upper), p_new)
+        outside = (p_new < bracket[0]) | (p_new > bracket[1])
+        if np.any(outside):
+            p_new[outside] = np.clip(p_new[outside], bracket[0], bracket[1])
+
+        # only the few elements which finish are checked in detail, the orders are positive (or NaN) after clipping
+        step = p_new - p_old
+        limit = tolerance * (1.0 + p_new)
+        finished = ~((step > limit) | (step < -limit))
+        if iteration == max_iteration:
+            finished[:] = True
+        if not np.any(finished):
+            p_old = p_new
+            continue
+
+        # a step that is clipped back onto the bracket bound makes no progress and is flagged as not converged
+        f, step = f[finished], step[finished]
+        p_new_finished = np.where(f == 0, p_old[finished], p_new[finished])
+        at_bound = (p_new_finished == bracket[0]) | (p_new_finished == bracket[1])
+        done = ((np.fabs(step) <= tolerance * (1.0 + np.fabs(p_new_finished))) & ~(at_bound & (step == 0) & (f != 0)))
+        done |= f == 0
+        done &= np.isfinite(p_new_finished)
+
+        finished_index = index[finished]
+        p[finished_index] = p_new_finished
+        residual[finished_index] = np.fabs(f / local[1][finished])
+        iterations[finished_index] += iteration
+        converged[finished_index] = done
+        failed.append(finished_index[~done])
+
+        active = ~finished
+        index, p_old = index[active], p_new[active]
+        local = [value[active] for value in local]
+        if bounds is not None:
+            lower, upper, bracketed = lower[active], upper[active], bracketed[active]
+    return np.concatenate(failed) if failed else index
+
+
+SOLVERS = {
+    'fixed_point': fixed_point,
+    'newton': newton,
+}
+
+
+def sign(value):
+    # negative values are mapped to 0 as well, which is the convention the GCI class has always used for s
+    return np.where(value > 0, 1.0, 0.0)
+
+
+def solve(e21, e32, r21, r32, initial_order, solver='fixed_point', **options):
+    if callable(solver):
+        return solver(e21, e32, r21, r32, initial_order, **options)
+    if solver not in SOLVERS:
+        raise Exception('Unknown order solver ' + str(solver) + ', expected one of ' + ', '.join(SOLVERS))
+    return SOLVERS[solver](e21, e32, r21, r32, initial_order, **options)
+
+
+def _is_scalar(*values):
+    return all(isinstance(value, (int, float)) for value in values)
+
+
+def _as_scalar(solution):
+    # solutions of a single triplet given as python numbers are returned as python numbers by all solvers
+    return OrderSolution(float(solution.order), int(solution.iterations), bool(solution.converged),
+                         float(solution.residual))
+
+
+def _broadcast(*arrays):
+    return [np.array(a) for a in np.broadcast_arrays(*(np.asarray(a, dtype=np.float64) for a in arrays))]
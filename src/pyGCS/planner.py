@@ -0,0 +1,108 @@
+from collections import namedtuple
+import itertools
+import numpy as np
+
+
+# Plans the grids to run next so that a target GCI is reached at the lowest cost. A schedule is a sequence of refinement
+# ratios, each applied to the finest grid so far, so that every step creates a new grid. The GCI of the finest grid is
+# predicted from the current study, as in GCI.get_number_of_cells_for_specified_gci_of(), by
+#
+#     GCI_new = GCI_1 * (h_new / h_1)^p,    cells_new = cells_1 * (h_1 / h_new)^dimension
+#
+# and the cost of a schedule is the sum of the costs of all new grids, given by a cost model which maps the number of
+# cells to e.g. core-hours. All candidate schedules and targets are evaluated in a single vectorised sweep.
+
+Schedule = namedtuple('Schedule', ['target', 'refinement_ratio', 'cells', 'cost', 'predicted_gci'])
+
+
+class PowerLawCost(object):
+    """Cost model cost = coefficient * cells^exponent, e.g. in core-hours"""
+
+    # = constructor ====================================================================================================
+    def __init__(self, coefficient, exponent=1.0):
+        self.coefficient = coefficient
+        self.exponent = exponent
+
+    def __call__(self, cells):
+        return self.coefficient * np.power(np.asarray(cells, dtype=np.float64), self.exponent)
+
+    # = public API =====================================================================================================
+    @classmethod
+    def fit(cls, cells, cost):
+        """Fits the cost model to the cost of past runs by least squares in log-log space"""
+        exponent, log_coefficient = np.polyfit(np.log(np.asarray(cells, dtype=np.float64)),
+                                               np.log(np.asarray(cost, dtype=np.float64)), 1)
+        return cls(float(np.exp(log_coefficient)), float(exponent))
+
+
+class RefinementPlanner(object):
+    """This class finds the cheapest sequence of new grids for which the predicted GCI meets a target"""
+
+    # = constructor ====================================================================================================
+    def __init__(self, gci, cost_model, ratios=None, max_steps=3):
+        # gci is a GCI object of the current study (of a single quantity) and cost_model a function of the number of
+        # cells which accepts arrays, e.g. a PowerLawCost
+        if np.ndim(gci.get('apparent_order')) > 0:
+            raise Exception('The refinement planner requires a GCI of a single quantity, plan each quantity of a batched '
+                            'GCI separately')
+        self.__gci = gci.get('gci')[0]
+        self.__order = gci.get('apparent_order')
+        self.__cells = gci.get('cells')[0]
+        self.__dimension = gci.get('dimension')
+        self.__cost_model = cost_model
+
+        # refinement ratios (in grid size) considered for each step, Celik et al. recommend ratios of at least 1.3
+        self.__ratios = np.arange(13, 21) / 10.0 if ratios is None else np.asarray(ratios, dtype=np.float64)
+        self.__max_steps = max_steps
+        self.__enumerate_schedules()
+
+    # = public API =====================================================================================================
+    def number_of_schedules(self):
+        return len(self.__steps)
+
+    def plan(self, target):
+        """Returns the cheapest Schedule meeting the target GCI, or None if no candidate schedule meets it
+
+        If the GCI of the current finest grid already meets the target, no new grid is needed and the returned Schedule
+        has no refinement ratios and cells, a cost of 0 and the current GCI as predicted_gci.
+        """
+        return self.sweep([target])[0]
+
+    def sweep(self, targets):
+        """Returns the cheapest Schedule (or None) for each target GCI, all targets are evaluated at once"""
+        targets = np.asarray(targets, dtype=np.float64)
+        feasible = self.__predicted_gci[:, None] <= targets[None, :]
+        cost = np.where(feasible, self.__cost[:, None], np.inf)
+        cheapest = np.argmin(cost, axis=0)
+
+        schedules = []
+        for index, schedule in enumerate(cheapest):
+            if self.__gci <= targets[index]:
+                schedules.append(Schedule(float(targets[index]), (), (), 0.0, float(self.__gci)))
+                continue
+            if not feasible[schedule, index]:
+                schedules.append(None)
+                continue
+            steps = self.__steps[schedule]
+            schedules.append(Schedule(float(targets[index]), tuple(self.__schedule_ratios[schedule, :steps].tolist()),
+                                      tuple(self.__schedule_cells[schedule, :steps].tolist()),
+                                      float(self.__cost[schedule]), float(self.__predicted_gci[schedule])))
+        return schedules
+
+    # = private API ====================================================================================================
+    def __enumerate_schedules(self):
+        # all sequences of 1 to max_steps ratios, padded with a ratio of 1 (no new grid) to a common length
+        ratios, steps = [], []
+        for number_of_steps in range(1, self.__max_steps + 1):
+            sequences = np.array(list(itertools.product(self.__ratios, repeat=number_of_steps)), dtype=np.float64)
+            padding = np.ones((len(sequences), self.__max_steps - number_of_steps))
+            ratios.append(np.concatenate([sequences, padding], axis=1))
+            steps.append(np.full(len(sequences), number_of_steps))
+        self.__schedule_ratios = np.concatenate(ratios)
+        self.__steps = np.concatenate(steps)
+
+        total_ratio = np.cumprod(self.__schedule_ratios, axis=1)
+        self.__schedule_cells = np.round(self.__cells * np.power(total_ratio, self.__dimension)).astype(np.int64)
+        new_grid = np.arange(self.__max_steps)[None, :] < self.__steps[:, None]
+        self.__cost = np.sum(np.where(new_grid, self.__cost_model(self.__schedule_cells), 0.0), axis=1)
+        self.__predicted_gci = self.__gci * np.power(total_ratio[:, -1], -self.__order)
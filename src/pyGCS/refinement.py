@@ -0,0 +1,95 @@
+from collections import namedtuple
+import numpy as np
+
+
+# Local refinement recommendations from point-wise (local) GCI fields, e.g. computed by FieldGCI. As for the number of
+# cells of the whole grid in GCI.get_number_of_cells_for_specified_gci_of(), the GCI of a cell scales with h^p, so that
+# the cell reaches the target GCI once its grid size is reduced by the refinement factor
+#
+#     r = (GCI / GCI_target)^(1 / p),    cells_new = cells * r^dimension
+#
+# The factor is computed for every cell and reduced per region (e.g. a zone of the mesh), either as the largest factor
+# of the region ('max', so that every cell of the region meets the target) or from the volume-weighted mean GCI and
+# order of the region ('mean'). All reductions are vectorised with bincount and processed in chunks, so that fields with
+# 10^8 cells (e.g. memory-mapped arrays) are evaluated in seconds with bounded memory.
+
+RegionalRefinement = namedtuple('RegionalRefinement', ['factor', 'cells', 'estimated_cells', 'adaptive_cells',
+                                                       'volume', 'invalid', 'total_cells', 'total_estimated_cells',
+                                                       'total_adaptive_cells', 'indicator'])
+
+
+def regional_refinement(gci, apparent_order, target, dimension=3, regions=None, volume=None, statistic='max',
+                        max_factor=None, invalid_factor=1.0, chunk_size=2 ** 22, indicator=None):
+    """Returns the RegionalRefinement needed to reach the target GCI in every region
+
+    gci is the local GCI of the fine grid for each cell (e.g. FieldGCI.get('gci')[0]) and apparent_order either the
+    local order of each cell or a single order. regions holds a non-negative integer label for each cell (all cells
+    form region 0 if not given) and volume the volume of each cell, used to weight the mean and reported per region.
+
+    The per-cell refinement factors (at least 1, capped at max_factor) are returned as indicator, a float32 array, or
+    written into indicator if an array (e.g. a memory-mapped file for the mesher) is given. Cells whose factor can not
+    be computed, e.g. as the order did not converge, get invalid_factor and are counted per region. For each region,
+    factor is the recommended refinement factor, cells the current and estimated_cells the estimated number of cells
+    after refining the region uniformly by factor, while adaptive_cells estimates the number of cells if every cell is
+    refined by its own factor.
+    """
+    assert statistic in ('max', 'mean')
+    points = len(gci)
+    if indicator is None:
+        indicator = np.empty(points, dtype=np.float32)
+    assert len(indicator) == points
+
+    accumulators = {key: np.zeros(0) for key in ('cells', 'adaptive_cells', 'volume', 'invalid', 'factor',
+                                                  'weight', 'weighted_gci', 'weighted_order')}
+    for start in range(0, points, chunk_size):
+        stop = min(start + chunk_size, points)
+        local_gci = np.asarray(gci[start:stop], dtype=np.float64)
+        order = np.asarray(apparent_order[start:stop] if np.ndim(apparent_order) else apparent_order, dtype=np.float64)
+        labels = np.zeros(stop - start, dtype=np.int64) if regions is None else np.asarray(regions[start:stop],
+                                                                                            dtype=np.int64)
+        weight = np.ones(stop - start) if volume is None else np.asarray(volume[start:stop], dtype=np.float64)
+
+        factor, valid = _refinement_factor(local_gci, order, target, max_factor)
+        factor = np.where(valid, factor, invalid_factor)
+        indicator[start:stop] = factor
+
+        number_of_regions = max(len(accumulators['cells']), int(labels.max()) + 1 if len(labels) else 0)
+        for key, values in accumulators.items():
+            accumulators[key] = np.concatenate([values, np.full(number_of_regions - len(values),
+                                                                1.0 if key == 'factor' else 0.0)])
+        accumulators['cells'] += np.bincount(labels, minlength=number_of_regions)
+        accumulators['adaptive_cells'] += np.bincount(labels, np.power(factor, dimension), number_of_regions)
+        accumulators['volume'] += np.bincount(labels, weight, number_of_regions)
+        accumulators['invalid'] += np.bincount(labels, ~valid, number_of_regions)
+        if statistic == 'max':
+            np.maximum.at(accumulators['factor'], labels, factor)
+        else:
+            weight = np.where(valid, weight, 0.0)
+            accumulators['weight'] += np.bincount(labels, weight, number_of_regions)
+            accumulators['weighted_gci'] += np.bincount(labels, np.where(valid, weight * local_gci, 0.0),
+                                                        number_of_regions)
+            accumulators['weighted_order'] += np.bincount(labels, np.where(valid, weight * order, 0.0),
+                                                          number_of_regions)
+
+    if statistic == 'mean':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factor, valid = _refinement_factor(accumulators['weighted_gci'] / accumulators['weight'],
+                                               accumulators['weighted_order'] / accumulators['weight'], target,
+                                               max_factor)
+        accumulators['factor'] = np.where(valid, factor, invalid_factor)
+
+    cells = accumulators['cells'].astype(np.int64)
+    estimated_cells = cells * np.power(accumulators['factor'], dimension)
+    return RegionalRefinement(accumulators['factor'], cells, estimated_cells, accumulators['adaptive_cells'],
+                              accumulators['volume'], accumulators['invalid'].astype(np.int64), int(cells.sum()),
+                              float(estimated_cells.sum()), float(accumulators['adaptive_cells'].sum()), indicator)
+
+
+def _refinement_factor(gci, order, target, max_factor):
+    # factor by which the grid size has to be reduced to reach the target, at least 1 (no coarsening)
+    valid = np.isfinite(gci) & np.isfinite(order) & (order > 0.0) & (gci >= 0.0)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        factor = np.maximum(np.power(gci / target, 1.0 / order), 1.0)
+    if max_factor is not None:
+        factor = np.minimum(factor, max_factor)
+    return factor, valid
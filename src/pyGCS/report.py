@@ -0,0 +1,251 @@
+from abc import ABC, abstractmethod
+import csv
+import json
+import math
+import numpy as np
+
+
+# Writers stream the results of one or more GCS objects (or GCSResult objects) into a file object, one table or one row
+# at a time, so that reports covering many studies do not need to be held in memory. Use write_report() to write a
+# report into a path or file object, or create a writer directly to add results incrementally:
+#
+#     with open('report.csv', 'w', newline='') as file:
+#         writer = CsvWriter(file)
+#         for label, gcs in studies:
+#             writer.write(gcs, label=label)
+#         writer.close()
+
+PHI_PLACEHOLDER = '{INSERT MEANING OF PHI HERE}'
+
+
+class ReportWriter(ABC):
+    """Base class of all report writers, which implement _write() to write the results of a single GCS"""
+
+    extension = ''
+    binary = False
+
+    # = constructor ====================================================================================================
+    def __init__(self, file):
+        self._file = file
+        self._written = 0
+
+    # = public API =====================================================================================================
+    def write(self, gcs, label=None):
+        """Writes the results of a GCS or GCSResult object, label describes phi or identifies the case in the rows"""
+        results = gcs.results() if hasattr(gcs, 'results') else gcs
+        self._write(results, label)
+        self._written += 1
+
+    def close(self):
+        pass
+
+    # = private API ====================================================================================================
+    @abstractmethod
+    def _write(self, results, label):
+        pass
+
+
+class _TableWriter(ReportWriter):
+    """Writes one table per GCS and quantity, with the pyGCS preamble written once at the top of the file"""
+
+    def __init__(self, file):
+        super().__init__(file)
+        self._tables = 0
+
+    def _write(self, results, label):
+        quantities = results.quantities()
+        for quantity in range(0, int(np.prod(quantities))) if quantities else [None]:
+            meaning = None if label is None else str(label)
+            if quantity is not None:
+                meaning = ('' if meaning is None else meaning + ', ') + 'quantity ' + str(quantity)
+            if self._tables == 0:
+                self._write_preamble()
+            else:
+                self._file.write(self.separator)
+            self._tables += 1
+            self._write_table(results, quantity, meaning, self._tables)
+
+    @staticmethod
+    def _study(results, study, quantity):
+        # the values of a single study (and quantity) as python numbers, ready to be formatted
+        values = {}
+        for key, value in results.view(study).items():
+            if quantity is not None and key in ('solution', 'gci'):
+                value = value.reshape(len(value), -1)[:, quantity]
+            elif quantity is not None and key not in ('cells', 'refinement_ratio'):
+                value = value.reshape(-1)[quantity]
+            values[key] = value.tolist()
+        return values
+
+
+class MarkdownWriter(_TableWriter):
+    extension = 'md'
+    separator = '\n\n'
+
+    def _write_preamble(self):
+        self._file.write("Generated using pyGCS (Grid Convergence Study)\n")
+        self._file.write("- https://github.com/tomrobin-teschner/pyGCS\n")
+        self._file.write("- https://pypi.org/project/pygcs/\n\n")
+
+    def _write_table(self, results, quantity, meaning, table):
+        studies = results.number_of_studies()
+        meaning = PHI_PLACEHOLDER if meaning is None else meaning
+        self._file.write(f"Table {table}: Grid convergence study over {studies + 2} grids. phi represents the {meaning} and phi_extrapolated its extrapolated value. N_cells is the number of grid elements, r the refinement ration between two successive grids. GCI is the grid convergence index in percent and its asymptotic value is provided by GCI_asymptotic, where a value close to unity indicates a grid independent solution. The order achieved in the simulation is given by p.\n\n")
+        self._file.write("|        |  phi      |   N_cells   |  r  |  GCI  | GCI_asymptotic |  p   | phi_extrapolated |\n")
+        self._file.write("|--------|:---------:|:-----------:|:---:|:-----:|:--------------:|:----:|:----------------:|\n")
+        for study in range(0, studies):
+            data = self._study(results, study, quantity)
+            self._file.write("|        |           |             |     |       |                |      |                  |\n")
+            self._file.write(f"| Grid {study+1} | {data['solution'][0]:.3e} | {data['cells'][0]:11d} | {data['refinement_ratio'][0]:.1f} | {100 * data['gci'][0]:.2f}% |                |      |                  |\n")
+            self._file.write(f"| Grid {study+2} | {data['solution'][1]:.3e} | {data['cells'][1]:11d} | {data['refinement_ratio'][1]:.1f} | {100 * data['gci'][1]:.2f}% |      {data['asymptotic_gci']:.3f}     | {data['apparent_order']:.2f} |     {data['extrapolated_value']:.2e}     |\n")
+            self._file.write(f"| Grid {study+3} | {data['solution'][2]:.3e} | {data['cells'][2]:11d} | -   | -     |                |      |                  |\n")
+        self._file.write("|        |           |             |     |       |                |      |                  |")
+
+
+class LatexWriter(_TableWriter):
+    extension = 'tex'
+    separator = '\n'
+
+    def _write_preamble(self):
+        self._file.write("% Generated using pyGCS (Grid Convergence Study)\n")
+        self._file.write("% - https://github.com/tomrobin-teschner/pyGCS\n")
+        self._file.write("% - https://pypi.org/project/pygcs/\n\n")
+        self._file.write("% You have to add the following packages to your preamble to make this table work in your document\n")
+        self._file.write("% \\usepackage{booktabs}\n")
+        self._file.write("% \\usepackage{multirow}\n")
+
+    def _write_table(self, results, quantity, meaning, table):
+        studies = results.number_of_studies()
+        meaning = '\\textbf{INSERT MEANING OF PHI HERE}' if meaning is None else meaning
+        label = 'tab:gci_study' if table == 1 else 'tab:gci_study_' + str(table)
+        self._file.write("\\begin{table}[tbp]\n")
+        self._file.write(f"\\caption{{Grid convergence study over {studies + 2} grids. $ \\phi $ represents the {meaning} and $ \\phi_{{extrapolated}} $ its extrapolated value. $ N_{{cells}} $ is the number of grid elements, $ r $ the refinement ration between two successive grids. $ GCI $ is the grid convergence index in percent and its asymptotic value is provided by $ GCI_{{asymptotic}} $, where a value close to unity indicates a grid independent solution. The order achieved in the simulation is given by $ p $.}}\n")
+        self._file.write(f"\\label{{{label}}}\n")
+        self._file.write("\\begin{tabular}{@{}lccccccc@{}}\n")
+        self._file.write("\\toprule\n")
+        self._file.write("& $ \\phi $ & $ N_{cells} $ & $ r $ & $ GCI $ & $ GCI_{asymptotic} $ & $ p $ & $ \\phi_{extrapolated} $ \\\\ \\midrule\n")
+        for study in range(0, studies):
+            data = self._study(results, study, quantity)
+            self._file.write(f"Grid {study+1} & {data['solution'][0]:.3e} & {data['cells'][0]} & {data['refinement_ratio'][0]:.1f} & {100 * data['gci'][0]:.2f}\\%   & \\multirow{{3}}{{*}}{{ {data['asymptotic_gci']:.3f} }} & \\multirow{{3}}{{*}}{{ {data['apparent_order']:.2f} }} & \\multirow{{3}}{{*}}{{ {data['extrapolated_value']:.2e} }} \\\\ \n")
+            self._file.write(f"Grid {study+2} & {data['solution'][1]:.2e} & {data['cells'][1]}  & {data['refinement_ratio'][1]:.1f} & {100 * data['gci'][1]:.2f}\\% &                       &                      &                       \\\\ \n")
+            if study == studies - 1:
+                self._file.write(f"Grid {study+3} & {data['solution'][2]:.2e} & {data['cells'][2]}  & -   & -     &                       &                      &                       \\\\ \\bottomrule \n")
+            else:
+                self._file.write(f"Grid {study+3} & {data['solution'][2]:.2e} & {data['cells'][2]}  & -   & -     &                       &                      &                       \\\\ \\cmidrule(r){{1-8}} \n")
+        self._file.write("\\end{tabular}\n")
+        self._file.write("\\end{table}\n")
+
+
+class WordWriter(_TableWriter):
+    extension = 'txt'
+    separator = '\n'
+
+    def _write_preamble(self):
+        self._file.write("Generated using pyGCS (Grid Convergence Study)\n")
+        self._file.write("- https://github.com/tomrobin-teschner/pyGCS\n")
+        self._file.write("- https://pypi.org/project/pygcs/\n\n")
+
+    def _write_table(self, results, quantity, meaning, table):
+        studies = results.number_of_studies()
+        meaning = PHI_PLACEHOLDER if meaning is None else meaning
+        self._file.write(f"Generate an empty table in word with dimensions 8 (columns) x {1 + 4 * studies} (rows), select all cells and copy the content after the caption below into the table\n\n")
+        self._file.write(f"Table {table}: Grid convergence study over {studies + 2} grids. phi represents the {meaning} and phi_extrapolated its extrapolated value. N_cells is the number of grid elements, r the refinement ration between two successive grids. GCI is the grid convergence index in percent and its asymptotic value is provided by GCI_asymptotic, where a value close to unity indicates a grid independent solution. The order achieved in the simulation is given by p.\n")
+        self._file.write("\tphi\tN_cells\tr\tGCI\tGCI_asymptotic\tp\tphi_extrapolated\n")
+        for study in range(0, studies):
+            data = self._study(results, study, quantity)
+            self._file.write(f"Grid {study+1}\t{data['solution'][0]:.3e}\t{data['cells'][0]:11d}\t{data['refinement_ratio'][0]:.1f}\t{100 * data['gci'][0]:.2f}%\t\t\t\n")
+            self._file.write(f"Grid {study+2}\t{data['solution'][1]:.3e}\t{data['cells'][1]:11d}\t{data['refinement_ratio'][1]:.1f}\t{100 * data['gci'][1]:.2f}% \t{data['asymptotic_gci']:.3f}\t{data['apparent_order']:.2f}\t{data['extrapolated_value']:.2e}\n")
+            self._file.write(f"Grid {study+3}\t{data['solution'][2]:.3e}\t{data['cells'][2]:11d}\t\t\t\t\t\n")
+
+
+class _RowWriter(ReportWriter):
+    """Writes the results in long format, one row per case, study, grid and quantity, see GCSResult.to_columns()"""
+
+    # number of rows converted to python objects at once
+    rows_per_chunk = 4096
+
+    def _write(self, results, label):
+        label = self._written if label is None else label
+        columns = results.to_columns()
+        rows = len(columns['study'])
+        for start in range(0, rows, self.rows_per_chunk):
+            chunk = {key: column[start:start + self.rows_per_chunk].tolist() for key, column in columns.items()}
+            for row in zip(*chunk.values()):
+                self._write_row(dict(zip(('case',) + tuple(chunk), (label,) + row)))
+
+
+class CsvWriter(_RowWriter):
+    extension = 'csv'
+
+    def _write_row(self, row):
+        if not hasattr(self, '_writer'):
+            self._writer = csv.DictWriter(self._file, fieldnames=list(row), lineterminator='\n')
+            self._writer.writeheader()
+        self._writer.writerow(row)
+
+
+class JsonLinesWriter(_RowWriter):
+    extension = 'jsonl'
+
+    def _write_row(self, row):
+        # NaN is written as null to keep each line valid JSON
+        row = {key: None if type(value) is float and math.isnan(value) else value for key, value in row.items()}
+        self._file.write(json.dumps(row) + '\n')
+
+
+class ParquetWriter(ReportWriter):
+    """Writes one row group per GCS, requires pyarrow"""
+
+    extension = 'parquet'
+    binary = True
+
+    def _write(self, results, label):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError('pyarrow is required to write parquet files')
+        label = self._written if label is None else label
+        columns = results.to_columns()
+        table = pyarrow.table(dict([('case', pyarrow.array([str(label)] * len(columns['study'])))] +
+                                   [(key, pyarrow.array(column)) for key, column in columns.items()]))
+        if not hasattr(self, '_writer'):
+            self._writer = pyarrow.parquet.ParquetWriter(self._file, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if hasattr(self, '_writer'):
+            self._writer.close()
+
+
+WRITERS = {
+    'markdown': MarkdownWriter,
+    'latex': LatexWriter,
+    'word': WordWriter,
+    'csv': CsvWriter,
+    'jsonl': JsonLinesWriter,
+    'parquet': ParquetWriter,
+}
+
+
+def get_writer(output_type):
+    if output_type not in WRITERS:
+        raise Exception('Unknown output type ' + str(output_type) + ', expected one of ' + ', '.join(WRITERS))
+    return WRITERS[output_type]
+
+
+def write_report(studies, target, output_type='markdown', labels=None):
+    """Streams the results of all studies (GCS or GCSResult objects) into target, a path or an open file object"""
+    writer_type = get_writer(output_type)
+    if hasattr(target, 'write'):
+        _write_all(writer_type(target), studies, labels)
+        return
+    with open(target, 'wb' if writer_type.binary else 'w', newline='' if not writer_type.binary else None) as file:
+        _write_all(writer_type(file), studies, labels)
+
+
+def _write_all(writer, studies, labels):
+    labels = iter(labels) if labels is not None else None
+    for gcs in studies:
+        writer.write(gcs, label=next(labels) if labels is not None else None)
+    writer.close()
@@ -0,0 +1,117 @@
+import numpy as np
+
+
+class GCSResult(object):
+    """This class stores the results of all GCI studies of a GCS in contiguous arrays, indexed by study"""
+
+    keys = ('cells', 'solution', 'refinement_ratio', 'gci', 'asymptotic_gci', 'apparent_order', 'extrapolated_value')
+    __slots__ = keys
+
+    # = constructor ====================================================================================================
+    def __init__(self, number_of_studies, quantities=()):
+        # quantities is the shape of the trailing axes if many quantities are processed at once, see GCI batched mode
+        quantities = tuple(quantities)
+        self.cells = np.zeros((number_of_studies, 3), dtype=np.int64)
+        self.solution = np.zeros((number_of_studies, 3) + quantities)
+        self.refinement_ratio = np.zeros((number_of_studies, 2))
+        self.gci = np.zeros((number_of_studies, 2) + quantities)
+        self.asymptotic_gci = np.zeros((number_of_studies,) + quantities)
+        self.apparent_order = np.zeros((number_of_studies,) + quantities)
+        self.extrapolated_value = np.zeros((number_of_studies,) + quantities)
+
+    # = public API =====================================================================================================
+    def store(self, study, gci_study):
+        for key in self.keys:
+            getattr(self, key)[study] = gci_study.get(key)
+
+    def number_of_studies(self):
+        return len(self.cells)
+
+    def quantities(self):
+        return self.solution.shape[2:]
+
+    def view(self, study):
+        """Returns the results of a single study as views into the underlying arrays (no data is copied)"""
+        return {key: getattr(self, key)[study] for key in self.keys}
+
+    @classmethod
+    def concatenate(cls, results):
+        results = list(results)
+        quantities = results[0].quantities() if results else ()
+        combined = cls(0, quantities)
+        for key in cls.keys:
+            if results:
+                setattr(combined, key, np.concatenate([getattr(result, key) for result in results]))
+        return combined
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Creates the results from a dictionary (or .npz file) holding an array for each key"""
+        result = cls(0)
+        for key in cls.keys:
+            setattr(result, key, np.asarray(arrays[key]))
+        return result
+
+    def to_columns(self):
+        """Returns the results in long format, one row per study, grid and quantity, as a dictionary of 1D arrays
+
+        The grid is numbered from 1 (the finest grid) across all studies, as in the tables written by GCS.print_table().
+        Values which do not exist for the coarsest grid of a study (refinement ratio and GCI) are set to NaN. Every
+        column is a new contiguous array, values of a study or grid are repeated (copied) into each of their rows.
+        """
+        studies = self.number_of_studies()
+        quantities = int(np.prod(self.quantities(), dtype=np.int64))
+        shape = (studies, 3, quantities)
+        missing = np.full((studies, 1, quantities), np.nan)
+
+        columns = {}
+        columns['study'] = np.broadcast_to(np.arange(studies)[:, None, None], shape).ravel()
+        columns['grid'] = np.broadcast_to(np.arange(studies)[:, None, None] + np.arange(1, 4)[None, :, None],
+                                          shape).ravel()
+        columns['quantity'] = np.broadcast_to(np.arange(quantities)[None, None, :], shape).ravel()
+        columns['cells'] = np.broadcast_to(self.cells[:, :, None], shape).ravel()
+        columns['solution'] = self.solution.reshape(shape).ravel()
+        columns['refinement_ratio'] = np.broadcast_to(
+            np.concatenate([self.refinement_ratio[:, :, None], missing[:, :, :1]], axis=1), shape).ravel()
+        columns['gci'] = np.concatenate([self.gci.reshape(studies, 2, quantities), missing], axis=1).ravel()
+        for key in ('asymptotic_gci', 'apparent_order', 'extrapolated_value'):
+            columns[key] = np.broadcast_to(getattr(self, key).reshape(studies, 1, quantities), shape).ravel()
+        return columns
+
+    def to_frame(self):
+        """Returns the results of to_columns() as a pandas DataFrame, requires pandas"""
+        return as_frame(self.to_columns())
+
+    def to_arrow(self):
+        """Returns the results of to_columns() as a pyarrow Table, requires pyarrow"""
+        return as_arrow(self.to_columns())
+
+    # = getter =========================================================================================================
+    def get(self, key):
+        return getattr(self, key)
+
+    def get_as_list(self, key):
+        """Returns the results in the nested list / tuple format used by GCS.get() before the results were arrays"""
+        values = getattr(self, key).tolist()
+        if key in ('cells', 'solution'):
+            return [tuple(study) for study in values]
+        return values
+
+
+# The columns are contiguous numpy arrays, which pandas and pyarrow wrap without copying them element by element. Values
+# which do not exist for the coarsest grid of a study stay NaN, as in the files written by report.ParquetWriter.
+
+def as_frame(columns):
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError('pandas is required to export results as a DataFrame')
+    return pandas.DataFrame(columns, copy=False)
+
+
+def as_arrow(columns):
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('pyarrow is required to export results as an Arrow table')
+    return pyarrow.table({key: pyarrow.array(column) for key, column in columns.items()})
@@ -0,0 +1,312 @@
+import argparse
+import asyncio
+import json
+import time
+import numpy as np
+from .GCI import GCI
+from .GCS import GCS
+from .results import GCSResult
+from .summary import QuantileSketch
+
+
+# Small HTTP server exposing the GCI and GCS evaluation as JSON endpoints, built on asyncio only, so that tools written in
+# other languages can share one instance, e.g. on a workstation:
+#
+#     python -m pyGCS.server --port 8080
+#
+#     POST /gci          body: {"dimension": 2, "volume": 76, "cells": [18000, 8000, 4500], "solution": [6.063, 5.972,
+#                        5.863]}, or a list of such cases, returns the GCI results of each case
+#     POST /gcs          the same for the GCS class with any number of grids
+#     GET  /statistics   request, batch and latency counters
+#
+# Requests arriving within max_delay of each other are coalesced into a micro-batch. All cases of a batch which only
+# differ in their solution are evaluated at once, with the solutions stacked along the quantity axis of the batched GCI
+# and GCS classes, so that the cost per request falls as the load increases.
+
+# arguments of a case, all other keys are rejected
+CASE_KEYS = ('cells', 'solution', 'volume', 'grid_size', 'dimension', 'simulation_order', 'oberkampf_correction',
+             'order_solver', 'order_solver_options')
+
+# results returned for each endpoint, and those with a trailing axis running over the quantities
+RESULT_KEYS = {
+    'gci': ('refinement_ratio', 'apparent_order', 'extrapolated_value', 'gci', 'asymptotic_gci'),
+    'gcs': GCSResult.keys,
+}
+QUANTITY_KEYS = ('solution', 'apparent_order', 'extrapolated_value', 'gci', 'asymptotic_gci')
+
+STATUS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large'}
+
+
+class GCIServer(object):
+    """This class serves GCI and GCS evaluations over HTTP, coalescing concurrent requests into micro-batches"""
+
+    # = constructor ====================================================================================================
+    def __init__(self, host='127.0.0.1', port=8080, max_batch_size=1024, max_delay=0.002, max_request_size=2 ** 24):
+        # max_delay is the time in seconds the first request of a batch waits for further requests. Requests with a body
+        # larger than max_request_size bytes are answered with 413 without reading the body
+        self.host = host
+        self.port = port
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_request_size = max_request_size
+        self.__server = None
+        self.__queue = None
+        self.__batcher = None
+        self.__reset_statistics()
+
+    # = public API =====================================================================================================
+    async def start(self):
+        """Starts listening, the port is updated if port 0 was given to let the operating system choose one"""
+        self.__queue = asyncio.Queue()
+        self.__batcher = asyncio.ensure_future(self.__run_batches())
+        self.__server = await asyncio.start_server(self.__handle_connection, self.host, self.port)
+        self.port = self.__server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self.__server is None:
+            await self.start()
+        await self.__server.wait_closed()
+
+    async def close(self):
+        # also called if start() failed, e.g. as the port is in use
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+        if self.__batcher is not None:
+            self.__batcher.cancel()
+
+    async def evaluate(self, kind, case):
+        """Evaluates a single case ('gci' or 'gcs') through the micro-batching queue and returns its results"""
+        _validate(case)
+        future = asyncio.get_running_loop().create_future()
+        await self.__queue.put((kind, case, future))
+        return await future
+
+    def statistics(self):
+        elapsed = time.perf_counter() - self.__started
+        requests = self.__counters['requests']
+        return {
+            'requests': requests,
+            'errors': self.__counters['errors'],
+            'batches': self.__counters['batches'],
+            'evaluations': self.__counters['evaluations'],
+            'mean_batch_size': requests / self.__counters['batches'] if self.__counters['batches'] else 0.0,
+            'requests_per_second': requests / elapsed if elapsed > 0.0 else 0.0,
+            'latency': {
+                'mean': self.__latency_sum / requests if requests else 0.0,
+                'p50': self.__latency.quantile(0.5) if requests else 0.0,
+                'p95': self.__latency.quantile(0.95) if requests else 0.0,
+                'p99': self.__latency.quantile(0.99) if requests else 0.0,
+                'max': self.__latency_max,
+            },
+        }
+
+    # = private API ====================================================================================================
+    def __reset_statistics(self):
+        self.__started = time.perf_counter()
+        self.__counters = {'requests': 0, 'errors': 0, 'batches': 0, 'evaluations': 0}
+        self.__latency = QuantileSketch(alpha=0.01)
+        self.__latency_sum = 0.0
+        self.__latency_max = 0.0
+
+    async def __run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.__queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0.0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.__queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # evaluated in the default executor, so that new requests are accepted (and queued for the next batch)
+            results, evaluations = await loop.run_in_executor(None, _evaluate_batch, batch)
+            self.__counters['batches'] += 1
+            self.__counters['evaluations'] += evaluations
+            for (_, _, future), result in zip(batch, results):
+                if future.cancelled():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    async def __handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                content_length = int(headers.get('content-length', 0))
+                if content_length < 0:
+                    raise ValueError('negative content length')
+                if content_length > self.max_request_size:
+                    # the body is not read, so the connection can not be used for further requests
+                    status, response = 413, {'error': 'request body exceeds {} bytes'.format(self.max_request_size)}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(content_length)
+                    status, response = await self.__route(method, path, body)
+                    keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                payload = json.dumps(response).encode()
+                writer.write('HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n'
+                             'Connection: {}\r\n\r\n'.format(status, STATUS[status], len(payload),
+                                                             'keep-alive' if keep_alive else 'close').encode())
+                writer.write(payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            # malformed request or connection closed by the client
+            pass
+        finally:
+            writer.close()
+
+    async def __route(self, method, path, body):
+        path = path.split('?')[0].rstrip('/')
+        if path == '/statistics':
+            return (200, self.statistics()) if method == 'GET' else (405, {'error': 'use GET'})
+        if path not in ('/gci', '/gcs'):
+            return 404, {'error': 'unknown endpoint ' + path}
+        if method != 'POST':
+            return 405, {'error': 'use POST'}
+
+        started = time.perf_counter()
+        try:
+            cases = json.loads(body.decode())
+            results = await asyncio.gather(*[self.evaluate(path[1:], case)
+                                             for case in (cases if isinstance(cases, list) else [cases])],
+                                           return_exceptions=True)
+        except ValueError as error:
+            results = [error]
+            cases = {}
+        latency = time.perf_counter() - started
+
+        errors = [result for result in results if isinstance(result, Exception)]
+        self.__counters['requests'] += 1
+        self.__counters['errors'] += 1 if errors else 0
+        self.__latency.add([latency])
+        self.__latency_sum += latency
+        self.__latency_max = max(self.__latency_max, latency)
+        if errors:
+            return 400, {'error': type(errors[0]).__name__ + ': ' + str(errors[0])}
+        return 200, results if isinstance(cases, list) else results[0]
+
+
+def _validate(case):
+    if not isinstance(case, dict) or 'solution' not in case or 'cells' not in case:
+        raise ValueError('each case needs to be an object with cells and solution')
+    unknown = [key for key in case if key not in CASE_KEYS]
+    if unknown:
+        raise ValueError('unknown arguments ' + ', '.join(unknown))
+
+
+def _evaluate_batch(batch):
+    # groups the cases of the batch by all arguments except the solution and evaluates each group at once. If a group
+    # fails, its cases are evaluated one by one, so that an invalid case does not fail the other cases of its group
+    groups = {}
+    for index, (kind, case, _) in enumerate(batch):
+        key = json.dumps([kind, {name: value for name, value in case.items() if name != 'solution'}], sort_keys=True)
+        groups.setdefault(key, []).append(index)
+
+    results, evaluations = [None] * len(batch), 0
+    for indices in groups.values():
+        try:
+            evaluations += 1
+            group_results = _evaluate_group([batch[index] for index in indices])
+        except Exception:
+            group_results = []
+            for index in indices:
+                try:
+                    evaluations += 1
+                    group_results.extend(_evaluate_group([batch[index]]))
+                except Exception as error:
+                    group_results.append(error)
+        for index, result in zip(indices, group_results):
+            results[index] = result
+    return results, evaluations
+
+
+def _evaluate_group(group):
+    # the solutions of all cases are stacked along the quantity axis, e.g. (grids, quantities of all cases)
+    kind, case, _ = group[0]
+    solutions = [np.asarray(case['solution'], dtype=np.float64) for _, case, _ in group]
+    number_of_grids = len(solutions[0])
+    assert all(len(solution) == number_of_grids for solution in solutions)
+    widths = [int(np.prod(solution.shape[1:], dtype=np.int64)) for solution in solutions]
+    kwargs = {key: value for key, value in case.items() if key != 'solution'}
+    kwargs['solution'] = np.concatenate([solution.reshape(number_of_grids, -1) for solution in solutions], axis=1)
+
+    if kind == 'gci':
+        gci = GCI(**kwargs)
+        values = {key: np.asarray(gci.get(key)) for key in RESULT_KEYS['gci']}
+    else:
+        results = GCS(**kwargs).results()
+        values = {key: results.get(key) for key in RESULT_KEYS['gcs']}
+
+    group_results, offset = [], 0
+    for solution, width in zip(solutions, widths):
+        result = {}
+        for key, value in values.items():
+            if key in QUANTITY_KEYS:
+                value = value[..., offset:offset + width].reshape(value.shape[:-1] + solution.shape[1:])
+            result[key] = _to_json(value)
+        group_results.append(result)
+        offset += width
+    return group_results
+
+
+def _to_json(value):
+    # nested lists of python numbers, with NaN and infinite values (not allowed in JSON) replaced by null
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pyGCS.server',
+                                     description='Serves GCI and GCS evaluations as JSON over HTTP.')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=8080, help='port to listen on (default: %(default)s)')
+    parser.add_argument('--max-batch-size', type=int, default=1024,
+                        help='largest number of cases evaluated at once (default: %(default)s)')
+    parser.add_argument('--max-delay', type=float, default=0.002,
+                        help='time in seconds a request waits for others to join its batch (default: %(default)s)')
+    parser.add_argument('--max-request-size', type=int, default=2 ** 24,
+                        help='largest request body in bytes, larger requests are rejected (default: %(default)s)')
+    arguments = parser.parse_args(argv)
+
+    server = GCIServer(arguments.host, arguments.port, arguments.max_batch_size, arguments.max_delay,
+                       arguments.max_request_size)
+
+    async def serve():
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    main()
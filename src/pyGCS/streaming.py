@@ -0,0 +1,133 @@
+from collections import namedtuple
+import numpy as np
+from . import kernels
+
+
+# result emitted for each record, solution holds the (averaged) solution of each grid in the order of the cells
+StreamingResult = namedtuple('StreamingResult', ['time', 'solution', 'apparent_order', 'extrapolated_value', 'gci',
+                                                 'asymptotic_gci', 'order_converged'])
+
+
+class StreamingGCI(object):
+    """This class computes the GCI history of transient simulations from a stream of monitored solutions
+
+    Each record is a tuple (time, phi_1, phi_2, phi_3), where the solutions are given in the same order as the cells.
+    Depending on the averaging, the GCI is evaluated on the instantaneous solution (averaging=None), the moving average
+    over the last window records (averaging='window') or the phase average of all records at the same phase of a period
+    (averaging='phase'). The memory used is bounded by the window, the number of phase bins and the block size,
+    independent of the number of records.
+    """
+
+    # = constructor ====================================================================================================
+    def __init__(self, **kwargs):
+        self.__data = {}
+        for key, value in kwargs.items():
+            self.__data[key] = value
+
+        assert len(self.__data['cells']) == 3
+
+        kernels.set_default_options(self.__data)
+
+        if 'averaging' not in self.__data:
+            self.__data['averaging'] = None
+        assert self.__data['averaging'] in (None, 'window', 'phase')
+
+        # number of records in the moving average
+        if 'window' not in self.__data:
+            self.__data['window'] = 1
+
+        # period (in units of the time) and number of phase bins of the phase average
+        if self.__data['averaging'] == 'phase':
+            assert 'period' in self.__data
+        if 'bins' not in self.__data:
+            self.__data['bins'] = 36
+
+        # number of records evaluated at once. Larger blocks are faster when processing a complete history, but delay
+        # the results of a live simulation until the block is complete
+        if 'block_size' not in self.__data:
+            self.__data['block_size'] = 1
+
+    # = public API =====================================================================================================
+    def process(self, records):
+        """Consumes the records of an iterable (e.g. a generator) and yields a StreamingResult for each record
+
+        With a moving average, results are only emitted once the first window is complete.
+        """
+        order = sorted(range(0, 3), key=lambda grid: self.__data['cells'][grid], reverse=True)
+        grid_size = kernels.sorted_grid_size(self.__data, order)
+
+        # fails early for invalid grids instead of after the first block of records
+        kernels.refinement_ratio(grid_size)
+
+        self.__reset()
+        block_size = self.__data['block_size']
+        times, solutions = [], []
+        for record in records:
+            times.append(record[0])
+            solutions.append(record[1:])
+            if len(times) == block_size:
+                yield from self.__evaluate_block(times, solutions, order, grid_size)
+                times, solutions = [], []
+        if times:
+            yield from self.__evaluate_block(times, solutions, order, grid_size)
+
+    # = private API ====================================================================================================
+    def __reset(self):
+        # last window - 1 records of the moving average and the sums and counts of the phase bins
+        self.__tail = np.zeros((0, 3))
+        self.__bin_sum = np.zeros((self.__data['bins'], 3))
+        self.__bin_count = np.zeros(self.__data['bins'], dtype=np.int64)
+
+    def __evaluate_block(self, times, solutions, order, grid_size):
+        times = np.asarray(times, dtype=np.float64)
+        solutions = np.asarray(solutions, dtype=np.float64)
+        assert solutions.shape[1:] == (3,)
+        if self.__data['averaging'] == 'window':
+            times, solutions = self.__moving_average(times, solutions)
+        elif self.__data['averaging'] == 'phase':
+            solutions = self.__phase_average(times, solutions)
+        if len(times) == 0:
+            return
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            result = kernels.evaluate_triplet(solutions.T[order], grid_size, self.__data['simulation_order'],
+                                              self.__data['oberkampf_correction'], self.__data['safety_factor'],
+                                              self.__data['order_solver'], self.__data['order_solver_options'])
+        for record in range(0, len(times)):
+            yield StreamingResult(float(times[record]), tuple(solutions[record].tolist()),
+                                  float(result['apparent_order'][record]),
+                                  float(result['extrapolated_value'][record]),
+                                  tuple(result['gci'][:, record].tolist()),
+                                  float(result['asymptotic_gci'][record]),
+                                  bool(result['order_converged'][record]))
+
+    def __moving_average(self, times, solutions):
+        window = self.__data['window']
+        history = np.concatenate([self.__tail, solutions])
+        self.__tail = history[max(0, len(history) - (window - 1)):] if window > 1 else history[:0]
+
+        # the sum over each window is the difference of the cumulative sums window records apart, which are taken
+        # relative to the first record to limit the cancellation error
+        offset = history[:1]
+        cumulative = np.concatenate([np.zeros((1, 3)), np.cumsum(history - offset, axis=0)])
+        averages = offset + (cumulative[window:] - cumulative[:-window]) / window
+        return times[len(times) - len(averages):], averages
+
+    def __phase_average(self, times, solutions):
+        bins = self.__data['bins']
+        phase_bin = (np.floor(np.mod(times, self.__data['period']) / self.__data['period'] * bins)).astype(np.int64)
+        phase_bin = np.minimum(phase_bin, bins - 1)
+        averages = np.empty_like(solutions)
+        for record in range(0, len(times)):
+            self.__bin_sum[phase_bin[record]] += solutions[record]
+            self.__bin_count[phase_bin[record]] += 1
+            averages[record] = self.__bin_sum[phase_bin[record]] / self.__bin_count[phase_bin[record]]
+        return averages
+
+    # = getter =========================================================================================================
+    def get(self, key):
+        return self.__data[key]
+
+    # = setter =========================================================================================================
+    def set(self, key, value):
+        self.__data[key] = value
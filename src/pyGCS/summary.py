@@ -0,0 +1,214 @@
+import numpy as np
+
+
+# Bounded-memory summaries of field-wise GCI results, which are updated chunk by chunk and never store the fields. All
+# sketches are mergeable, so that the summaries of the slices evaluated by different worker processes can be combined
+# into the summary of the complete field, which is the same as if all chunks had been added to a single summary.
+#
+# Quantiles are estimated with a logarithmic histogram as proposed by Masson et al. [5] (DDSketch): a value x is counted
+# in the bucket i = ceil(log(|x|) / log(gamma)), gamma = (1 + alpha) / (1 - alpha), so that every quantile is returned
+# within a relative error of alpha, while the number of buckets only grows with the logarithm of the range of values.
+
+class QuantileSketch(object):
+    """Mergeable quantile sketch with a relative accuracy of alpha"""
+
+    # = constructor ====================================================================================================
+    def __init__(self, alpha=0.01):
+        self.alpha = alpha
+        self.__gamma = (1.0 + alpha) / (1.0 - alpha)
+        self.__log_gamma = np.log(self.__gamma)
+
+        # bucket counts of the positive and (the magnitude of) the negative values, starting at bucket offset
+        self.__counts = {1: np.zeros(0, dtype=np.int64), -1: np.zeros(0, dtype=np.int64)}
+        self.__offset = {1: 0, -1: 0}
+        self.zeros = 0
+
+    # = public API =====================================================================================================
+    def add(self, values):
+        """Adds an array of finite values"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        self.zeros += int(np.count_nonzero(values == 0.0))
+        for sign in (1, -1):
+            magnitude = np.fabs(values[values * sign > 0.0])
+            if len(magnitude):
+                bucket = np.ceil(np.log(magnitude) / self.__log_gamma).astype(np.int64)
+                self.__add_buckets(sign, bucket.min(), np.bincount(bucket - bucket.min()))
+
+    def merge(self, other):
+        assert other.alpha == self.alpha
+        self.zeros += other.zeros
+        for sign in (1, -1):
+            counts = other.__counts[sign]
+            if len(counts):
+                self.__add_buckets(sign, other.__offset[sign], counts)
+        return self
+
+    def count(self):
+        return int(self.__counts[1].sum() + self.__counts[-1].sum()) + self.zeros
+
+    def quantile(self, q):
+        """Returns the q-quantile (0 <= q <= 1) of all values added so far, NaN if there are none"""
+        count = self.count()
+        if count == 0:
+            return float('nan')
+        rank = q * (count - 1)
+
+        # negative values from the largest to the smallest magnitude, zeros, then positive values
+        negative = self.__counts[-1][::-1]
+        if rank < negative.sum():
+            bucket = np.searchsorted(np.cumsum(negative), rank, side='right')
+            return -self.__value(self.__offset[-1] + len(negative) - 1 - bucket)
+        rank -= negative.sum()
+        if rank < self.zeros:
+            return 0.0
+        rank -= self.zeros
+        bucket = np.searchsorted(np.cumsum(self.__counts[1]), rank, side='right')
+        return self.__value(self.__offset[1] + min(bucket, len(self.__counts[1]) - 1))
+
+    # = private API ====================================================================================================
+    def __add_buckets(self, sign, offset, counts):
+        current, current_offset = self.__counts[sign], self.__offset[sign]
+        if len(current) == 0:
+            self.__counts[sign], self.__offset[sign] = counts.astype(np.int64), int(offset)
+            return
+        start = min(current_offset, offset)
+        stop = max(current_offset + len(current), offset + len(counts))
+        combined = np.zeros(stop - start, dtype=np.int64)
+        combined[current_offset - start:current_offset - start + len(current)] += current
+        combined[offset - start:offset - start + len(counts)] += counts
+        self.__counts[sign], self.__offset[sign] = combined, int(start)
+
+    def __value(self, bucket):
+        # centre of the bucket (gamma^(i-1), gamma^i] with the smallest relative error
+        return float(2.0 * np.power(self.__gamma, bucket) / (self.__gamma + 1.0))
+
+
+class Histogram(object):
+    """Mergeable histogram with fixed bin edges, values outside of the edges are counted as under- and overflow"""
+
+    # = constructor ====================================================================================================
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    # = public API =====================================================================================================
+    def add(self, values):
+        """Adds an array of finite values"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        self.underflow += int(np.count_nonzero(values < self.edges[0]))
+        self.overflow += int(np.count_nonzero(values > self.edges[-1]))
+        self.counts += np.histogram(values, self.edges)[0]
+
+    def merge(self, other):
+        assert np.array_equal(other.edges, self.edges)
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+
+class FieldSummary(object):
+    """This class summarises field-wise GCI results (as returned by kernels.evaluate_triplet) chunk by chunk
+
+    For the GCI of the fine grid, the apparent order and the extrapolated value, it keeps a quantile sketch, the minimum
+    and maximum together with the index of the point where they occur, the number of non-finite values and, for the keys
+    given in bins, a histogram. If the relative errors are given, the points with oscillatory convergence are counted.
+    """
+
+    keys = ('gci', 'apparent_order', 'extrapolated_value')
+
+    # = constructor ====================================================================================================
+    def __init__(self, alpha=0.01, bins=None):
+        # bins maps a key to the edges of its histogram
+        if bins is None:
+            bins = {'gci': np.geomspace(1e-6, 1.0, 61), 'apparent_order': np.linspace(0.0, 5.0, 51)}
+        self.alpha = alpha
+        self.bins = bins
+        self.points = 0
+        self.oscillatory = 0
+        self.__sketches = {key: QuantileSketch(alpha) for key in self.keys}
+        self.__histograms = {key: Histogram(edges) for key, edges in bins.items()}
+        self.__non_finite = {key: 0 for key in self.keys}
+        self.__minimum = {key: (float('inf'), -1) for key in self.keys}
+        self.__maximum = {key: (-float('inf'), -1) for key in self.keys}
+
+    # = public API =====================================================================================================
+    def update(self, result, start=0):
+        """Adds a chunk of results, start is the index of its first point within the field"""
+        values = self.__values(result)
+        self.points += len(values['apparent_order'])
+        if 'relative_error' in result:
+            e21, e32 = result['relative_error'][0], result['relative_error'][1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                self.oscillatory += int(np.count_nonzero(~(e32 / e21 > 0.0)))
+
+        for key, value in values.items():
+            finite = np.isfinite(value)
+            self.__non_finite[key] += int(len(value) - np.count_nonzero(finite))
+            if not finite.any():
+                continue
+            self.__sketches[key].add(value[finite])
+            if key in self.__histograms:
+                self.__histograms[key].add(value[finite])
+            point = int(np.argmin(np.where(finite, value, np.inf)))
+            if value[point] < self.__minimum[key][0]:
+                self.__minimum[key] = (float(value[point]), start + point)
+            point = int(np.argmax(np.where(finite, value, -np.inf)))
+            if value[point] > self.__maximum[key][0]:
+                self.__maximum[key] = (float(value[point]), start + point)
+
+    def merge(self, other):
+        """Combines the summary of other (e.g. of another slice of the field) into this summary"""
+        self.points += other.points
+        self.oscillatory += other.oscillatory
+        for key in self.keys:
+            self.__sketches[key].merge(other.__sketches[key])
+            self.__non_finite[key] += other.__non_finite[key]
+            # the first point wins if the minimum or maximum occurs in both summaries
+            self.__minimum[key] = min(self.__minimum[key], other.__minimum[key])
+            self.__maximum[key] = max(self.__maximum[key], other.__maximum[key], key=lambda item: (item[0], -item[1]))
+        for key, histogram in self.__histograms.items():
+            histogram.merge(other.__histograms[key])
+        return self
+
+    def quantile(self, key, q):
+        return self.__sketches[key].quantile(q)
+
+    def histogram(self, key):
+        return self.__histograms[key]
+
+    def minimum(self, key):
+        """Returns the smallest finite value and the index of its point, or (inf, -1) if there is none"""
+        return self.__minimum[key]
+
+    def maximum(self, key):
+        return self.__maximum[key]
+
+    def non_finite(self, key):
+        """Returns the number of points where the value is NaN or infinite, e.g. as the order did not converge"""
+        return self.__non_finite[key]
+
+    def oscillatory_fraction(self):
+        return self.oscillatory / self.points if self.points else float('nan')
+
+    def to_dict(self, quantiles=(0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)):
+        summary = {'points': self.points, 'oscillatory_fraction': self.oscillatory_fraction()}
+        for key in self.keys:
+            summary[key] = {
+                'quantiles': {q: self.quantile(key, q) for q in quantiles},
+                'minimum': self.minimum(key),
+                'maximum': self.maximum(key),
+                'non_finite': self.non_finite(key),
+            }
+        return summary
+
+    # = private API ====================================================================================================
+    @staticmethod
+    def __values(result):
+        # the GCI of the fine grid, i.e. of the first of the two rows of the GCI
+        values = {key: np.asarray(result[key], dtype=np.float64).ravel() for key in ('apparent_order',
+                                                                                     'extrapolated_value')}
+        values['gci'] = np.asarray(result['gci'], dtype=np.float64)[0].ravel()
+        return values
@@ -0,0 +1,126 @@
+import numpy as np
+from . import kernels
+
+
+class MonteCarloGCI(object):
+    """This class propagates the uncertainty of the solutions through the GCI calculation using Monte Carlo sampling"""
+
+    # keys of the sampled results, each an array with one entry per sample (and per grid pair for the gci)
+    sampled_keys = ('apparent_order', 'extrapolated_value', 'gci', 'asymptotic_gci', 'order_converged', 'oscillatory')
+
+    # = constructor ====================================================================================================
+    def __init__(self, **kwargs):
+        self.__data = {}
+        for key, value in kwargs.items():
+            self.__data[key] = value
+
+        # either the standard deviation of the solution on each grid (normally distributed errors, e.g. iterative
+        # convergence) or a set of samples for each grid (e.g. the means of several averaging windows), which are
+        # resampled independently of each other
+        assert ('uncertainty' in self.__data) != ('samples' in self.__data)
+        assert len(self.__data['cells']) == 3
+        if 'solution' not in self.__data:
+            assert 'samples' in self.__data
+            self.__data['solution'] = [float(np.mean(samples)) for samples in self.__data['samples']]
+        assert len(self.__data['solution']) == 3
+
+        kernels.set_default_options(self.__data)
+
+        if 'number_of_samples' not in self.__data:
+            self.__data['number_of_samples'] = 10 ** 5
+
+        # seed of the random number generator, set it to obtain reproducible samples
+        if 'seed' not in self.__data:
+            self.__data['seed'] = None
+
+        # probability covered by the confidence intervals
+        if 'confidence' not in self.__data:
+            self.__data['confidence'] = 0.95
+
+        # number of samples processed at once, which bounds the memory used by the order solver
+        if 'chunk_size' not in self.__data:
+            self.__data['chunk_size'] = 2 ** 18
+
+        self.__data['gci_up_to_date'] = False
+
+    # = public API =====================================================================================================
+    def confidence_interval(self, key, confidence=None):
+        """Returns the lower and upper bound of the central confidence interval of the sampled key
+
+        Samples for which the apparent order could not be found (NaN) are ignored, see get('order_converged').
+        """
+        confidence = self.__data['confidence'] if confidence is None else confidence
+        samples = self.get(key)
+        tail = 100.0 * (1.0 - confidence) / 2.0
+        lower, upper = np.nanpercentile(samples, [tail, 100.0 - tail], axis=-1)
+        return lower, upper
+
+    def summary(self):
+        """Returns the mean, standard deviation, median and confidence interval of each sampled result"""
+        summary = {}
+        for key in ('apparent_order', 'extrapolated_value', 'gci', 'asymptotic_gci'):
+            samples = self.get(key)
+            lower, upper = self.confidence_interval(key)
+            summary[key] = {
+                'mean': np.nanmean(samples, axis=-1),
+                'std': np.nanstd(samples, axis=-1),
+                'median': np.nanmedian(samples, axis=-1),
+                'lower': lower,
+                'upper': upper,
+            }
+        summary['converged_fraction'] = float(np.mean(self.get('order_converged')))
+        summary['oscillatory_fraction'] = float(np.mean(self.get('oscillatory')))
+        return summary
+
+    # = private API ====================================================================================================
+    def __calculate_gci(self):
+        order = sorted(range(0, 3), key=lambda grid: self.__data['cells'][grid], reverse=True)
+        grid_size = kernels.sorted_grid_size(self.__data, order)
+        self.__data['refinement_ratio'] = kernels.refinement_ratio(grid_size)
+
+        random = np.random.default_rng(self.__data['seed'])
+        number_of_samples = self.__data['number_of_samples']
+        results = {key: np.empty(number_of_samples) for key in self.sampled_keys}
+        results['gci'] = np.empty((2, number_of_samples))
+        results['order_converged'] = np.empty(number_of_samples, dtype=bool)
+        results['oscillatory'] = np.empty(number_of_samples, dtype=bool)
+
+        for start in range(0, number_of_samples, self.__data['chunk_size']):
+            stop = min(start + self.__data['chunk_size'], number_of_samples)
+            solution = np.stack([self.__draw(random, grid, stop - start) for grid in order])
+            with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                result = kernels.evaluate_triplet(solution, grid_size, self.__data['simulation_order'],
+                                                  self.__data['oberkampf_correction'], self.__data['safety_factor'],
+                                                  self.__data['order_solver'], self.__data['order_solver_options'])
+            for key in ('apparent_order', 'extrapolated_value', 'asymptotic_gci', 'order_converged'):
+                results[key][start:stop] = result[key]
+            results['gci'][:, start:stop] = result['gci']
+            results['oscillatory'][start:stop] = result['relative_error'][0] * result['relative_error'][1] < 0
+
+        # samples for which the order solver failed do not contribute to the statistics
+        failed = ~results['order_converged']
+        for key in ('apparent_order', 'extrapolated_value', 'asymptotic_gci'):
+            results[key][failed] = np.nan
+        results['gci'][:, failed] = np.nan
+        self.__data.update(results)
+
+    def __draw(self, random, grid, size):
+        if 'uncertainty' in self.__data:
+            return random.normal(self.__data['solution'][grid], self.__data['uncertainty'][grid], size)
+        samples = np.asarray(self.__data['samples'][grid], dtype=np.float64)
+        return samples[random.integers(0, len(samples), size)]
+
+    def __check_if_gci_is_up_to_date_otherwise_calculate_it(self):
+        if self.__data['gci_up_to_date'] is False:
+            self.__calculate_gci()
+            self.__data['gci_up_to_date'] = True
+
+    # = getter =========================================================================================================
+    def get(self, key):
+        self.__check_if_gci_is_up_to_date_otherwise_calculate_it()
+        return self.__data[key]
+
+    # = setter =========================================================================================================
+    def set(self, key, value):
+        self.__data[key] = value
+        self.__data['gci_up_to_date'] = False
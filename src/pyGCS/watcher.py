@@ -0,0 +1,185 @@
+import asyncio
+import csv
+import glob
+import json
+import os
+import numpy as np
+from .GCI import GCI
+from .results import GCSResult
+
+
+# Watches the case directories of many grid convergence studies, one directory per grid level, and evaluates the GCI of
+# a study as soon as at least three of its levels have finished. All directories are polled by a single coroutine, with
+# the file system access running in the default executor of the event loop, so that no thread is blocked per directory.
+#
+# The result file of a level is parsed by a reader, a function which takes the path of the file and returns a
+# dictionary with the number of 'cells' and the 'solution' of the level (a number or a list of numbers, one for each
+# quantity) and optionally its 'volume'. Readers are either one of the READERS below or any other function.
+
+def read_json(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def read_csv(path):
+    # a header with the columns cells, solution and optionally volume, followed by a single row of values
+    with open(path, newline='') as file:
+        row = next(csv.DictReader(file))
+    return {key: float(value) if key != 'cells' else int(float(value)) for key, value in row.items()}
+
+
+READERS = {
+    'json': read_json,
+    'csv': read_csv,
+}
+
+
+class CaseWatcher(object):
+    """This class evaluates grid convergence studies incrementally while their grid levels finish"""
+
+    # = constructor ====================================================================================================
+    def __init__(self, interval=1.0, settle=True):
+        # interval is the time between two scans of the directories in seconds. With settle, a result file is only read
+        # once it has not changed between two scans, so that files which are still being written are not read
+        self.interval = interval
+        self.settle = settle
+        self.__studies = {}
+        self.__stopped = None
+
+    # = public API =====================================================================================================
+    def add_study(self, name, directories, pattern, reader='json', on_update=None, **kwargs):
+        """Adds a study whose levels write a result file matching pattern into each of the directories
+
+        on_update is called (or awaited, if it is a coroutine function) with the name of the study and its GCSResult
+        whenever a level was added or changed and at least three levels are available. The remaining arguments are
+        passed to the GCI class, e.g. dimension and volume.
+        """
+        self.__studies[name] = {
+            'directories': list(directories),
+            'pattern': pattern,
+            'reader': READERS[reader] if isinstance(reader, str) else reader,
+            'on_update': on_update,
+            'kwargs': kwargs,
+            'signatures': {},
+            'pending': {},
+            'levels': {},
+            'triplets': {},
+            'result': None,
+            'error': None,
+            'evaluations': 0,
+        }
+
+    def get(self, name):
+        """Returns the latest successfully evaluated GCSResult of the study, or None if there is none yet"""
+        return self.__studies[name]['result']
+
+    def error(self, name):
+        """Returns the error of the last evaluation of the study, or None if it succeeded"""
+        return self.__studies[name]['error']
+
+    def number_of_evaluations(self, name):
+        """Returns how many GCI studies (triplets of levels) of the study have been evaluated so far"""
+        return self.__studies[name]['evaluations']
+
+    def is_complete(self, name):
+        study = self.__studies[name]
+        return len(study['levels']) == len(study['directories'])
+
+    async def run(self, until_complete=False):
+        """Watches all studies until stop() is called or, with until_complete, all levels of all studies are read"""
+        self.__stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        while not self.__stopped.is_set():
+            await self.scan(loop)
+            if until_complete and all(self.is_complete(name) for name in self.__studies):
+                break
+            try:
+                await asyncio.wait_for(self.__stopped.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        if self.__stopped is not None:
+            self.__stopped.set()
+
+    async def scan(self, loop=None):
+        """Scans all directories once and updates the studies with new or changed levels"""
+        loop = loop or asyncio.get_running_loop()
+        names = list(self.__studies)
+        changes = await asyncio.gather(*[loop.run_in_executor(None, self.__read_changed_levels, self.__studies[name])
+                                         for name in names])
+        for name, changed in zip(names, changes):
+            study = self.__studies[name]
+            if changed and len(study['levels']) >= 3:
+                try:
+                    self.__evaluate(study)
+                    study['error'] = None
+                    if study['on_update'] is not None:
+                        update = study['on_update'](name, study['result'])
+                        if asyncio.iscoroutine(update):
+                            await update
+                except Exception as error:
+                    # a failing study (e.g. two levels with the same number of cells) is reported instead of stopping
+                    # the other studies, it is evaluated again once one of its levels changes
+                    study['error'] = type(error).__name__ + ': ' + str(error)
+
+    # = private API ====================================================================================================
+    def __read_changed_levels(self, study):
+        changed = False
+        for directory in study['directories']:
+            files = sorted(glob.glob(os.path.join(directory, study['pattern'])))
+            if not files:
+                continue
+            try:
+                status = os.stat(files[-1])
+            except OSError:
+                continue
+            signature = (files[-1], status.st_mtime_ns, status.st_size)
+            if signature == study['signatures'].get(directory):
+                continue
+            if self.settle and study['pending'].get(directory) != signature:
+                # read in the next scan if the file has not changed by then
+                study['pending'][directory] = signature
+                continue
+            try:
+                level = study['reader'](files[-1])
+            except Exception:
+                # most likely a partially written file, which is read again in the next scan
+                continue
+            study['signatures'][directory] = signature
+            study['levels'][directory] = level
+            changed = True
+        return changed
+
+    def __evaluate(self, study):
+        # levels sorted from the finest to the coarsest grid, each triplet of successive levels forms one GCI study
+        levels = sorted(study['levels'].values(), key=lambda level: level['cells'], reverse=True)
+        solution = np.asarray([level['solution'] for level in levels], dtype=np.float64)
+        result = GCSResult(len(levels) - 2, solution.shape[1:])
+
+        triplets = {}
+        for index in range(0, len(levels) - 2):
+            triplet = levels[index:index + 3]
+            key = json.dumps(triplet, sort_keys=True, default=lambda value: np.asarray(value).tolist())
+
+            # only triplets containing a new or changed level are evaluated again
+            if key not in study['triplets']:
+                study['triplets'][key] = self.__evaluate_triplet(study, triplet)
+                study['evaluations'] += 1
+            triplets[key] = study['triplets'][key]
+            result.store(index, triplets[key])
+        study['triplets'] = triplets
+        study['result'] = result
+
+    @staticmethod
+    def __evaluate_triplet(study, triplet):
+        kwargs = dict(study['kwargs'])
+        kwargs['cells'] = [level['cells'] for level in triplet]
+        solution = [level['solution'] for level in triplet]
+        kwargs['solution'] = np.asarray(solution, dtype=np.float64) if np.ndim(solution) > 1 else solution
+        if all('volume' in level for level in triplet):
+            kwargs['volume'] = [level['volume'] for level in triplet]
+        gci = GCI(**kwargs)
+        for key in GCSResult.keys:
+            gci.get(key)
+        return gci
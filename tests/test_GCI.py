@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 import src.pyGCS as pyGCS
 
 
@@ -186,3 +187,174 @@ def test_oberkampf_correction(oberkampf_correction):
 
     # assert
     assert order == 2
+
+
+@pytest.fixture
+def batched_solution():
+    rng = np.random.default_rng(42)
+    order = rng.uniform(0.8, 2.5, 500)
+    extrapolated_value = rng.uniform(5.0, 7.0, 500)
+    error_constant = rng.uniform(-0.5, 0.5, 500)
+    noise = rng.normal(0.0, 1e-4, (3, 500))
+    grid_size = np.array([[0.75], [1.125], [1.5]])
+    return extrapolated_value + error_constant * np.power(grid_size, order) + noise
+
+
+def test_batched_gci_matches_scalar_gci(batched_solution):
+    # arrange
+    sut = pyGCS.GCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=batched_solution)
+
+    # act
+    gci = sut.get('gci')
+    order = sut.get('apparent_order')
+    extrapolated_value = sut.get('extrapolated_value')
+    asymptotic_gci = sut.get('asymptotic_gci')
+
+    # assert
+    assert gci.shape == (2, 500)
+    assert order.shape == (500,)
+    for quantity in range(0, 500):
+        reference = pyGCS.GCI(dimension=2, volume=76, cells=[18000, 8000, 4500],
+                              solution=list(batched_solution[:, quantity]))
+        assert gci[0, quantity] == pytest.approx(reference.get('gci')[0], rel=1e-9)
+        assert gci[1, quantity] == pytest.approx(reference.get('gci')[1], rel=1e-9)
+        assert order[quantity] == pytest.approx(reference.get('apparent_order'), rel=1e-9)
+        assert extrapolated_value[quantity] == pytest.approx(reference.get('extrapolated_value'), rel=1e-9)
+        assert asymptotic_gci[quantity] == pytest.approx(reference.get('asymptotic_gci'), rel=1e-9)
+
+
+def test_batched_gci_in_random_order():
+    # arrange
+    solution = np.array([[5.972, 5.972], [6.063, 6.063], [5.863, 5.863]])
+    sut = pyGCS.GCI(dimension=2, volume=[76, 76, 76], cells=[8000, 18000, 4500], solution=solution)
+
+    # act
+    gci = sut.get('gci')
+
+    # assert
+    assert np.all((0.0217 < gci[0]) & (gci[0] < 0.0218))
+    assert np.all((0.0411 < gci[1]) & (gci[1] < 0.0412))
+    assert sut.get('cells') == (18000, 8000, 4500)
+
+
+def test_batched_gci_with_array_inputs_in_random_order(batched_solution):
+    # arrange
+    reference = pyGCS.GCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=batched_solution)
+    sut = pyGCS.GCI(dimension=2, volume=np.array([76.0, 76.0, 76.0]), cells=np.array([8000, 18000, 4500]),
+                    solution=batched_solution[[1, 0, 2]])
+    sut_with_grid_size = pyGCS.GCI(dimension=2, grid_size=np.array([1.125, 0.75, 1.5]),
+                                   cells=np.array([8000, 18000, 4500]), solution=batched_solution[[1, 0, 2]])
+
+    # act
+    gci = sut.get('gci')
+    cells = sut.get_number_of_cells_for_specified_gci_of(0.001)
+    gci_with_grid_size = sut_with_grid_size.get('gci')
+
+    # assert
+    assert list(sut.get('cells')) == [18000, 8000, 4500]
+    assert np.array_equal(gci, reference.get('gci'))
+    assert np.array_equal(cells, reference.get_number_of_cells_for_specified_gci_of(0.001))
+    assert list(sut_with_grid_size.get('grid_size')) == [0.75, 1.125, 1.5]
+    assert gci_with_grid_size.shape == (2, 500)
+
+
+def test_batched_oberkampf_correction():
+    # arrange
+    solution = np.array([[0.00852288, 6.063], [0.00871879, 5.972], [0.00919801, 5.863]])
+    sut = pyGCS.GCI(dimension=2, simulation_order=2, volume=456.745, oberkampf_correction=True,
+                    cells=[51383, 41002, 31719], solution=solution)
+
+    # act
+    order = sut.get('apparent_order')
+    safety_factor = sut.get('safety_factor')
+
+    # assert
+    assert order[0] == 2
+    assert order[1] < 2
+    assert safety_factor[0] == 3.0
+
+
+def test_batched_desired_gci_calculation(batched_solution):
+    # arrange
+    sut = pyGCS.GCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=batched_solution)
+
+    # act
+    cells = sut.get_number_of_cells_for_specified_gci_of(0.001)
+
+    # assert
+    assert cells.shape == (500,)
+    assert np.all((cells > 18000) == (sut.get('gci')[0] > 0.001))
+
+
+@pytest.fixture
+def counting_solver():
+    calls = []
+
+    def solver(e21, e32, r21, r32, initial_order):
+        calls.append((e21, e32, r21, r32))
+        return pyGCS.order_solver.fixed_point(e21, e32, r21, r32, initial_order)
+
+    solver.calls = calls
+    return solver
+
+
+def test_only_required_stages_are_calculated(counting_solver):
+    # arrange
+    sut = pyGCS.GCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=[6.063, 5.972, 5.863],
+                    order_solver=counting_solver)
+
+    # act
+    refinement_ratio = sut.get('refinement_ratio')
+
+    # assert
+    assert refinement_ratio == [1.5, 1.3333333333333335]
+    assert len(counting_solver.calls) == 0
+    assert sut.get('gci_up_to_date') is False
+
+
+def test_changing_safety_factor_reuses_apparent_order(counting_solver):
+    # arrange
+    sut = pyGCS.GCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=[6.063, 5.972, 5.863],
+                    order_solver=counting_solver)
+    gci = sut.get('gci')
+
+    # act
+    sut.set('safety_factor', 2.5)
+    scaled_gci = sut.get('gci')
+
+    # assert
+    assert len(counting_solver.calls) == 1
+    assert scaled_gci[0] == pytest.approx(2.0 * gci[0])
+    assert sut.get('gci_up_to_date') is True
+
+
+def test_toggling_oberkampf_correction(counting_solver):
+    # arrange
+    arguments = dict(dimension=2, simulation_order=2, volume=456.745, cells=[51383, 41002, 31719],
+                     solution=[0.00852288, 0.00871879, 0.00919801])
+    sut = pyGCS.GCI(oberkampf_correction=False, order_solver=counting_solver, **arguments)
+
+    # act & assert
+    for oberkampf_correction in (True, False, True):
+        sut.set('oberkampf_correction', oberkampf_correction)
+        reference = pyGCS.GCI(oberkampf_correction=oberkampf_correction, **arguments)
+        assert sut.get('gci') == reference.get('gci')
+        assert sut.get('apparent_order') == reference.get('apparent_order')
+        assert sut.get('safety_factor') == reference.get('safety_factor')
+    assert len(counting_solver.calls) == 1
+
+
+def test_changing_volume_recalculates_grid_size(example_grid_celik):
+    # arrange
+    sut = example_grid_celik
+    gci = sut.get('gci')
+
+    # act
+    sut.set('volume', [76, 76, 76])
+    same_gci = sut.get('gci')
+    sut.set('volume', 152)
+    grid_size = sut.get('grid_size')
+
+    # assert
+    assert same_gci == gci
+    assert grid_size[0] == pytest.approx((152 / 18000) ** 0.5)
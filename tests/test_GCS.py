@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 import src.pyGCS as pyGCS
 from math import fabs
 
@@ -73,3 +74,72 @@ def test_4_grids_gci_reverse_order(airfoil_grid_4_grids, airfoil_grid_4_grids_re
 
     # assert
     assert gci == gci_reverse
+
+
+def refinement_family(levels, quantities=()):
+    # systematic refinement with a slowly varying ratio and noisy solutions, ordered from the coarsest grid
+    rng = np.random.default_rng(11)
+    cells = [int(1000 * 1.3 ** (2 * level) + level) for level in range(0, levels)]
+    grid_size = np.power(1.0 / np.asarray(cells, dtype=np.float64), 0.5)
+    noise = rng.normal(0.0, 1e-4, (levels,) + quantities)
+    solution = 1.0 + 0.5 * np.power(grid_size, 1.8)[(slice(None),) + (None,) * len(quantities)] + noise
+    return cells, solution
+
+
+def per_window_reference(cells, solution, **kwargs):
+    # one GCI object for each window of three successive grids, as computed by GCS before the vectorised evaluation
+    order = sorted(range(0, len(cells)), key=lambda grid: cells[grid], reverse=True)
+    cells = [cells[grid] for grid in order]
+    solution = solution[order] if isinstance(solution, np.ndarray) else [solution[grid] for grid in order]
+    return [pyGCS.GCI(cells=cells[study:study + 3], solution=solution[study:study + 3], **kwargs)
+            for study in range(0, len(cells) - 2)]
+
+
+@pytest.mark.parametrize('options', [{}, {'oberkampf_correction': True, 'simulation_order': 2},
+                                     {'order_solver': 'newton'}])
+@pytest.mark.parametrize('levels', [5, 60])
+def test_many_levels_are_identical_to_per_window_gci(options, levels):
+    # arrange, with few levels the order is solved window by window and with many levels for all windows at once
+    cells, solution = refinement_family(levels)
+    solution = list(solution)
+    reference = per_window_reference(cells, solution, dimension=2, volume=1.0, **options)
+
+    # act
+    sut = pyGCS.GCS(dimension=2, volume=1.0, cells=cells, solution=solution, **options)
+
+    # assert, the scalar GCI class uses math.pow, which may differ from numpy.power in the last digit
+    assert sut.get('cells') == [tuple(gci.get('cells')) for gci in reference]
+    for key in ('gci', 'apparent_order', 'extrapolated_value', 'asymptotic_gci', 'refinement_ratio'):
+        assert np.allclose(sut.get(key), [gci.get(key) for gci in reference], rtol=1e-13, atol=0.0)
+
+
+def test_many_levels_with_many_quantities_are_identical_to_per_window_gci():
+    # arrange
+    cells, solution = refinement_family(40, quantities=(5,))
+    reference = per_window_reference(cells, solution, dimension=2, volume=1.0)
+
+    # act
+    sut = pyGCS.GCS(dimension=2, volume=1.0, cells=cells, solution=solution)
+
+    # assert
+    for key in ('gci', 'apparent_order', 'extrapolated_value', 'asymptotic_gci'):
+        assert np.array_equal(sut.get(key), np.stack([gci.get(key) for gci in reference]), equal_nan=True)
+
+
+def test_volume_and_grid_size_per_grid():
+    # arrange
+    cells, solution = refinement_family(6)
+    volume = [1.0 + 0.01 * grid for grid in range(0, 6)]
+    grid_size = [pow(v / c, 0.5) for v, c in zip(volume, cells)]
+
+    # act
+    sut = pyGCS.GCS(dimension=2, volume=volume, cells=cells, solution=list(solution))
+    from_grid_size = pyGCS.GCS(grid_size=grid_size, cells=cells, solution=list(solution))
+
+    # assert
+    for study in range(0, 4):
+        reference = pyGCS.GCI(dimension=2, volume=volume[study:study + 3], cells=cells[study:study + 3],
+                              solution=list(solution[study:study + 3]))
+        assert sut.get('gci')[3 - study] == pytest.approx(reference.get('gci'), rel=1e-13)
+        assert from_grid_size.get('gci')[3 - study] == pytest.approx(reference.get('gci'), rel=1e-13)
+
@@ -0,0 +1,97 @@
+import pytest
+import numpy as np
+import src.pyGCS as pyGCS
+
+
+@pytest.fixture
+def cases():
+    cases = []
+    for angle_of_attack in range(0, 12):
+        offset = 0.001 * angle_of_attack
+        cases.append(dict(dimension=2, simulation_order=2, volume=456.745, cells=[31719, 41002, 51383, 67209],
+                          solution=[0.00919801 + offset, 0.00871879 + offset, 0.00852288 + offset,
+                                    0.00842471 + offset]))
+    return cases
+
+
+def test_batch_matches_serial_gcs(cases):
+    # arrange
+    reference = [pyGCS.GCS(**case) for case in cases]
+
+    # act
+    result = pyGCS.GCS.batch(cases, workers=2, chunk_size=5)
+
+    # assert
+    assert result.errors == {}
+    assert result.get('case').shape == (24,)
+    assert result.get('gci').shape == (24, 2)
+    assert result.get('cells').shape == (24, 3)
+    for row in range(0, 24):
+        case, study = result.get('case')[row], result.get('study')[row]
+        assert list(result.get('gci')[row]) == reference[case].get('gci')[study]
+        assert result.get('apparent_order')[row] == reference[case].get('apparent_order')[study]
+
+
+def test_batch_reports_failures_per_case(cases):
+    # arrange
+    cases[3] = dict(dimension=2, volume=456.745, cells=[31719, 31719, 51383], solution=[1.0, 2.0, 3.0])
+
+    # act
+    result = pyGCS.GCS.batch(cases, workers=1)
+
+    # assert
+    assert list(result.errors) == [3]
+    assert 3 not in result.succeeded()
+    assert len(result.succeeded()) == 11
+    assert 3 not in result.get('case')
+    assert result.get('gci').shape == (22, 2)
+
+
+def test_batch_instrumentation_is_merged_across_workers(cases):
+    # act
+    result = pyGCS.GCS.batch(cases, workers=2, chunk_size=5, instrument=True)
+    summary = result.instrumentation.summary()
+
+    # assert
+    assert summary['order_solver']['calls'] == 12
+    assert summary['order_solver']['triplets'] == 24
+    assert summary['stages']['apparent_order']['calls'] == 12
+    assert summary['stages']['gci']['calls'] == 12
+    assert pyGCS.GCS.batch(cases, workers=1).instrumentation is None
+
+
+def test_batch_export_with_case_parameters(cases):
+    # arrange
+    pytest.importorskip('pandas')
+    angles_of_attack = [2.0 * case for case in range(0, len(cases))]
+    result = pyGCS.GCS.batch(cases, workers=1)
+
+    # act
+    frame = result.to_frame(parameters={'angle_of_attack': angles_of_attack})
+
+    # assert
+    assert list(frame.columns[:4]) == ['case', 'angle_of_attack', 'study', 'grid']
+    assert len(frame) == 12 * 2 * 3
+    case = frame[frame['angle_of_attack'] == 10.0]
+    assert list(case['case']) == [5] * 6
+    assert list(case['study']) == [0, 0, 0, 1, 1, 1]
+    assert list(case['grid']) == [1, 2, 3, 2, 3, 4]
+    assert list(case['gci'].dropna()) == [gci for study in pyGCS.GCS(**cases[5]).get('gci') for gci in study]
+
+
+def test_batch_with_quantities_of_different_shapes(cases):
+    # arrange
+    cases[3] = dict(cases[3], solution=np.stack([cases[3]['solution'], cases[3]['solution']], axis=1))
+
+    # act
+    result = pyGCS.GCS.batch(cases, workers=2, chunk_size=5)
+    columns = result.to_columns()
+
+    # assert
+    assert result.errors == {}
+    assert result.results(3).get('gci').shape == (2, 2, 2)
+    assert result.results(4).get('gci').shape == (2, 2)
+    assert list(np.unique(columns['case'])) == list(range(0, 12))
+    assert np.all(np.diff(columns['case']) >= 0)
+    with pytest.raises(Exception):
+        result.get('gci')
@@ -0,0 +1,82 @@
+import pytest
+import numpy as np
+import src.pyGCS as pyGCS
+from src.pyGCS.cache import ResultCache
+
+
+@pytest.fixture
+def airfoil_grid_4_grids():
+    return dict(dimension=2, simulation_order=2, volume=456.745, cells=[31719, 41002, 51383, 67209],
+                solution=[0.00919801, 0.00871879, 0.00852288, 0.00842471])
+
+
+def test_unchanged_inputs_are_loaded_from_cache(tmp_path, airfoil_grid_4_grids):
+    # arrange
+    sut = ResultCache(str(tmp_path))
+    reference = pyGCS.GCS(**airfoil_grid_4_grids)
+
+    # act
+    first = pyGCS.GCS(cache=sut, **airfoil_grid_4_grids)
+    second = pyGCS.GCS(cache=sut, **airfoil_grid_4_grids)
+
+    # assert
+    assert sut.statistics()['hits'] == 1
+    assert sut.statistics()['misses'] == 1
+    assert sut.statistics()['entries'] == 1
+    for key in ('gci', 'apparent_order', 'extrapolated_value', 'cells', 'solution'):
+        assert first.get(key) == reference.get(key)
+        assert second.get(key) == reference.get(key)
+
+
+def test_key_depends_on_normalised_inputs(tmp_path, airfoil_grid_4_grids, monkeypatch):
+    # arrange
+    sut = ResultCache(str(tmp_path))
+    key = sut.key(**airfoil_grid_4_grids)
+
+    # act
+    same = dict(airfoil_grid_4_grids, cells=tuple(float(cells) for cells in airfoil_grid_4_grids['cells']))
+    defaults = dict(airfoil_grid_4_grids, oberkampf_correction=False, order_solver='fixed_point')
+    corrected = dict(airfoil_grid_4_grids, oberkampf_correction=True)
+
+    # assert
+    assert sut.key(**same) == key
+    assert sut.key(**defaults) == key
+    assert sut.key(**corrected) != key
+    assert sut.key(order_solver=lambda *args: None, **airfoil_grid_4_grids) is None
+    monkeypatch.setattr(pyGCS, '__version__', '0.0.0')
+    assert sut.key(**airfoil_grid_4_grids) != key
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, airfoil_grid_4_grids):
+    # arrange
+    sut = ResultCache(str(tmp_path))
+    pyGCS.GCS(cache=sut, **airfoil_grid_4_grids)
+    entry_size = sut.statistics()['size']
+    sut.max_size = 2 * entry_size
+    studies = [dict(airfoil_grid_4_grids, dimension=dimension) for dimension in (2, 3)]
+
+    # act
+    pyGCS.GCS(cache=sut, **studies[1])
+    pyGCS.GCS(cache=sut, **studies[0])
+    pyGCS.GCS(cache=sut, **dict(airfoil_grid_4_grids, simulation_order=1))
+    pyGCS.GCS(cache=sut, **studies[0])
+
+    # assert
+    assert sut.statistics()['entries'] == 2
+    assert sut.statistics()['evictions'] == 1
+    assert sut.statistics()['hits'] == 2
+
+
+def test_cache_shared_between_processes(tmp_path, airfoil_grid_4_grids):
+    # arrange
+    cases = [dict(airfoil_grid_4_grids, cache=str(tmp_path)) for _ in range(0, 4)]
+    cases += [dict(airfoil_grid_4_grids, cache=str(tmp_path), simulation_order=order) for order in (1, 3)]
+
+    # act
+    result = pyGCS.GCS.batch(cases, workers=2, chunk_size=1)
+    cached = pyGCS.GCS.batch(cases, workers=2, chunk_size=1)
+
+    # assert
+    assert result.errors == {} and cached.errors == {}
+    assert ResultCache(str(tmp_path)).statistics()['entries'] == 3
+    assert np.array_equal(result.get('gci'), cached.get('gci'))
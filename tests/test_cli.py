@@ -0,0 +1,75 @@
+import csv
+import io
+import json
+import pytest
+import src.pyGCS as pyGCS
+from src.pyGCS import cli
+
+
+@pytest.fixture
+def airfoil_case():
+    return dict(name='airfoil', dimension=2, simulation_order=2, volume=456.745, cells=[31719, 41002, 51383, 67209],
+                solution=[0.00919801, 0.00871879, 0.00852288, 0.00842471])
+
+
+def test_json_cases_to_csv(tmp_path, airfoil_case):
+    # arrange
+    cases = tmp_path / 'cases.json'
+    cases.write_text(json.dumps({'cases': [airfoil_case]}))
+    output = tmp_path / 'results.csv'
+    reference = pyGCS.GCS(**{key: value for key, value in airfoil_case.items() if key != 'name'})
+
+    # act
+    status = cli.main([str(cases), '--output-type', 'csv', '--output', str(output)])
+    rows = list(csv.DictReader(output.open()))
+
+    # assert
+    assert status == 0
+    assert len(rows) == 6
+    assert rows[0]['case'] == 'airfoil'
+    assert float(rows[0]['gci']) == pytest.approx(reference.get('gci')[0][0])
+
+
+def test_csv_cases_are_grouped_by_case(tmp_path):
+    # arrange
+    cases = tmp_path / 'cases.csv'
+    cases.write_text('case,dimension,volume,cells,solution\n'
+                     'coarse,2,76,18000,6.063\ncoarse,2,76,8000,5.972\ncoarse,2,76,4500,5.863\n'
+                     'fine,2,76,36000,6.1\nfine,2,76,18000,6.063\nfine,2,76,8000,5.972\n')
+
+    # act
+    result = cli.read_cases(str(cases))
+
+    # assert
+    assert [case['name'] for case in result] == ['coarse', 'fine']
+    assert result[0]['cells'] == [18000, 8000, 4500]
+    assert result[1]['solution'] == [6.1, 6.063, 5.972]
+    assert result[1]['dimension'] == 2
+
+
+def test_yaml_cases(tmp_path, airfoil_case):
+    # arrange
+    yaml = pytest.importorskip('yaml')
+    cases = tmp_path / 'cases.yml'
+    cases.write_text(yaml.safe_dump([airfoil_case]))
+
+    # act
+    result = cli.read_cases(str(cases))
+
+    # assert
+    assert result == [airfoil_case]
+
+
+def test_cases_from_stdin_with_failures(monkeypatch, capsys, airfoil_case):
+    # arrange
+    broken = dict(name='broken', dimension=2, volume=1.0, cells=[100, 100, 200], solution=[1.0, 2.0, 3.0])
+    monkeypatch.setattr('sys.stdin', io.StringIO(json.dumps([airfoil_case, broken])))
+
+    # act
+    status = cli.main(['-', '--output-type', 'jsonl', '--workers', '2'])
+    output = capsys.readouterr()
+
+    # assert
+    assert status == 1
+    assert 'case broken failed' in output.err
+    assert {json.loads(line)['case'] for line in output.out.splitlines()} == {'airfoil'}
@@ -0,0 +1,137 @@
+import pytest
+import numpy as np
+import src.pyGCS as pyGCS
+
+
+@pytest.fixture
+def fields(tmp_path):
+    rng = np.random.default_rng(3)
+    points = 10007
+    order = rng.uniform(1.0, 2.5, points)
+    error_constant = rng.uniform(0.1, 1.0, points)
+    paths = []
+    for grid, grid_size in enumerate([0.75, 1.125, 1.5]):
+        path = str(tmp_path / ('grid_' + str(grid) + '.npy'))
+        np.save(path, 6.0 + error_constant * np.power(grid_size, order))
+        paths.append(path)
+    return paths
+
+
+def test_field_gci_matches_batched_gci(fields, tmp_path):
+    # arrange
+    sut = pyGCS.FieldGCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=fields,
+                         output_path=str(tmp_path / 'output'), chunk_size=1000)
+    reference = pyGCS.GCI(dimension=2, volume=76, cells=[18000, 8000, 4500],
+                          solution=np.array([np.load(field) for field in fields]))
+
+    # act
+    order = sut.get('apparent_order')
+    extrapolated_value = sut.get('extrapolated_value')
+    gci = sut.get('gci')
+
+    # assert
+    assert isinstance(order, np.memmap)
+    assert order.shape == (10007,)
+    assert gci.shape == (2, 10007)
+    assert np.array_equal(order, reference.get('apparent_order'))
+    assert np.array_equal(extrapolated_value, reference.get('extrapolated_value'))
+    assert np.array_equal(gci, reference.get('gci'))
+
+
+def test_field_gci_from_raw_binary_in_random_order(fields, tmp_path):
+    # arrange
+    raw = []
+    for field in fields:
+        path = field.replace('.npy', '.raw')
+        np.load(field).astype(np.float32).tofile(path)
+        raw.append(path)
+    sut = pyGCS.FieldGCI(dimension=2, grid_size=[1.125, 1.5, 0.75], cells=[8000, 4500, 18000],
+                         solution=[raw[1], raw[2], raw[0]], input_dtype=np.float32, output_path=str(tmp_path))
+
+    # act
+    order = sut.get('apparent_order')
+
+    # assert
+    assert order.shape == (10007,)
+    assert np.all((order > 0.9) & (order < 2.6))
+
+
+def test_parallel_field_gci_matches_serial_field_gci(fields, tmp_path):
+    # arrange
+    serial = pyGCS.FieldGCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=fields,
+                            output_path=str(tmp_path / 'serial'), chunk_size=1000)
+    sut = pyGCS.FieldGCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=fields,
+                         output_path=str(tmp_path / 'parallel'), chunk_size=1000, workers=3)
+
+    # act
+    order = sut.get('apparent_order')
+    extrapolated_value = sut.get('extrapolated_value')
+    gci = sut.get('gci')
+
+    # assert
+    assert np.array_equal(order, serial.get('apparent_order'))
+    assert np.array_equal(extrapolated_value, serial.get('extrapolated_value'))
+    assert np.array_equal(gci, serial.get('gci'))
+
+
+def test_float32_field_gci_is_bounded_by_float64_reference(tmp_path):
+    # arrange
+    rng = np.random.default_rng(5)
+    points = 20000
+    order = rng.uniform(1.0, 2.5, points)
+    error_constant = rng.uniform(1e-6, 1.0, points)
+    fields = [6.0 + error_constant * np.power(grid_size, order) for grid_size in [0.75, 1.125, 1.5]]
+    reference = pyGCS.FieldGCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=fields,
+                               output_path=str(tmp_path / 'float64'))
+    sut = pyGCS.FieldGCI(dimension=2, volume=76, cells=[18000, 8000, 4500],
+                         solution=[field.astype(np.float32) for field in fields],
+                         output_path=str(tmp_path / 'float32'), dtype=np.float32, precision_threshold=1e-3)
+
+    # act
+    gci = sut.get('gci')
+    lost = sut.get('precision_loss')
+
+    # assert
+    assert gci.dtype == np.float32
+    assert reference.get('precision_loss_points') == 0
+    assert sut.get('precision_loss_points') == np.count_nonzero(lost) > 0
+    kept = ~lost
+    for key, bound in (('apparent_order', 5e-3), ('gci', 5e-3), ('extrapolated_value', 1e-5)):
+        expected = reference.get(key)[..., kept]
+        error = np.fabs(sut.get(key)[..., kept] - expected) / np.fabs(expected)
+        assert np.max(error) < bound
+
+
+@pytest.mark.parametrize('input_dtype', [np.float32, np.float64])
+def test_parallel_float32_field_gci_matches_serial(fields, tmp_path, input_dtype):
+    # arrange
+    fields = [np.load(field).astype(input_dtype) for field in fields]
+    serial = pyGCS.FieldGCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=fields,
+                            output_path=str(tmp_path / 'serial'), chunk_size=1000, dtype=np.float32)
+    sut = pyGCS.FieldGCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=fields,
+                         output_path=str(tmp_path / 'parallel'), chunk_size=1000, dtype=np.float32, workers=2)
+
+    # act
+    gci = sut.get('gci')
+
+    # assert
+    assert np.array_equal(gci, serial.get('gci'))
+    assert np.array_equal(sut.get('precision_loss'), serial.get('precision_loss'))
+    assert sut.get('precision_loss_points') == serial.get('precision_loss_points')
+
+
+def test_serial_float32_field_gci_reads_float64_fields_at_full_precision(fields, tmp_path):
+    # arrange
+    reference = pyGCS.FieldGCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=fields,
+                               output_path=str(tmp_path / 'float64'), chunk_size=1000)
+    sut = pyGCS.FieldGCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=fields,
+                         output_path=str(tmp_path / 'float32'), chunk_size=1000, dtype=np.float32)
+
+    # act
+    gci = sut.get('gci')
+
+    # assert
+    assert gci.dtype == np.float32
+    assert np.array_equal(gci, reference.get('gci').astype(np.float32))
+    assert np.array_equal(sut.get('apparent_order'), reference.get('apparent_order').astype(np.float32))
+    assert sut.get('precision_loss_points') == reference.get('precision_loss_points')
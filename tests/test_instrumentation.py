@@ -0,0 +1,107 @@
+import pytest
+import numpy as np
+import src.pyGCS as pyGCS
+from src.pyGCS import instrumentation
+from src.pyGCS.instrumentation import Recorder
+
+
+@pytest.fixture
+def oscillatory_grid():
+    return dict(dimension=2, simulation_order=2, volume=76, cells=[18000, 8000, 4500], solution=[6.063, 5.972, 6.1])
+
+
+def test_stages_are_timed_while_recording():
+    # arrange
+    gci = pyGCS.GCI(dimension=2, simulation_order=2, volume=76, cells=[18000, 8000, 4500],
+                    solution=[6.063, 5.972, 5.863])
+
+    # act
+    with Recorder() as recorder:
+        gci.get('gci')
+        gci.get('gci')
+    summary = recorder.summary()
+
+    # assert
+    assert set(summary['stages']) == {'sort', 'refinement_ratio', 'relative_error', 'apparent_order',
+                                      'relative_normalised_error', 'oberkampf_correction', 'gci'}
+    assert all(stage['calls'] == 1 for stage in summary['stages'].values())
+    assert summary['total_time'] > 0
+    assert summary['order_solver']['calls'] == 1
+    assert summary['order_solver']['iterations'] == gci.get('order_iterations')
+    assert instrumentation.recorders == []
+
+
+def test_gcs_stages_are_timed_while_recording():
+    # act
+    with Recorder() as recorder:
+        pyGCS.GCS(dimension=2, volume=456.745, cells=[31719, 41002, 51383, 67209],
+                  solution=[0.00919801, 0.00871879, 0.00852288, 0.00842471])
+    summary = recorder.summary()
+
+    # assert
+    assert set(summary['stages']) == {stage[0] for stage in pyGCS.GCI.stages}
+    assert all(stage['calls'] == 1 for stage in summary['stages'].values())
+    assert summary['total_time'] > 0
+    assert summary['order_solver']['triplets'] == 2
+
+
+def test_nothing_is_recorded_without_recorder():
+    # arrange
+    recorder = Recorder()
+
+    # act
+    pyGCS.GCS(dimension=2, simulation_order=2, volume=76, cells=[18000, 8000, 4500], solution=[6.063, 5.972, 5.863])
+
+    # assert
+    assert recorder.summary()['stages'] == {}
+
+
+def test_flags_and_callback(oscillatory_grid):
+    # arrange
+    events = []
+
+    # act
+    with Recorder(callback=events.append) as recorder:
+        pyGCS.GCS(oberkampf_correction=True, **oscillatory_grid)
+        pyGCS.GCS(oberkampf_correction=True, dimension=2, simulation_order=2, volume=76, cells=[18000, 8000, 4500],
+                  solution=[6.063, 6.0, 5.99])
+    summary = recorder.summary()
+
+    # assert
+    assert summary['order_solver']['oscillatory'] == 1
+    assert summary['oberkampf_correction']['triplets'] == 2
+    assert summary['oberkampf_correction']['clamped'] == 1
+    assert {event['event'] for event in events} == {'stage', 'order_solver', 'oberkampf_correction'}
+
+
+def test_batched_triplets_are_counted():
+    # arrange
+    solution = np.array([[6.063, 1.0, 2.0], [5.972, 0.9, 2.1], [5.863, 0.7, 2.05]])
+
+    # act
+    with Recorder() as recorder:
+        pyGCS.GCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=solution).get('gci')
+    summary = recorder.summary()
+
+    # assert
+    assert summary['order_solver']['calls'] == 1
+    assert summary['order_solver']['triplets'] == 3
+    assert summary['order_solver']['oscillatory'] == 1
+
+
+def test_recorders_can_be_merged():
+    # arrange
+    first, second = Recorder(), Recorder()
+    with first:
+        pyGCS.GCS(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=[6.063, 5.972, 5.863])
+    with second:
+        pyGCS.GCS(dimension=2, volume=456.745, cells=[31719, 41002, 51383, 67209],
+                  solution=[0.00919801, 0.00871879, 0.00852288, 0.00842471])
+
+    # act
+    summary = first.merge(second).summary()
+
+    # assert
+    assert summary['order_solver']['calls'] == 2
+    assert summary['order_solver']['triplets'] == 3
+    assert summary['stages']['gci']['calls'] == 2
@@ -0,0 +1,91 @@
+import pytest
+import numpy as np
+import src.pyGCS as pyGCS
+
+pytest.importorskip('scipy')
+from src.pyGCS.interpolation import Interpolator
+
+
+@pytest.fixture
+def grids():
+    rng = np.random.default_rng(11)
+    return [rng.uniform(0.0, 1.0, (points, 2)) for points in (4000, 2000, 1000)]
+
+
+def linear_field(points):
+    return 1.0 + 2.0 * points[:, 0] - 0.5 * points[:, 1]
+
+
+def test_interpolation_onto_finest_grid(grids):
+    # arrange
+    sut = Interpolator(grids)
+    values = [linear_field(points) for points in grids]
+
+    # act
+    solution = sut.interpolate(values)
+
+    # assert
+    assert solution.shape == (3, 4000)
+    assert np.array_equal(solution[0], values[0])
+    assert np.allclose(solution[1], values[0], atol=0.1)
+    assert np.allclose(solution[2], values[0], atol=0.15)
+
+
+def test_interpolation_onto_probes(grids):
+    # arrange
+    sut = Interpolator(grids, neighbours=8)
+    probes = np.array([[0.5, 0.5], [0.25, 0.75]])
+    values = [np.stack([linear_field(points), 2.0 * linear_field(points)], axis=1) for points in grids]
+
+    # act
+    solution = sut.interpolate(values, target=probes)
+
+    # assert
+    assert solution.shape == (3, 2, 2)
+    assert np.allclose(solution[:, :, 0], linear_field(probes), atol=0.05)
+    assert np.allclose(solution[:, :, 1], 2.0 * linear_field(probes), atol=0.1)
+
+
+def test_spatial_index_is_reused_across_fields(grids):
+    # arrange
+    sut = Interpolator(grids)
+
+    # act
+    for variable in range(0, 20):
+        sut.interpolate([variable * linear_field(points) for points in grids])
+
+    # assert
+    assert sut.number_of_trees() == 3
+
+
+def test_interpolated_solution_feeds_gci(grids):
+    # arrange
+    sut = Interpolator(grids)
+    values = [6.0 + 0.1 * h * h * linear_field(points) for h, points in zip((1.0, 1.4, 2.0), grids)]
+
+    # act
+    gci = pyGCS.GCI(dimension=2, volume=1.0, cells=[4000, 2000, 1000], solution=sut.interpolate(values))
+
+    # assert
+    assert gci.get('gci').shape == (2, 4000)
+
+
+def test_interpolated_variables_feed_gci(grids):
+    # arrange
+    sut = Interpolator(grids)
+    values = [np.stack([6.0 + 0.1 * h * h * linear_field(points), 2.0 - 0.3 * h * linear_field(points)], axis=1)
+              for h, points in zip((1.0, 1.4, 2.0), grids)]
+    solution = sut.interpolate(values)
+
+    # act
+    gci = pyGCS.GCI(dimension=2, volume=1.0, cells=[4000, 2000, 1000], solution=solution)
+
+    # assert
+    assert solution.shape == (3, 4000, 2)
+    assert gci.get('gci').shape == (2, 4000, 2)
+    assert gci.get('apparent_order').shape == (4000, 2)
+    for variable in range(0, 2):
+        reference = pyGCS.GCI(dimension=2, volume=1.0, cells=[4000, 2000, 1000], solution=solution[:, :, variable])
+        assert np.array_equal(gci.get('gci')[:, :, variable], reference.get('gci'), equal_nan=True)
+        assert np.array_equal(gci.get('extrapolated_value')[:, variable], reference.get('extrapolated_value'),
+                              equal_nan=True)
@@ -0,0 +1,71 @@
+import pytest
+import numpy as np
+import src.pyGCS as pyGCS
+from src.pyGCS import least_squares
+
+
+@pytest.fixture
+def grid_sizes():
+    return np.array([1.0, 1.2, 1.5, 1.9, 2.4, 3.0])
+
+
+def test_fit_recovers_exact_power_law(grid_sizes):
+    # arrange
+    solution = 2.0 + 0.3 * np.power(grid_sizes, 1.7)
+
+    # act
+    unweighted = least_squares.fit(grid_sizes, solution)
+    weighted = least_squares.fit(grid_sizes, solution, weighted=True)
+
+    # assert
+    for result in (unweighted, weighted):
+        assert result.order == pytest.approx(1.7, rel=1e-6)
+        assert result.extrapolated_value == pytest.approx(2.0, rel=1e-6)
+        assert result.coefficient == pytest.approx(0.3, rel=1e-6)
+        assert result.standard_deviation == pytest.approx(0.0, abs=1e-6)
+
+
+def test_fit_is_vectorised_over_quantities(grid_sizes):
+    # arrange
+    orders = np.array([0.8, 1.0, 1.5, 2.0, 3.0])
+    solution = 2.0 + 0.3 * np.power(grid_sizes[:, None], orders[None, :])
+    solution = solution + 1e-5 * np.random.default_rng(0).standard_normal(solution.shape)
+
+    # act
+    result = least_squares.fit(grid_sizes, solution)
+
+    # assert
+    assert result.order.shape == (5,)
+    assert result.order == pytest.approx(orders, rel=1e-3)
+    for quantity in range(0, 5):
+        single = least_squares.fit(grid_sizes, solution[:, quantity])
+        assert single.order == pytest.approx(result.order[quantity], rel=1e-9)
+
+
+def test_three_grids_match_gci():
+    # arrange
+    grid = dict(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=[6.063, 5.972, 5.863])
+    reference = pyGCS.GCI(**grid)
+
+    # act
+    sut = pyGCS.LeastSquaresGCI(fit='unweighted', **grid)
+
+    # assert
+    assert sut.get('apparent_order') == pytest.approx(reference.get('apparent_order'), rel=1e-5)
+    assert sut.get('extrapolated_value') == pytest.approx(reference.get('extrapolated_value'), rel=1e-6)
+    assert sut.get('standard_deviation') == 0.0
+
+
+def test_automatic_fit_uses_smaller_standard_deviation():
+    # arrange
+    grid = dict(dimension=2, volume=456.745, cells=[31719, 41002, 51383, 67209],
+                solution=[0.00919801, 0.00871879, 0.00852288, 0.00842471])
+    fits = {fit: pyGCS.LeastSquaresGCI(fit=fit, **grid) for fit in ('weighted', 'unweighted', 'auto')}
+
+    # act
+    deviation = {fit: sut.get('standard_deviation') for fit, sut in fits.items()}
+
+    # assert
+    assert deviation['auto'] == min(deviation['weighted'], deviation['unweighted'])
+    assert fits['auto'].get('weighted') == (deviation['weighted'] < deviation['unweighted'])
+    assert 0 < fits['auto'].get('relative_uncertainty') < 0.1
@@ -0,0 +1,200 @@
+import pytest
+import numpy as np
+import src.pyGCS as pyGCS
+from src.pyGCS import order_solver
+
+
+@pytest.fixture
+def celik_errors():
+    # e21, e32, r21, r32 of the example grid by Celik et al.
+    return -0.091, -0.109, 1.5, 4.0 / 3.0
+
+
+@pytest.fixture
+def random_errors():
+    rng = np.random.default_rng(7)
+    order = rng.uniform(0.8, 3.0, 10000)
+    r21 = rng.uniform(1.2, 2.0, 10000)
+    r32 = rng.uniform(1.2, 2.0, 10000)
+    e21 = np.power(r21, order) - 1.0
+    e32 = r21 ** order * (np.power(r32, order) - 1.0)
+    return e21, e32, r21, r32, order
+
+
+def test_fixed_point_order(celik_errors):
+    # arrange
+    e21, e32, r21, r32 = celik_errors
+
+    # act
+    result = order_solver.solve(e21, e32, r21, r32, 2, solver='fixed_point')
+
+    # assert
+    assert 1.53 < result.order < 1.54
+    assert result.converged
+    assert result.iterations > 1
+
+
+def test_fixed_point_only_reports_converged_orders(random_errors):
+    # arrange
+    e21, e32, r21, r32, order = random_errors
+
+    # act
+    result = order_solver.solve(e21, e32, r21, r32, 2, solver='fixed_point')
+
+    # assert
+    assert np.count_nonzero(result.converged) > 9000
+    assert np.allclose(result.order[result.converged], order[result.converged], rtol=0.0, atol=1e-5)
+
+
+def test_fixed_point_iterates_through_oscillations():
+    # arrange, the coarser triplet of the four grid example, where the residual changes its sign after one iteration
+    e21, e32 = 0.00871879 - 0.00852288, 0.00919801 - 0.00871879
+    r21, r32 = np.power(51383 / 41002, 0.5), np.power(41002 / 31719, 0.5)
+
+    # act
+    fixed_point = order_solver.solve(e21, e32, r21, r32, 2, solver='fixed_point')
+    newton = order_solver.solve(e21, e32, r21, r32, 2, solver='newton')
+
+    # assert
+    assert fixed_point.converged
+    assert fixed_point.iterations > 2
+    assert fixed_point.order == pytest.approx(newton.order, rel=1e-6)
+
+
+def test_fixed_point_for_single_triplets_agrees_with_arrays(random_errors):
+    # arrange
+    e21, e32, r21, r32, _ = random_errors
+
+    # act
+    result = order_solver.solve(e21[:200], e32[:200], r21[:200], r32[:200], 2, solver='fixed_point')
+    single = [order_solver.solve(float(e21[i]), float(e32[i]), float(r21[i]), float(r32[i]), 2, solver='fixed_point')
+              for i in range(0, 200)]
+
+    # assert, single triplets are iterated with math.pow, which may differ from numpy.power in the last digit, so that
+    # only the converged orders agree (chaotic iterations amplify the difference)
+    converged = result.converged
+    assert all(isinstance(solution.order, float) for solution in single)
+    assert [solution.converged for solution in single] == list(converged)
+    assert [solution.iterations for solution in single] == list(result.iterations)
+    assert np.allclose(np.array([solution.order for solution in single])[converged], result.order[converged],
+                       rtol=1e-12, atol=0.0)
+
+
+def test_newton_order_agrees_with_fixed_point(celik_errors):
+    # arrange
+    e21, e32, r21, r32 = celik_errors
+
+    # act
+    fixed_point = order_solver.solve(e21, e32, r21, r32, 2, solver='fixed_point')
+    newton = order_solver.solve(e21, e32, r21, r32, 2, solver='newton')
+
+    # assert
+    assert newton.converged
+    assert newton.order == pytest.approx(fixed_point.order, rel=1e-6)
+    assert newton.iterations < fixed_point.iterations
+    assert newton.residual < 1e-12
+
+
+
+@pytest.mark.parametrize('solver', ['fixed_point', 'newton'])
+def test_single_triplets_return_python_numbers(celik_errors, solver):
+    # arrange
+    e21, e32, r21, r32 = celik_errors
+
+    # act
+    result = order_solver.solve(e21, e32, r21, r32, 2, solver=solver)
+    vanishing_error = order_solver.solve(0.0, e32, r21, r32, 2, solver=solver)
+
+    # assert
+    for solution in (result, vanishing_error):
+        assert [type(value) for value in solution] == [float, int, bool, float]
+
+
+def test_newton_recovers_order_of_exact_power_law(random_errors):
+    # arrange
+    e21, e32, r21, r32, order = random_errors
+
+    # act
+    result = order_solver.solve(e21, e32, r21, r32, 2, solver='newton')
+
+    # assert
+    assert result.order.shape == (10000,)
+    assert np.all(result.converged)
+    assert np.allclose(result.order, order, rtol=1e-9)
+
+
+def test_newton_avoids_the_spurious_root():
+    # arrange, refinement ratios close to unity, where the residual has a second root at larger orders which the
+    # Newton iteration on the complete residual heads for from the simulation order
+    rng = np.random.default_rng(1)
+    r21 = 1.02 + 0.01 * rng.random(1000)
+    r32 = 1.3 + 0.1 * rng.random(1000)
+    order = 0.5 + 0.2 * rng.random(1000)
+    e21 = np.power(r21, order) - 1.0
+    e32 = np.power(r21 * r32, order) - np.power(r21, order)
+
+    # act
+    result = order_solver.solve(e21, e32, r21, r32, 2, solver='newton')
+
+    # assert
+    assert np.all(result.converged)
+    assert np.allclose(result.order, order, rtol=1e-9)
+
+
+def test_non_convergence_is_reported_as_data(capsys):
+    # arrange
+    e21 = np.array([-0.091, 0.0])
+    e32 = np.array([-0.109, -0.109])
+
+    # act
+    fixed_point = order_solver.solve(e21, e32, 1.5, 4.0 / 3.0, 2, solver='fixed_point', max_iteration=3)
+    newton = order_solver.solve(e21, e32, 1.5, 4.0 / 3.0, 2, solver='newton')
+
+    # assert
+    assert list(fixed_point.converged) == [False, False]
+    assert list(fixed_point.iterations) == [2, 1]
+    assert list(newton.converged) == [True, False]
+    assert newton.iterations[1] == 0
+    assert capsys.readouterr().out == ''
+
+
+def test_custom_solver():
+    # arrange
+    def constant_order(e21, e32, r21, r32, initial_order):
+        shape = np.shape(e21)
+        return order_solver.OrderSolution(np.full(shape, 1.0 * initial_order), np.zeros(shape, dtype=int),
+                                          np.ones(shape, dtype=bool), np.zeros(shape))
+
+    sut = pyGCS.GCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=[6.063, 5.972, 5.863],
+                    order_solver=constant_order)
+
+    # act
+    order = sut.get('apparent_order')
+
+    # assert
+    assert order == 2.0
+    assert sut.get('order_converged')
+
+
+def test_unknown_solver():
+    # arrange
+    sut = pyGCS.GCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=[6.063, 5.972, 5.863],
+                    order_solver='secant')
+
+    # act & assert
+    with pytest.raises(Exception):
+        sut.get('apparent_order')
+
+
+def test_gci_reports_solver_statistics():
+    # arrange
+    sut = pyGCS.GCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=[6.063, 5.972, 5.863],
+                    order_solver='newton')
+
+    # act
+    order = sut.get('apparent_order')
+
+    # assert
+    assert 1.53 < order < 1.54
+    assert sut.get('order_converged') is True
+    assert sut.get('order_iterations') > 0
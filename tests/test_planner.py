@@ -0,0 +1,77 @@
+import pytest
+import numpy as np
+import src.pyGCS as pyGCS
+
+
+@pytest.fixture
+def example_grid_celik():
+    return pyGCS.GCI(dimension=2, simulation_order=2, volume=76, cells=[18000, 8000, 4500],
+                     solution=[6.063, 5.972, 5.863])
+
+
+def test_power_law_cost_fit():
+    # arrange
+    cells = np.array([1e4, 3e4, 1e5, 3e5])
+
+    # act
+    sut = pyGCS.PowerLawCost.fit(cells, 2e-4 * np.power(cells, 1.2))
+
+    # assert
+    assert sut.coefficient == pytest.approx(2e-4)
+    assert sut.exponent == pytest.approx(1.2)
+    assert sut(1e6) == pytest.approx(2e-4 * 1e6 ** 1.2)
+
+
+def test_planned_grid_meets_target_at_lowest_cost(example_grid_celik):
+    # arrange
+    sut = pyGCS.RefinementPlanner(example_grid_celik, pyGCS.PowerLawCost(1e-3, 1.0), max_steps=2)
+
+    # act
+    schedule = sut.plan(0.01)
+
+    # assert
+    assert sut.number_of_schedules() == 8 + 8 * 8
+    assert schedule.predicted_gci <= 0.01
+    assert schedule.refinement_ratio == (1.7,)
+    assert schedule.cells == (round(18000 * 1.7 ** 2),)
+    assert schedule.cells[0] >= example_grid_celik.get_number_of_cells_for_specified_gci_of(0.01)
+    assert schedule.cost == pytest.approx(1e-3 * schedule.cells[0])
+
+
+def test_large_reductions_require_several_grids(example_grid_celik):
+    # arrange
+    sut = pyGCS.RefinementPlanner(example_grid_celik, pyGCS.PowerLawCost(1e-3, 1.2), ratios=[1.5, 2.0], max_steps=3)
+
+    # act
+    schedules = sut.sweep([0.02, 0.005, 0.001, 1e-6])
+
+    # assert
+    assert [len(schedule.cells) for schedule in schedules[:3]] == [1, 2, 3]
+    assert all(schedule.predicted_gci <= schedule.target for schedule in schedules[:3])
+    assert schedules[0].cost < schedules[1].cost < schedules[2].cost
+    assert schedules[3] is None
+
+
+def test_no_refinement_needed_if_target_is_met(example_grid_celik):
+    # arrange
+    sut = pyGCS.RefinementPlanner(example_grid_celik, pyGCS.PowerLawCost(1e-3, 1.0), max_steps=2)
+
+    # act
+    schedules = sut.sweep([0.05, 0.01])
+
+    # assert
+    assert schedules[0].refinement_ratio == ()
+    assert schedules[0].cells == ()
+    assert schedules[0].cost == 0.0
+    assert schedules[0].predicted_gci == example_grid_celik.get('gci')[0]
+    assert len(schedules[1].cells) == 1
+
+
+def test_batched_gci_is_rejected():
+    # arrange
+    gci = pyGCS.GCI(dimension=2, volume=76, cells=[18000, 8000, 4500],
+                    solution=np.array([[6.063, 6.063], [5.972, 5.972], [5.863, 5.863]]))
+
+    # act & assert
+    with pytest.raises(Exception):
+        pyGCS.RefinementPlanner(gci, pyGCS.PowerLawCost(1e-3, 1.0))
@@ -0,0 +1,76 @@
+import pytest
+import numpy as np
+import src.pyGCS as pyGCS
+from src.pyGCS.refinement import regional_refinement
+
+
+def test_uniform_field_matches_global_number_of_cells():
+    # arrange
+    gci = pyGCS.GCI(dimension=2, simulation_order=2, volume=76, cells=[18000, 8000, 4500],
+                    solution=[6.063, 5.972, 5.863])
+    field = np.full(18000, gci.get('gci')[0])
+
+    # act
+    result = regional_refinement(field, gci.get('apparent_order'), 0.001, dimension=2)
+
+    # assert
+    assert result.total_cells == 18000
+    assert result.total_estimated_cells == pytest.approx(gci.get_number_of_cells_for_specified_gci_of(0.001),
+                                                         rel=1e-9)
+    assert result.total_adaptive_cells == pytest.approx(result.total_estimated_cells, rel=1e-9)
+
+
+def test_refinement_factor_per_region_and_cell():
+    # arrange
+    gci = np.array([0.001, 0.002, 0.04, 0.01, 0.09, 0.5])
+    order = np.array([2.0, 2.0, 2.0, 1.0, 2.0, np.nan])
+    regions = np.array([0, 0, 1, 1, 2, 2])
+
+    # act
+    result = regional_refinement(gci, order, 0.01, dimension=3, regions=regions, chunk_size=4)
+
+    # assert
+    assert list(result.factor) == pytest.approx([1.0, 2.0, 3.0])
+    assert list(result.indicator) == pytest.approx([1.0, 1.0, 2.0, 1.0, 3.0, 1.0])
+    assert result.indicator.dtype == np.float32
+    assert list(result.cells) == [2, 2, 2]
+    assert list(result.invalid) == [0, 0, 1]
+    assert list(result.estimated_cells) == pytest.approx([2.0, 16.0, 54.0])
+    assert list(result.adaptive_cells) == pytest.approx([2.0, 9.0, 28.0])
+    assert result.total_estimated_cells == pytest.approx(72.0)
+
+
+def test_volume_weighted_mean_and_capped_factor():
+    # arrange
+    gci = np.array([0.04, 0.01, 1.0])
+    volume = np.array([1.0, 3.0, 1.0])
+    regions = np.array([0, 0, 1])
+    indicator = np.zeros(3)
+
+    # act
+    result = regional_refinement(gci, 2.0, 0.01, regions=regions, volume=volume, statistic='mean', max_factor=4.0,
+                                 indicator=indicator)
+
+    # assert
+    assert result.factor[0] == pytest.approx(np.sqrt((0.25 * 0.04 + 0.75 * 0.01) / 0.01))
+    assert result.factor[1] == 4.0
+    assert list(result.volume) == [4.0, 1.0]
+    assert result.indicator is indicator
+    assert list(indicator) == pytest.approx([2.0, 1.0, 4.0])
+
+
+def test_chunked_evaluation_matches_single_chunk():
+    # arrange
+    rng = np.random.default_rng(2)
+    gci = rng.uniform(0.0, 0.05, 10007)
+    order = rng.uniform(0.5, 3.0, 10007)
+    regions = rng.integers(0, 7, 10007)
+    reference = regional_refinement(gci, order, 0.01, regions=regions, chunk_size=10007)
+
+    # act
+    result = regional_refinement(gci, order, 0.01, regions=regions, chunk_size=1000)
+
+    # assert
+    assert np.array_equal(result.factor, reference.factor)
+    assert np.array_equal(result.indicator, reference.indicator)
+    assert np.allclose(result.adaptive_cells, reference.adaptive_cells, rtol=1e-12)
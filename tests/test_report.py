@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+import pytest
+import numpy as np
+import src.pyGCS as pyGCS
+from src.pyGCS import report
+
+
+@pytest.fixture
+def airfoil_grid_4_grids():
+    return pyGCS.GCS(dimension=2, simulation_order=2, volume=456.745, cells=[31719, 41002, 51383, 67209],
+                     solution=[0.00919801, 0.00871879, 0.00852288, 0.00842471])
+
+
+@pytest.fixture
+def three_grids():
+    return pyGCS.GCS(dimension=2, simulation_order=2, volume=76, cells=[18000, 8000, 4500],
+                     solution=[6.063, 5.972, 5.863])
+
+
+def test_print_table_uses_file_name(tmp_path, airfoil_grid_4_grids):
+    # act
+    airfoil_grid_4_grids.print_table(output_type='markdown', output_path=str(tmp_path), file_name='lift')
+    airfoil_grid_4_grids.print_table(output_type='csv', output_path=str(tmp_path), file_name='lift')
+
+    # assert
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['lift.csv', 'lift.md']
+    assert 'Table 1: Grid convergence study over 4 grids' in (tmp_path / 'lift.md').read_text()
+
+
+def test_multiple_studies_are_streamed_into_one_table_file(airfoil_grid_4_grids, three_grids):
+    # arrange
+    file = io.StringIO()
+
+    # act
+    report.write_report([airfoil_grid_4_grids, three_grids], file, 'latex', labels=['drag', 'lift'])
+    content = file.getvalue()
+
+    # assert
+    assert content.count('% Generated using pyGCS') == 1
+    assert content.count('\\begin{table}') == 2
+    assert '\\label{tab:gci_study}' in content and '\\label{tab:gci_study_2}' in content
+    assert 'represents the drag' in content and 'represents the lift' in content
+
+
+def test_one_table_per_quantity():
+    # arrange
+    solution = np.array([[6.063, 1.0], [5.972, 0.9], [5.863, 0.7]])
+    sut = pyGCS.GCS(dimension=2, simulation_order=2, volume=76, cells=[18000, 8000, 4500], solution=solution)
+    file = io.StringIO()
+
+    # act
+    report.write_report([sut], file, 'markdown')
+
+    # assert
+    assert 'Table 1:' in file.getvalue() and 'Table 2:' in file.getvalue()
+    assert 'phi represents the quantity 1 ' in file.getvalue()
+
+
+def test_csv_report(airfoil_grid_4_grids, three_grids):
+    # arrange
+    file = io.StringIO()
+
+    # act
+    report.write_report([airfoil_grid_4_grids, three_grids], file, 'csv', labels=['airfoil', 'channel'])
+    rows = list(csv.DictReader(io.StringIO(file.getvalue())))
+
+    # assert
+    assert len(rows) == 6 + 3
+    assert rows[0]['case'] == 'airfoil' and rows[-1]['case'] == 'channel'
+    assert int(rows[0]['cells']) == 67209
+    assert float(rows[3]['gci']) == pytest.approx(airfoil_grid_4_grids.get('gci')[1][0])
+    assert rows[2]['gci'] == 'nan'
+
+
+def test_jsonl_report(airfoil_grid_4_grids):
+    # arrange
+    file = io.StringIO()
+
+    # act
+    report.write_report([airfoil_grid_4_grids], file, 'jsonl')
+    rows = [json.loads(line) for line in file.getvalue().splitlines()]
+
+    # assert
+    assert len(rows) == 6
+    assert rows[0]['case'] == 0
+    assert rows[2]['gci'] is None
+    assert rows[5]['apparent_order'] == pytest.approx(airfoil_grid_4_grids.get('apparent_order')[1])
+
+
+def test_parquet_report(tmp_path, airfoil_grid_4_grids, three_grids):
+    # arrange
+    parquet = pytest.importorskip('pyarrow.parquet')
+    path = tmp_path / 'report.parquet'
+
+    # act
+    report.write_report([airfoil_grid_4_grids, three_grids], str(path), 'parquet')
+    table = parquet.read_table(str(path))
+
+    # assert
+    assert table.num_rows == 9
+    assert table.column('case').to_pylist() == ['0'] * 6 + ['1'] * 3
+    assert table.column('cells').to_pylist()[:3] == [67209, 51383, 41002]
+
+
+def test_unknown_output_type(airfoil_grid_4_grids):
+    with pytest.raises(Exception):
+        report.write_report([airfoil_grid_4_grids], io.StringIO(), 'html')
+
+
+def test_report_writer_requires_write():
+    # arrange
+    class IncompleteWriter(report.ReportWriter):
+        pass
+
+    # act & assert
+    with pytest.raises(TypeError):
+        IncompleteWriter(io.StringIO())
@@ -0,0 +1,104 @@
+import pytest
+import numpy as np
+import src.pyGCS as pyGCS
+
+
+@pytest.fixture
+def airfoil_grid_4_grids():
+    return pyGCS.GCS(dimension=2, simulation_order=2, volume=456.745, cells=[31719, 41002, 51383, 67209],
+                     solution=[0.00919801, 0.00871879, 0.00852288, 0.00842471])
+
+
+def test_results_are_stored_in_contiguous_arrays(airfoil_grid_4_grids):
+    # arrange
+    sut = airfoil_grid_4_grids.results()
+
+    # act
+    gci = sut.get('gci')
+    cells = sut.get('cells')
+
+    # assert
+    assert not hasattr(sut, '__dict__')
+    assert gci.shape == (2, 2)
+    assert gci.flags['C_CONTIGUOUS']
+    assert cells.dtype == np.int64
+    assert list(cells[0]) == [67209, 51383, 41002]
+
+
+def test_study_view_does_not_copy(airfoil_grid_4_grids):
+    # arrange
+    sut = airfoil_grid_4_grids.results()
+
+    # act
+    study = sut.view(1)
+
+    # assert
+    assert np.shares_memory(study['gci'], sut.get('gci'))
+    assert list(study['cells']) == [51383, 41002, 31719]
+
+
+def test_gcs_get_is_backward_compatible(airfoil_grid_4_grids):
+    # arrange
+    sut = airfoil_grid_4_grids
+
+    # act
+    cells = sut.get('cells')
+    gci = sut.get('gci')
+    apparent_order = sut.get('apparent_order')
+
+    # assert
+    assert cells == [(67209, 51383, 41002), (51383, 41002, 31719)]
+    assert type(gci[0]) is list
+    assert type(apparent_order[0]) is float
+
+
+def test_gcs_with_many_quantities():
+    # arrange
+    solution = np.array([[0.00919801, 1.0], [0.00871879, 1.1], [0.00852288, 1.15], [0.00842471, 1.17]])
+    reference = pyGCS.GCS(dimension=2, simulation_order=2, volume=456.745, cells=[31719, 41002, 51383, 67209],
+                          solution=list(solution[:, 0]))
+
+    # act
+    sut = pyGCS.GCS(dimension=2, simulation_order=2, volume=456.745, cells=[31719, 41002, 51383, 67209],
+                    solution=solution)
+
+    # assert
+    assert sut.get('gci').shape == (2, 2, 2)
+    assert list(sut.get('gci')[:, :, 0].ravel()) == [gci for study in reference.get('gci') for gci in study]
+    assert list(sut.get('apparent_order')[:, 0]) == reference.get('apparent_order')
+
+
+def test_results_in_long_format(airfoil_grid_4_grids):
+    # arrange
+    sut = airfoil_grid_4_grids.results()
+
+    # act
+    columns = sut.to_columns()
+
+    # assert
+    assert list(columns['study']) == [0, 0, 0, 1, 1, 1]
+    assert list(columns['grid']) == [1, 2, 3, 2, 3, 4]
+    assert list(columns['cells']) == [67209, 51383, 41002, 51383, 41002, 31719]
+    assert np.isnan(columns['gci'][2]) and np.isnan(columns['refinement_ratio'][5])
+    assert columns['gci'][3] == sut.get('gci')[1][0]
+    assert columns['apparent_order'][4] == sut.get('apparent_order')[1]
+
+
+def test_export_to_pandas_and_arrow(airfoil_grid_4_grids):
+    # arrange
+    pytest.importorskip('pandas')
+    pytest.importorskip('pyarrow')
+    sut = airfoil_grid_4_grids
+    columns = sut.results().to_columns()
+
+    # act
+    frame = sut.to_frame()
+    table = sut.to_arrow()
+
+    # assert
+    assert list(frame.columns) == list(columns)
+    assert table.column_names == list(columns)
+    assert len(frame) == table.num_rows == 6
+    assert list(frame['grid']) == [1, 2, 3, 2, 3, 4]
+    assert table.column('apparent_order').to_pylist() == list(columns['apparent_order'])
+    assert np.isnan(frame['gci'][2]) and np.isnan(table.column('gci').to_pylist()[2])
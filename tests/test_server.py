@@ -0,0 +1,116 @@
+import asyncio
+import json
+import pytest
+import numpy as np
+import src.pyGCS as pyGCS
+from src.pyGCS.server import GCIServer
+
+
+CASE = dict(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=[6.063, 5.972, 5.863])
+
+
+async def post(port, path, body):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    payload = json.dumps(body).encode()
+    writer.write('POST {} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {}\r\nConnection: close\r\n\r\n'.format(
+        path, len(payload)).encode() + payload)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body.decode())
+
+
+async def get(port, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write('GET {} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'.format(path).encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.partition(b'\r\n\r\n')[2].decode())
+
+
+def serve(scenario, **kwargs):
+    async def run():
+        server = GCIServer(port=0, **kwargs)
+        await server.start()
+        try:
+            return await scenario(server)
+        finally:
+            await server.close()
+    return asyncio.run(run())
+
+
+def test_concurrent_requests_are_coalesced_into_batches():
+    # arrange
+    cases = [dict(CASE, solution=[6.063 + 0.001 * case, 5.972, 5.863]) for case in range(0, 20)]
+
+    async def scenario(server):
+        responses = await asyncio.gather(*[post(server.port, '/gci', case) for case in cases])
+        return responses, await get(server.port, '/statistics')
+
+    # act
+    responses, statistics = serve(scenario, max_delay=0.05)
+
+    # assert
+    for case, (status, result) in zip(cases, responses):
+        reference = pyGCS.GCI(**case)
+        assert status == 200
+        assert result['apparent_order'] == pytest.approx(reference.get('apparent_order'), rel=1e-9)
+        assert result['gci'] == pytest.approx(reference.get('gci'), rel=1e-9)
+    assert statistics['requests'] == 20
+    assert statistics['batches'] < 20
+    assert statistics['latency']['max'] >= statistics['latency']['p50'] > 0.0
+
+
+def test_gcs_endpoint_matches_gcs():
+    # arrange
+    case = dict(dimension=2, volume=456.745, cells=[31719, 41002, 51383, 67209],
+                solution=[0.00919801, 0.00871879, 0.00852288, 0.00842471])
+
+    async def scenario(server):
+        return await post(server.port, '/gcs', [case, case])
+
+    # act
+    status, results = serve(scenario)
+
+    # assert
+    reference = pyGCS.GCS(**case)
+    assert status == 200
+    assert len(results) == 2
+    assert np.allclose(results[1]['gci'], reference.get('gci'), rtol=1e-9)
+    assert results[1]['apparent_order'] == pytest.approx(reference.get('apparent_order'), rel=1e-9)
+
+
+def test_invalid_case_does_not_fail_its_batch():
+    # arrange
+    invalid = dict(CASE, solution=[6.063, 5.972])
+
+    async def scenario(server):
+        return await asyncio.gather(post(server.port, '/gci', CASE), post(server.port, '/gci', invalid),
+                                    post(server.port, '/gci', dict(CASE, mesh='fine')),
+                                    post(server.port, '/unknown', CASE))
+
+    # act
+    valid, invalid, unknown_argument, unknown_endpoint = serve(scenario, max_delay=0.05)
+
+    # assert
+    assert valid[0] == 200
+    assert invalid[0] == 400 and 'error' in invalid[1]
+    assert unknown_argument[0] == 400 and 'mesh' in unknown_argument[1]['error']
+    assert unknown_endpoint[0] == 404
+
+
+def test_large_requests_are_rejected():
+    # arrange
+    cases = [CASE] * 100
+
+    async def scenario(server):
+        return await post(server.port, '/gci', cases), await post(server.port, '/gci', CASE)
+
+    # act
+    too_large, valid = serve(scenario, max_request_size=1000)
+
+    # assert
+    assert too_large[0] == 413 and '1000' in too_large[1]['error']
+    assert valid[0] == 200
@@ -0,0 +1,87 @@
+import math
+import pytest
+import numpy as np
+import src.pyGCS as pyGCS
+
+
+@pytest.fixture
+def grid():
+    return dict(dimension=2, simulation_order=2, volume=76, cells=[4500, 8000, 18000])
+
+
+def monitor(records, amplitude=0.01, period=1.0, time_step=0.01):
+    # lift coefficients of the coarse, medium and fine grid oscillating in phase around their mean values
+    for record in range(0, records):
+        time = record * time_step
+        oscillation = amplitude * math.sin(2.0 * math.pi * time / period)
+        yield time, 5.863 + oscillation, 5.972 + oscillation, 6.063 + oscillation
+
+
+def test_instantaneous_gci_matches_gci(grid):
+    # arrange
+    sut = pyGCS.StreamingGCI(**grid)
+
+    # act
+    results = list(sut.process(monitor(5)))
+
+    # assert
+    assert len(results) == 5
+    for result in results:
+        reference = pyGCS.GCI(solution=list(result.solution), **grid)
+        assert result.apparent_order == pytest.approx(reference.get('apparent_order'), rel=1e-9)
+        assert result.gci == pytest.approx(tuple(reference.get('gci')), rel=1e-9)
+        assert result.extrapolated_value == pytest.approx(reference.get('extrapolated_value'), rel=1e-9)
+
+
+def test_moving_average_removes_periodic_oscillation(grid):
+    # arrange
+    sut = pyGCS.StreamingGCI(averaging='window', window=100, **grid)
+
+    # act
+    results = list(sut.process(monitor(1000)))
+
+    # assert
+    assert len(results) == 901
+    assert results[0].time == pytest.approx(0.99)
+    assert results[-1].solution == pytest.approx((5.863, 5.972, 6.063), abs=1e-12)
+
+
+def test_block_size_does_not_change_results(grid):
+    # arrange
+    single = pyGCS.StreamingGCI(averaging='window', window=30, **grid)
+    blocked = pyGCS.StreamingGCI(averaging='window', window=30, block_size=64, **grid)
+
+    # act
+    single_results = list(single.process(monitor(500)))
+    blocked_results = list(blocked.process(monitor(500)))
+
+    # assert
+    assert len(single_results) == len(blocked_results)
+    for single_result, blocked_result in zip(single_results, blocked_results):
+        assert single_result.time == blocked_result.time
+        assert single_result.apparent_order == pytest.approx(blocked_result.apparent_order, rel=1e-9)
+
+
+def test_phase_average_collects_records_of_same_phase(grid):
+    # arrange
+    sut = pyGCS.StreamingGCI(averaging='phase', period=1.0, bins=4, block_size=16, **grid)
+
+    # act
+    results = list(sut.process(monitor(400)))
+
+    # assert
+    assert len(results) == 400
+    assert results[-1].solution[0] == pytest.approx(np.mean([record[1] for record in monitor(400)
+                                                              if record[0] % 1.0 >= 0.75]))
+
+
+def test_invalid_grids_fail_before_consuming_records(grid):
+    # arrange
+    grid['cells'] = [4500, 4500, 18000]
+    sut = pyGCS.StreamingGCI(**grid)
+    records = monitor(10)
+
+    # act & assert
+    with pytest.raises(AssertionError):
+        next(sut.process(records))
+    assert next(records)[0] == 0.0
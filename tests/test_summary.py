@@ -0,0 +1,97 @@
+import pytest
+import numpy as np
+import src.pyGCS as pyGCS
+from src.pyGCS import kernels
+
+
+@pytest.fixture
+def results():
+    rng = np.random.default_rng(7)
+    points = 50000
+    order = rng.uniform(0.5, 3.0, points)
+    error_constant = rng.normal(0.0, 1.0, points)
+    solution = np.array([6.0 + error_constant * np.power(grid_size, order) for grid_size in [0.75, 1.125, 1.5]])
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        return kernels.evaluate_triplet(solution, np.array([0.75, 1.125, 1.5]))
+
+
+def chunks(result, chunk_size):
+    points = len(result['apparent_order'])
+    for start in range(0, points, chunk_size):
+        stop = min(start + chunk_size, points)
+        yield start, {'apparent_order': result['apparent_order'][start:stop],
+                      'extrapolated_value': result['extrapolated_value'][start:stop],
+                      'gci': result['gci'][:, start:stop], 'relative_error': result['relative_error'][:, start:stop]}
+
+
+def test_quantiles_are_within_relative_accuracy(results):
+    # arrange
+    sut = pyGCS.FieldSummary(alpha=0.01)
+
+    # act
+    for start, chunk in chunks(results, 4096):
+        sut.update(chunk, start)
+
+    # assert
+    for key in ('gci', 'apparent_order', 'extrapolated_value'):
+        values = results[key][0] if key == 'gci' else results[key]
+        values = np.sort(values[np.isfinite(values)])
+        for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+            expected = values[int(q * (len(values) - 1))]
+            assert sut.quantile(key, q) == pytest.approx(expected, rel=0.01)
+
+
+def test_counts_and_extrema_with_locations(results):
+    # arrange
+    sut = pyGCS.FieldSummary()
+    gci = results['gci'][0]
+    e21, e32 = results['relative_error']
+
+    # act
+    for start, chunk in chunks(results, 3000):
+        sut.update(chunk, start)
+
+    # assert
+    assert sut.points == 50000
+    assert sut.oscillatory_fraction() == pytest.approx(np.count_nonzero(~(e32 / e21 > 0.0)) / 50000, rel=1e-12)
+    assert sut.non_finite('gci') == np.count_nonzero(~np.isfinite(gci))
+    assert sut.minimum('gci') == (np.nanmin(gci), int(np.nanargmin(gci)))
+    assert sut.maximum('apparent_order') == (np.nanmax(results['apparent_order']),
+                                             int(np.nanargmax(results['apparent_order'])))
+    histogram = sut.histogram('apparent_order')
+    assert histogram.counts.sum() + histogram.underflow + histogram.overflow == 50000 - sut.non_finite('apparent_order')
+
+
+def test_merged_summaries_equal_single_summary(results):
+    # arrange
+    single = pyGCS.FieldSummary()
+    parts = [pyGCS.FieldSummary() for _ in range(0, 3)]
+    for index, (start, chunk) in enumerate(chunks(results, 5000)):
+        single.update(chunk, start)
+        parts[index % 3].update(chunk, start)
+
+    # act
+    sut = parts[0].merge(parts[1]).merge(parts[2])
+
+    # assert
+    assert sut.to_dict() == single.to_dict()
+    assert np.array_equal(sut.histogram('gci').counts, single.histogram('gci').counts)
+
+
+def test_parallel_field_summary_matches_serial(tmp_path):
+    # arrange
+    rng = np.random.default_rng(3)
+    order = rng.uniform(1.0, 2.5, 10007)
+    fields = [6.0 + 0.5 * np.power(grid_size, order) for grid_size in [0.75, 1.125, 1.5]]
+    serial = pyGCS.FieldGCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=fields,
+                            output_path=str(tmp_path / 'serial'), chunk_size=1000, summary=True)
+    sut = pyGCS.FieldGCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=fields,
+                         output_path=str(tmp_path / 'parallel'), chunk_size=1000, summary=True, workers=3)
+
+    # act
+    summary = sut.get('summary')
+
+    # assert
+    assert summary.points == 10007
+    assert summary.to_dict() == serial.get('summary').to_dict()
+    assert summary.minimum('gci') == (float(np.min(sut.get('gci')[0])), int(np.argmin(sut.get('gci')[0])))
@@ -0,0 +1,66 @@
+import pytest
+import numpy as np
+import src.pyGCS as pyGCS
+
+
+@pytest.fixture
+def grid():
+    return dict(dimension=2, simulation_order=2, volume=76, cells=[18000, 8000, 4500], solution=[6.063, 5.972, 5.863])
+
+
+def test_zero_uncertainty_reproduces_gci(grid):
+    # arrange
+    reference = pyGCS.GCI(**grid)
+
+    # act
+    sut = pyGCS.MonteCarloGCI(uncertainty=[0.0, 0.0, 0.0], number_of_samples=10, seed=0, **grid)
+
+    # assert
+    assert sut.get('apparent_order') == pytest.approx(reference.get('apparent_order'), rel=1e-9)
+    assert sut.get('extrapolated_value') == pytest.approx(reference.get('extrapolated_value'), rel=1e-9)
+    assert sut.get('gci')[0] == pytest.approx(reference.get('gci')[0], rel=1e-9)
+    assert sut.get('gci')[1] == pytest.approx(reference.get('gci')[1], rel=1e-9)
+
+
+def test_confidence_interval_contains_nominal_values(grid):
+    # arrange
+    reference = pyGCS.GCI(**grid)
+    sut = pyGCS.MonteCarloGCI(uncertainty=[0.002, 0.002, 0.002], number_of_samples=20000, chunk_size=3000, seed=1,
+                              **grid)
+
+    # act
+    lower, upper = sut.confidence_interval('apparent_order')
+    gci_lower, gci_upper = sut.confidence_interval('gci', confidence=0.99)
+    summary = sut.summary()
+
+    # assert
+    assert sut.get('gci').shape == (2, 20000)
+    assert lower < reference.get('apparent_order') < upper
+    assert np.all(gci_lower < np.array(reference.get('gci'))) and np.all(np.array(reference.get('gci')) < gci_upper)
+    assert summary['apparent_order']['std'] > 0
+    assert summary['converged_fraction'] == 1.0
+
+
+def test_samples_are_resampled_per_grid(grid):
+    # arrange
+    random = np.random.default_rng(2)
+    samples = [value + 0.05 * random.standard_normal(50) for value in grid.pop('solution')]
+
+    # act
+    sut = pyGCS.MonteCarloGCI(samples=samples, number_of_samples=5000, seed=3, **grid)
+    repeated = pyGCS.MonteCarloGCI(samples=samples, number_of_samples=5000, seed=3, **grid)
+
+    # assert
+    assert sut.get('solution') == pytest.approx([np.mean(grid_samples) for grid_samples in samples])
+    assert np.array_equal(sut.get('apparent_order'), repeated.get('apparent_order'), equal_nan=True)
+    assert 0.0 < sut.summary()['oscillatory_fraction'] < 1.0
+
+
+def test_noisy_solutions_mark_failed_samples(grid):
+    # act
+    sut = pyGCS.MonteCarloGCI(uncertainty=[0.1, 0.1, 0.1], number_of_samples=2000, seed=4, **grid)
+
+    # assert
+    failed = ~sut.get('order_converged')
+    assert np.all(np.isnan(sut.get('apparent_order')[failed]))
+    assert np.all(np.isfinite(sut.confidence_interval('extrapolated_value')))
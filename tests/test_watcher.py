@@ -0,0 +1,135 @@
+import asyncio
+import json
+import pytest
+import numpy as np
+import src.pyGCS as pyGCS
+
+
+LEVELS = [(18000, 6.063), (8000, 5.972), (4500, 5.863), (2000, 5.6)]
+
+
+def write_level(directory, cells, solution):
+    directory.mkdir(exist_ok=True)
+    (directory / 'result.json').write_text(json.dumps({'cells': cells, 'solution': solution}))
+
+
+def test_study_is_evaluated_once_three_levels_are_present(tmp_path):
+    # arrange
+    directories = [tmp_path / 'level{}'.format(level) for level in range(0, 4)]
+    updates = []
+    sut = pyGCS.CaseWatcher(settle=False)
+    sut.add_study('lift', directories, 'result.json', on_update=lambda name, result: updates.append(name),
+                  dimension=2, volume=76)
+
+    # act
+    for directory, (cells, solution) in zip(directories[:2], LEVELS):
+        write_level(directory, cells, solution)
+    asyncio.run(sut.scan())
+    result_for_two_levels = sut.get('lift')
+    write_level(directories[2], *LEVELS[2])
+    asyncio.run(sut.scan())
+
+    # assert
+    assert result_for_two_levels is None
+    assert updates == ['lift']
+    reference = pyGCS.GCI(dimension=2, volume=76, cells=[18000, 8000, 4500], solution=[6.063, 5.972, 5.863])
+    assert sut.get('lift').get('apparent_order')[0] == pytest.approx(reference.get('apparent_order'), rel=1e-9)
+    assert sut.get('lift').get('gci')[0] == pytest.approx(reference.get('gci'), rel=1e-9)
+
+
+def test_only_triplets_with_new_levels_are_evaluated(tmp_path):
+    # arrange
+    directories = [tmp_path / 'level{}'.format(level) for level in range(0, 4)]
+    sut = pyGCS.CaseWatcher(settle=False)
+    sut.add_study('lift', directories, 'result.json', dimension=2, volume=76)
+    for directory, (cells, solution) in zip(directories[1:], LEVELS[1:]):
+        write_level(directory, cells, solution)
+    asyncio.run(sut.scan())
+
+    # act
+    write_level(directories[0], *LEVELS[0])
+    asyncio.run(sut.scan())
+    asyncio.run(sut.scan())
+
+    # assert
+    assert sut.number_of_evaluations('lift') == 2
+    reference = pyGCS.GCS(dimension=2, volume=76, cells=[level[0] for level in LEVELS],
+                          solution=[level[1] for level in LEVELS])
+    assert np.allclose(sut.get('lift').get('gci'), reference.get('gci'), rtol=1e-9)
+    assert np.allclose(sut.get('lift').get('apparent_order'), reference.get('apparent_order'), rtol=1e-9)
+
+
+def test_partially_written_file_is_read_again(tmp_path):
+    # arrange
+    directories = [tmp_path / 'level{}'.format(level) for level in range(0, 3)]
+    sut = pyGCS.CaseWatcher(settle=False)
+    sut.add_study('lift', directories, 'result.json', dimension=2, volume=76)
+    for directory, (cells, solution) in zip(directories[1:], LEVELS[1:]):
+        write_level(directory, cells, solution)
+    directories[0].mkdir()
+    (directories[0] / 'result.json').write_text('{"cells": 180')
+
+    # act
+    asyncio.run(sut.scan())
+    write_level(directories[0], *LEVELS[0])
+    asyncio.run(sut.scan())
+
+    # assert
+    assert sut.is_complete('lift')
+    assert sut.get('lift').number_of_studies() == 1
+
+
+def test_run_watches_several_studies_until_complete(tmp_path):
+    # arrange
+    updates = []
+
+    async def on_update(name, result):
+        updates.append((name, result.number_of_studies()))
+
+    sut = pyGCS.CaseWatcher(interval=0.01)
+    for study in ('lift', 'drag'):
+        directories = [tmp_path / study / 'level{}'.format(level) for level in range(0, 3)]
+        (tmp_path / study).mkdir()
+        for directory, (cells, solution) in zip(directories, LEVELS):
+            write_level(directory, cells, solution)
+        sut.add_study(study, directories, '*.json', on_update=on_update, dimension=2, volume=76)
+
+    # act
+    asyncio.run(asyncio.wait_for(sut.run(until_complete=True), 5.0))
+
+    # assert
+    assert sorted(updates) == [('drag', 1), ('lift', 1)]
+
+
+def test_failing_study_does_not_stop_other_studies(tmp_path):
+    # arrange
+    updates = []
+    sut = pyGCS.CaseWatcher(interval=0.01)
+    for study, levels in (('lift', LEVELS), ('drag', [LEVELS[0], LEVELS[0], LEVELS[2]])):
+        directories = [tmp_path / study / 'level{}'.format(level) for level in range(0, 3)]
+        (tmp_path / study).mkdir()
+        for directory, (cells, solution) in zip(directories, levels):
+            write_level(directory, cells, solution)
+        sut.add_study(study, directories, '*.json', on_update=lambda name, result: updates.append(name), dimension=2,
+                      volume=76)
+
+    # act
+    asyncio.run(asyncio.wait_for(sut.run(until_complete=True), 5.0))
+
+    # assert
+    assert updates == ['lift']
+    assert sut.error('lift') is None
+    assert sut.error('drag') is not None
+    assert sut.get('drag') is None
+
+
+def test_csv_reader(tmp_path):
+    # arrange
+    path = tmp_path / 'result.csv'
+    path.write_text('cells,solution,volume\n18000,6.063,76\n')
+
+    # act
+    level = pyGCS.watcher.READERS['csv'](str(path))
+
+    # assert
+    assert level == {'cells': 18000, 'solution': 6.063, 'volume': 76.0}